@@ -0,0 +1,59 @@
+import time
+from collections import deque
+
+import joblib
+import pandas as pd
+
+from ml_inference import BUFFER_SIZE, FEATURE_COLUMNS, MODEL_PATH, detect_hazards, predict_rows
+
+DATASET = "../hazard_multilabel_dataset.csv"
+BACKLOG_SIZES = [1, 10, 100, 1000, 10000]
+# One predict call per row takes minutes beyond this.
+PER_ROW_LIMIT = 1000
+REPEAT = 3
+
+
+def sample_rows(count):
+    features = pd.read_csv(DATASET, usecols=FEATURE_COLUMNS)
+    return features.sample(count, replace=True, random_state=0).reset_index(drop=True)
+
+
+def per_row(model, rows):
+    # The previous loop: one DataFrame and one predict call per row.
+    prediction_buffer = deque(maxlen=BUFFER_SIZE)
+    for _, row in rows.iterrows():
+        X = pd.DataFrame([row[FEATURE_COLUMNS].values], columns=FEATURE_COLUMNS)
+        prediction_buffer.append(model.predict(X)[0])
+
+
+def batched(model, rows):
+    prediction_buffer = deque(maxlen=BUFFER_SIZE)
+    detect_hazards(predict_rows(model, rows), prediction_buffer)
+
+
+def rows_per_second(process, model, rows):
+    best = float("inf")
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        process(model, rows)
+        best = min(best, time.perf_counter() - started)
+    return len(rows) / best
+
+
+def main():
+    model = joblib.load(MODEL_PATH)
+    rows = sample_rows(max(BACKLOG_SIZES))
+
+    print(f"{'rows/poll':>10} {'per-row rows/s':>16} {'batched rows/s':>16} {'speedup':>8}")
+    for size in BACKLOG_SIZES:
+        backlog = rows.iloc[:size]
+        fast = rows_per_second(batched, model, backlog)
+        if size <= PER_ROW_LIMIT:
+            slow = rows_per_second(per_row, model, backlog)
+            print(f"{size:>10} {slow:>16.1f} {fast:>16.1f} {fast / slow:>7.1f}x")
+        else:
+            print(f"{size:>10} {'-':>16} {fast:>16.1f} {'-':>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,16 @@
 import pandas as pd
+import numpy as np
 import joblib
 import time
+import warnings
 from collections import deque
 import os
 from datetime import datetime
 import requests
 import json
 
+from stream_reader import CsvTailReader
+
 
 STREAM_FILE = "sensor_logs.csv"
 MODEL_PATH = "hazard_multilabel_fscst_rf.pkl"
@@ -43,66 +47,77 @@ DEPARTMENT_MAP = {
     "STRUCTURAL": "Public Works Department"
 }
 
-model = joblib.load(MODEL_PATH)
+# The model was fitted on a DataFrame; the feature matrix has the same
+# column order.
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
 
-prediction_buffer = deque(maxlen=BUFFER_SIZE)
-last_row_count = 0
-active_hazards = set()
 
+def predict_rows(model, rows):
+    # One predict call for every row of the poll.
+    features = rows[FEATURE_COLUMNS].to_numpy(dtype=float)
+    return np.asarray(model.predict(features))
 
-if not os.path.exists(ALERT_LOG):
-    with open(ALERT_LOG, "w") as f:
-        f.write("time,type,hazard,dept,latitude,longitude,details\n")
 
-print("Monitoring stream...\n")
+def detect_hazards(predictions, prediction_buffer):
+    """
+    Per row, which hazards were predicted at least CONSISTENCY_THRESHOLD
+    times in the last BUFFER_SIZE predictions (the row's included), and
+    whether that many predictions exist yet. prediction_buffer carries the
+    window over from the previous poll and is updated.
+    """
+    earlier = np.array(prediction_buffer).reshape(-1, predictions.shape[1])
+    history = np.vstack([earlier, predictions])
+    prediction_buffer.extend(predictions)
 
+    totals = np.vstack([np.zeros((1, history.shape[1])), np.cumsum(history, axis=0)])
+    ends = np.arange(len(earlier), len(history)) + 1
+    counts = totals[ends] - totals[np.maximum(ends - BUFFER_SIZE, 0)]
+    return counts >= CONSISTENCY_THRESHOLD, ends >= BUFFER_SIZE
 
-while True:
 
-    if not os.path.exists(STREAM_FILE):
-        time.sleep(1)
-        continue
+def main():
+    model = joblib.load(MODEL_PATH)
 
-    df = pd.read_csv(STREAM_FILE)
-    current_row_count = len(df)
+    prediction_buffer = deque(maxlen=BUFFER_SIZE)
+    stream_reader = CsvTailReader(STREAM_FILE)
+    active_hazards = set()
 
-    if current_row_count > last_row_count:
+    if not os.path.exists(ALERT_LOG):
+        with open(ALERT_LOG, "w") as f:
+            f.write("time,type,hazard,dept,latitude,longitude,details\n")
 
-        new_rows = df.iloc[last_row_count:current_row_count]
+    print("Monitoring stream...\n")
 
-        for _, row in new_rows.iterrows():
+    while True:
 
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            latitude = row.get("latitude", None)
-            longitude = row.get("longitude", None)
+        new_rows = stream_reader.read_new()
 
-            X = pd.DataFrame([row[FEATURE_COLUMNS].values],
-                             columns=FEATURE_COLUMNS)
+        if not new_rows.empty:
+
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            latitudes = new_rows.get("latitude", pd.Series([None] * len(new_rows))).tolist()
+            longitudes = new_rows.get("longitude", pd.Series([None] * len(new_rows))).tolist()
 
-            prediction = model.predict(X)[0]
-            prediction_buffer.append(prediction)
+            predictions = predict_rows(model, new_rows)
+            detected, window_full = detect_hazards(predictions, prediction_buffer)
 
-            print("Raw Prediction:", prediction)
+            print("\n".join(f"Raw Prediction: {prediction}" for prediction in predictions))
 
             with open(ALERT_LOG, "a") as f:
-                f.write(
+                f.writelines(
                     f"{timestamp},PREDICTION,NONE,NONE,{latitude},{longitude},\"{list(prediction)}\"\n"
+                    for latitude, longitude, prediction in zip(latitudes, longitudes, predictions)
                 )
 
-            if len(prediction_buffer) >= BUFFER_SIZE:
+            for i in np.flatnonzero(window_full):
 
-                hazard_counts = {
-                    name: sum(p[idx] for p in prediction_buffer)
-                    for name, idx in HAZARD_INDEX.items()
-                }
-
-                current_detected = set()
+                latitude = latitudes[i]
+                longitude = longitudes[i]
 
-                for hazard, count in hazard_counts.items():
-                    if count >= CONSISTENCY_THRESHOLD:
-                        current_detected.add(hazard)
+                current_detected = {
+                    hazard for hazard, idx in HAZARD_INDEX.items() if detected[i, idx]
+                }
 
-               
                 for hazard in current_detected:
                     if hazard not in active_hazards:
 
@@ -114,7 +129,7 @@ while True:
                             "dept": dept,
                             "latitude": latitude,
                             "longitude": longitude,
-                            "sensor_values": row.to_dict()
+                            "sensor_values": new_rows.iloc[i].to_dict()
                         }
 
                         print(f"\n ALERT: {hazard} → {dept}")
@@ -133,7 +148,6 @@ while True:
 
                         active_hazards.add(hazard)
 
-             
                 resolved = active_hazards - current_detected
                 for hazard in resolved:
 
@@ -148,6 +162,8 @@ while True:
 
                     active_hazards.remove(hazard)
 
-        last_row_count = current_row_count
+        time.sleep(1)
+
 
-    time.sleep(1)
+if __name__ == "__main__":
+    main()
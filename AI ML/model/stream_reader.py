@@ -0,0 +1,58 @@
+import io
+import os
+
+import pandas as pd
+
+
+class CsvTailReader:
+    """
+    Follows a CSV file that another process appends to and returns only the
+    rows added since the last call, so each poll parses the new lines and
+    not the whole file.
+
+    A line without its newline yet is kept back until it is complete. When
+    the file disappears, shrinks or is replaced (the simulator removes it
+    before a run), reading starts again from the top, header included.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._reset()
+
+    def _reset(self):
+        self.offset = 0
+        self._identity = None
+        self._header = None
+        self._partial = b""
+
+    def read_new(self):
+        """New complete rows as a DataFrame, empty when there are none."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._reset()
+            return pd.DataFrame()
+
+        identity = (stat.st_dev, stat.st_ino)
+        if identity != self._identity or stat.st_size < self.offset:
+            self._reset()
+            self._identity = identity
+        if stat.st_size == self.offset:
+            return pd.DataFrame()
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read()
+        self.offset += len(data)
+
+        complete, newline, self._partial = (self._partial + data).rpartition(b"\n")
+        if not newline:
+            return pd.DataFrame()
+        lines = complete + newline
+
+        if self._header is None:
+            header, _, lines = lines.partition(b"\n")
+            self._header = header + b"\n"
+        if not lines.strip():
+            return pd.DataFrame()
+        return pd.read_csv(io.BytesIO(self._header + lines))
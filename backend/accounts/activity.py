@@ -0,0 +1,94 @@
+"""
+Activity log pipeline.
+
+log_activity() used to insert one ActivityLog row synchronously inside every
+request. Entries are now queued in-process and written by a background thread
+with bulk_create once BATCH_SIZE entries are waiting or FLUSH_INTERVAL seconds
+have passed. The queue is flushed on interpreter shutdown, and when it is full
+the entry is written synchronously instead, so audit entries are never dropped.
+Entries are queued once the surrounding transaction commits, so a rolled-back
+action is not logged.
+"""
+import atexit
+import logging
+
+from django.db import transaction
+
+from admin_hub.buffering import BufferedWriter
+
+from .conf import ACTIVITY_LOG_WRITER
+from .models import ActivityLog
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityLogWriter(BufferedWriter):
+    """
+    Buffers unsaved ActivityLog instances and writes them in batches. An
+    entry that does not fit in the queue, or arrives after shutdown, is
+    saved right away.
+    """
+
+    thread_name = 'activity-log-writer'
+
+    def __init__(self, batch_size=None, flush_interval=None, max_buffer=None, start_thread=True):
+        super().__init__(
+            batch_size or ACTIVITY_LOG_WRITER.BATCH_SIZE,
+            flush_interval or ACTIVITY_LOG_WRITER.FLUSH_INTERVAL,
+            max_buffer or ACTIVITY_LOG_WRITER.MAX_QUEUE,
+            start_thread=start_thread,
+        )
+        self.stats['sync_fallbacks'] = 0
+
+    def overflow(self, entries):
+        if not self._stopped.is_set():
+            logger.warning("Activity log queue full, writing entry synchronously")
+        for entry in entries:
+            self.count('sync_fallbacks')
+            entry.save()
+
+    def write(self, batch):
+        try:
+            ActivityLog.objects.bulk_create(batch)
+            return len(batch)
+        except Exception as exc:
+            # One bad row must not take the rest of the batch with it.
+            logger.error(f"Activity log batch insert failed, retrying row by row: {exc}")
+        saved = 0
+        for entry in batch:
+            try:
+                entry.save()
+            except Exception:
+                logger.exception(f"Lost activity log entry: {entry}")
+                continue
+            saved += 1
+        return saved
+
+
+activity_log_writer = ActivityLogWriter()
+atexit.register(activity_log_writer.shutdown)
+
+
+def client_ip(request):
+    if not request:
+        return None
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if x_forwarded_for:
+        return x_forwarded_for.split(',')[0]
+    return request.META.get('REMOTE_ADDR')
+
+
+def log_activity(performed_by, target_user, action, details="", request=None):
+    entry = ActivityLog(
+        performed_by=performed_by,
+        target_user=target_user,
+        action=action,
+        details=details,
+        ip_address=client_ip(request),
+        department=getattr(performed_by, 'department', '') or ''
+    )
+    if ACTIVITY_LOG_WRITER.ASYNC:
+        transaction.on_commit(lambda: activity_log_writer.add([entry]))
+    else:
+        entry.save()
+    return entry
@@ -29,7 +29,9 @@ class UserAdmin(BaseUserAdmin):
 class ActivityLogAdmin(admin.ModelAdmin):
     list_display = ("timestamp", "performed_by", "action", "target_user", "ip_address")
     list_filter = ("action", "timestamp")
-    search_fields = ("performed_by__userid", "target_user", "details")
+    # No "details": a LIKE scan over the whole table. Use query_activity_logs
+    # for full-text searches over archived entries.
+    search_fields = ("performed_by__userid", "target_user")
     ordering = ("-timestamp",)
     readonly_fields = ("timestamp", "performed_by", "target_user", "action", "details", "ip_address")
     
@@ -10,7 +10,8 @@ class AccountsConfig(AppConfig):
         Import and connect signal handlers when Django starts.
         
         NOTE: Since IssueReportRemote doesn't have likes/dislikes ManyToMany fields,
-        we can't use signals. Instead, we'll use periodic evaluation via middleware.
+        we can't use signals. Instead, admins are evaluated periodically by
+        accounts.scheduler (started from wsgi/asgi or `manage.py run_scheduler`).
         """
         # No signal setup needed - using periodic evaluation instead
         pass
\ No newline at end of file
@@ -0,0 +1,162 @@
+"""
+ActivityLog retention.
+
+Entries older than ACTIVITY_LOG_RETENTION["DAYS"] are moved out of the hot
+table into zstd-compressed Parquet files partitioned by day, and stay
+searchable through query_archived_logs() / ``manage.py query_activity_logs``.
+"""
+from datetime import timedelta, timezone as dt_timezone
+import logging
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from django.db import transaction
+from django.utils import timezone
+
+from admin_hub import parquet
+
+from .conf import ACTIVITY_LOG_RETENTION
+from .models import ActivityLog
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_SCHEMA = pa.schema([
+    ('id', pa.int64()),
+    ('timestamp', pa.timestamp('us', tz='UTC')),
+    ('performed_by_id', pa.int64()),
+    ('performed_by_userid', pa.string()),
+    ('target_user', pa.string()),
+    ('action', pa.string()),
+    ('details', pa.string()),
+    ('ip_address', pa.string()),
+    ('department', pa.string()),
+])
+
+_FIELDS = (
+    'id', 'timestamp', 'performed_by_id', 'performed_by__userid', 'target_user',
+    'action', 'details', 'ip_address', 'department',
+)
+
+
+def archive_dir():
+    return Path(ACTIVITY_LOG_RETENTION.ARCHIVE_DIR)
+
+
+def _archive_row(row):
+    row['performed_by_userid'] = row.pop('performed_by__userid')
+    row['timestamp'] = row['timestamp'].astimezone(dt_timezone.utc)
+    return row
+
+
+class _ArchivedIds:
+    """Ids already in each day's archive files, read once per day and run."""
+
+    def __init__(self, root):
+        self._files = parquet.partition_files(root)
+        self._ids = {}
+
+    def __call__(self, day):
+        if day not in self._ids:
+            self._ids[day] = {
+                archived_id
+                for path in self._files.get(day, ())
+                for archived_id in pq.read_table(path, columns=['id']).column('id').to_pylist()
+            }
+        return self._ids[day]
+
+
+def archive_activity_logs(days=None, now=None, dry_run=False):
+    """
+    Move entries older than ``days`` into the Parquet archive.
+
+    Each batch is written before it is deleted. A crash between the two steps
+    leaves entries that are archived but still in the table; the next run
+    (whose batches may span other ids, since the cutoff moves) deletes them
+    without writing them again.
+
+    Returns:
+        dict: Number of entries archived and files written
+    """
+    days = ACTIVITY_LOG_RETENTION.DAYS if days is None else days
+    now = now or timezone.now()
+    cutoff = now - timedelta(days=days)
+    batch_size = ACTIVITY_LOG_RETENTION.BATCH_SIZE
+    root = archive_dir()
+
+    if dry_run:
+        return {'archived': ActivityLog.objects.filter(timestamp__lt=cutoff).count(), 'files': 0}
+
+    archived = 0
+    files = 0
+    archived_ids = _ArchivedIds(root)
+    while True:
+        rows = list(
+            ActivityLog.objects.filter(timestamp__lt=cutoff)
+            .order_by('timestamp', 'id')
+            .values(*_FIELDS)[:batch_size]
+        )
+        if not rows:
+            break
+
+        by_day = {}
+        for row in rows:
+            row = _archive_row(row)
+            by_day.setdefault(row['timestamp'].date(), []).append(row)
+
+        for day, day_rows in by_day.items():
+            already = archived_ids(day)
+            day_rows = [row for row in day_rows if row['id'] not in already]
+            if not day_rows:
+                continue
+            parquet.write_partition(
+                root,
+                day,
+                day_rows,
+                ARCHIVE_SCHEMA,
+                basename=f"part-{day_rows[0]['id']}-{day_rows[-1]['id']}",
+            )
+            already.update(row['id'] for row in day_rows)
+            files += 1
+
+        with transaction.atomic():
+            ActivityLog.objects.filter(id__in=[row['id'] for row in rows]).delete()
+        archived += len(rows)
+
+    if archived:
+        logger.info(f"Archived {archived} activity log entries older than {cutoff:%Y-%m-%d} to {root}")
+    return {'archived': archived, 'files': files}
+
+
+def query_archived_logs(department=None, action=None, target_user=None, performed_by=None,
+                        since=None, until=None, contains=None, limit=None, columns=None):
+    """
+    Search the archive. ``since``/``until`` (dates or aware datetimes) prune
+    whole partitions; the equality filters are pushed down to the Parquet
+    row-group statistics. ``contains`` is a case-insensitive substring match
+    on ``details``.
+
+    Returns:
+        list: Matching rows as dicts, newest first
+    """
+    conditions = []
+    if contains:
+        conditions.append(pc.match_substring(ds.field('details'), contains, ignore_case=True))
+    return parquet.query(
+        archive_dir(),
+        ARCHIVE_SCHEMA,
+        since=since,
+        until=until,
+        equals={
+            'department': department,
+            'action': action,
+            'target_user': target_user,
+            'performed_by_userid': performed_by,
+        },
+        conditions=conditions,
+        order_by=('timestamp', 'id'),
+        limit=limit,
+        columns=columns,
+    )
@@ -1,8 +1,30 @@
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework_simplejwt.views import TokenObtainPairView
-from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework import serializers, status
+from rest_framework.response import Response
+from django.conf import settings
 from django.utils import timezone
 from datetime import timedelta
+import threading
+
+from .activity import log_activity
+
+_login_slots = None
+_login_slots_lock = threading.Lock()
+
+
+def _get_login_slots():
+    """
+    Per-process semaphore bounding concurrent password checks, so a burst of
+    logins cannot occupy every worker thread with hashing.
+    """
+    global _login_slots
+    if _login_slots is None:
+        with _login_slots_lock:
+            if _login_slots is None:
+                _login_slots = threading.BoundedSemaphore(settings.LOGIN_CONCURRENCY['MAX_CONCURRENT'])
+    return _login_slots
 
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
@@ -43,4 +65,32 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
 
 
 class CustomTokenObtainPairView(TokenObtainPairView):
-    serializer_class = CustomTokenObtainPairSerializer
\ No newline at end of file
+    serializer_class = CustomTokenObtainPairSerializer
+
+    def post(self, request, *args, **kwargs):
+        slots = _get_login_slots()
+        if not slots.acquire(timeout=settings.LOGIN_CONCURRENCY['WAIT_SECONDS']):
+            return Response(
+                {"detail": "Too many login attempts in progress. Please try again shortly."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": "2"}
+            )
+        try:
+            serializer = self.get_serializer(data=request.data)
+            try:
+                # Checks the password; Django rehashes it here when the stored
+                # hash is outdated (see accounts.hashers).
+                serializer.is_valid(raise_exception=True)
+            except TokenError as e:
+                raise InvalidToken(e.args[0])
+        finally:
+            slots.release()
+
+        log_activity(
+            performed_by=serializer.user,
+            target_user=serializer.user.userid,
+            action='login',
+            details="Logged in",
+            request=request
+        )
+        return Response(serializer.validated_data, status=status.HTTP_200_OK)
@@ -0,0 +1,65 @@
+from django.conf import settings
+
+from admin_hub.conf import AppSettings
+
+# Periodic jobs (accounts.scheduler). Each job runs once per interval across
+# all workers; either keep AUTOSTART or run `manage.py run_scheduler`. A job
+# is a dotted callable, its interval in seconds and optional kwargs. Failed
+# jobs retry after RETRY_SECONDS, doubling up to MAX_RETRY_SECONDS.
+ADMIN_SCHEDULER = AppSettings('ADMIN_SCHEDULER', {
+    'AUTOSTART': True,
+    'POLL_SECONDS': 15,
+    'LEASE_SECONDS': 600,
+    'RETRY_SECONDS': 60,
+    'MAX_RETRY_SECONDS': 3600,
+    'JOBS': {
+        'evaluate_admins': {
+            'callable': 'accounts.services:AdminDeactivationService.evaluate_all_admins',
+            'interval': 300,
+        },
+        'process_reactivations': {
+            'callable': 'accounts.services:AdminDeactivationService.process_pending_reactivations',
+            'interval': 300,
+        },
+        'archive_activity_logs': {
+            'callable': 'accounts.archive:archive_activity_logs',
+            'interval': 86400,
+        },
+        'compact_sensor_telemetry': {
+            'callable': 'sensor_alerts.telemetry:compact_telemetry',
+            'interval': 86400,
+        },
+        'refresh_issue_priorities': {
+            'callable': 'remote_report.priority:refresh_issue_priorities',
+            'interval': 60,
+        },
+        # Incremental runs leave the age component and closed issues alone.
+        'refresh_issue_priorities_full': {
+            'callable': 'remote_report.priority:refresh_issue_priorities',
+            'kwargs': {'full': True},
+            'interval': 3600,
+        },
+    },
+})
+
+# Batched ActivityLog writes (accounts.activity)
+ACTIVITY_LOG_WRITER = AppSettings('ACTIVITY_LOG_WRITER', {
+    'ASYNC': True,
+    'BATCH_SIZE': 100,
+    'FLUSH_INTERVAL': 2.0,
+    'MAX_QUEUE': 10000,
+})
+
+# ActivityLog retention: older entries move to date-partitioned Parquet
+# (accounts.archive)
+ACTIVITY_LOG_RETENTION = AppSettings('ACTIVITY_LOG_RETENTION', {
+    'DAYS': 90,
+    'ARCHIVE_DIR': settings.BASE_DIR / 'archive' / 'activity_logs',
+    'BATCH_SIZE': 5000,
+})
+
+# Full recount of the incremental feedback counters (accounts.feedback) to
+# correct drift from removed votes or re-allocated reports.
+ADMIN_AUTO_DEACTIVATION = AppSettings('ADMIN_AUTO_DEACTIVATION', {
+    'FEEDBACK_RECONCILE_HOURS': 6,
+})
@@ -0,0 +1,241 @@
+"""
+Incremental like/dislike counters for admin auto-deactivation.
+
+Instead of recounting every vote an admin ever received on each evaluation,
+new votes are folded into AdminFeedbackCounter from a high-water mark on the
+vote tables' ids. Votes that disappear (un-likes) or reports that change
+allocation are not visible to the incremental path, so a periodic full
+reconciliation rebuilds the counters from scratch.
+
+Auto-increment ids are handed out before commit, so a vote can become
+visible after a higher id has already moved the watermark past it. Ids
+missing below the watermark (within the last GAP_WINDOW ids) are remembered
+on the watermark row and counted by the advance that first sees them;
+anything older is left to reconciliation.
+"""
+from datetime import timedelta
+import logging
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .conf import ADMIN_AUTO_DEACTIVATION
+from .models import AdminFeedbackCounter, FeedbackWatermark
+
+logger = logging.getLogger(__name__)
+
+
+class FeedbackCounterService:
+    """
+    Maintains AdminFeedbackCounter rows and serves per-admin metrics from them.
+    """
+
+    WATERMARK_NAME = 'admin_feedback'
+    GAP_WINDOW = 1000
+    VOTE_TABLES = {'like': 'report_issuereport_likes', 'dislike': 'report_issuereport_dislikes'}
+
+    @classmethod
+    def _reconcile_interval(cls):
+        return timedelta(hours=ADMIN_AUTO_DEACTIVATION.FEEDBACK_RECONCILE_HOURS)
+
+    @classmethod
+    def _lock_watermark(cls):
+        watermark, _ = FeedbackWatermark.objects.get_or_create(name=cls.WATERMARK_NAME)
+        # Serialize advancing/reconciling across workers on the watermark row.
+        return FeedbackWatermark.objects.select_for_update().get(pk=watermark.pk)
+
+    @staticmethod
+    def _max_vote_ids():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT "
+                "(SELECT COALESCE(MAX(id), 0) FROM report_issuereport_likes), "
+                "(SELECT COALESCE(MAX(id), 0) FROM report_issuereport_dislikes)"
+            )
+            max_like_id, max_dislike_id = cursor.fetchone()
+        return int(max_like_id), int(max_dislike_id)
+
+    @classmethod
+    def _gaps(cls, kind, after, upto, pending):
+        """
+        Look for ids of one vote table that were missing up to ``after`` and
+        are visible now, and for the ones still missing up to ``upto``. Only
+        the last GAP_WINDOW ids are considered.
+
+        Returns:
+            tuple: (ids that turned up, ids still missing)
+        """
+        low = upto - cls.GAP_WINDOW
+        expected = set(range(max(after, low) + 1, upto + 1))
+        pending = {vote_id for vote_id in pending if vote_id > low}
+        if not expected and not pending:
+            return [], []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT id FROM {cls.VOTE_TABLES[kind]} WHERE id > %s AND id <= %s",
+                [max(low, 0), upto],
+            )
+            present = {row[0] for row in cursor.fetchall()}
+        return sorted(pending & present), sorted((expected | pending) - present)
+
+    @classmethod
+    @transaction.atomic
+    def advance(cls):
+        """
+        Fold votes newer than the watermark into the counters.
+
+        Returns:
+            dict: Number of admins touched and the new watermark
+        """
+        from accounts.services import AdminDeactivationService
+
+        watermark = cls._lock_watermark()
+        max_like_id, max_dislike_id = cls._max_vote_ids()
+
+        if (
+            (max_like_id, max_dislike_id) == (watermark.last_like_id, watermark.last_dislike_id)
+            and not watermark.pending_like_ids
+            and not watermark.pending_dislike_ids
+        ):
+            return {'admins_updated': 0, 'last_like_id': max_like_id, 'last_dislike_id': max_dislike_id}
+
+        late_likes, pending_likes = cls._gaps('like', watermark.last_like_id, max_like_id, watermark.pending_like_ids)
+        late_dislikes, pending_dislikes = cls._gaps(
+            'dislike', watermark.last_dislike_id, max_dislike_id, watermark.pending_dislike_ids
+        )
+        deltas = AdminDeactivationService._feedback_metrics_by_admin(
+            like_ids=(watermark.last_like_id, max_like_id, late_likes),
+            dislike_ids=(watermark.last_dislike_id, max_dislike_id, late_dislikes),
+        )
+
+        existing = {
+            counter.admin_userid: counter
+            for counter in AdminFeedbackCounter.objects.filter(admin_userid__in=list(deltas))
+        }
+        now = timezone.now()
+        to_create = []
+        for userid, delta in deltas.items():
+            counter = existing.get(userid)
+            if counter is None:
+                to_create.append(AdminFeedbackCounter(
+                    admin_userid=userid,
+                    total_likes=delta['total_likes'],
+                    total_dislikes=delta['total_dislikes'],
+                ))
+            else:
+                counter.total_likes += delta['total_likes']
+                counter.total_dislikes += delta['total_dislikes']
+                counter.updated_at = now
+
+        if to_create:
+            AdminFeedbackCounter.objects.bulk_create(to_create)
+        if existing:
+            AdminFeedbackCounter.objects.bulk_update(
+                existing.values(), ['total_likes', 'total_dislikes', 'updated_at']
+            )
+
+        watermark.last_like_id = max_like_id
+        watermark.last_dislike_id = max_dislike_id
+        watermark.pending_like_ids = pending_likes
+        watermark.pending_dislike_ids = pending_dislikes
+        watermark.save(update_fields=['last_like_id', 'last_dislike_id', 'pending_like_ids', 'pending_dislike_ids'])
+
+        logger.debug(f"Feedback counters advanced for {len(deltas)} admin(s)")
+        return {'admins_updated': len(deltas), 'last_like_id': max_like_id, 'last_dislike_id': max_dislike_id}
+
+    @classmethod
+    @transaction.atomic
+    def reconcile(cls):
+        """
+        Rebuild every counter from a full recount up to the current max vote ids.
+
+        Returns:
+            dict: Number of admins whose counters were corrected
+        """
+        from accounts.services import AdminDeactivationService
+
+        watermark = cls._lock_watermark()
+        max_like_id, max_dislike_id = cls._max_vote_ids()
+        # Votes below the max that are not visible yet are counted later.
+        _, pending_likes = cls._gaps('like', 0, max_like_id, [])
+        _, pending_dislikes = cls._gaps('dislike', 0, max_dislike_id, [])
+
+        totals = AdminDeactivationService._feedback_metrics_by_admin(
+            like_ids=(0, max_like_id),
+            dislike_ids=(0, max_dislike_id),
+        )
+
+        counters = {counter.admin_userid: counter for counter in AdminFeedbackCounter.objects.all()}
+        now = timezone.now()
+        corrected = 0
+        to_create = []
+        to_update = []
+
+        for userid, metrics in totals.items():
+            counter = counters.pop(userid, None)
+            if counter is None:
+                to_create.append(AdminFeedbackCounter(
+                    admin_userid=userid,
+                    total_likes=metrics['total_likes'],
+                    total_dislikes=metrics['total_dislikes'],
+                ))
+                corrected += 1
+            elif (counter.total_likes, counter.total_dislikes) != (metrics['total_likes'], metrics['total_dislikes']):
+                counter.total_likes = metrics['total_likes']
+                counter.total_dislikes = metrics['total_dislikes']
+                counter.updated_at = now
+                to_update.append(counter)
+                corrected += 1
+
+        # Whatever is left has no votes any more.
+        stale = [counter.pk for counter in counters.values() if counter.total_likes or counter.total_dislikes]
+
+        if to_create:
+            AdminFeedbackCounter.objects.bulk_create(to_create)
+        if to_update:
+            AdminFeedbackCounter.objects.bulk_update(to_update, ['total_likes', 'total_dislikes', 'updated_at'])
+        if stale:
+            AdminFeedbackCounter.objects.filter(pk__in=stale).update(total_likes=0, total_dislikes=0, updated_at=now)
+        corrected += len(stale)
+
+        watermark.last_like_id = max_like_id
+        watermark.last_dislike_id = max_dislike_id
+        watermark.pending_like_ids = pending_likes
+        watermark.pending_dislike_ids = pending_dislikes
+        watermark.reconciled_at = now
+        watermark.save(update_fields=[
+            'last_like_id', 'last_dislike_id', 'pending_like_ids', 'pending_dislike_ids', 'reconciled_at'
+        ])
+
+        if corrected:
+            logger.warning(f"Feedback reconciliation corrected {corrected} admin counter(s)")
+        return {'corrected': corrected}
+
+    @classmethod
+    def current_metrics(cls):
+        """
+        Bring the counters up to date (reconciling when due) and return
+        metrics for every admin with feedback.
+
+        Returns:
+            dict: {admin_userid: metrics}
+        """
+        from accounts.services import AdminDeactivationService
+
+        reconciled_at = (
+            FeedbackWatermark.objects
+            .filter(name=cls.WATERMARK_NAME)
+            .values_list('reconciled_at', flat=True)
+            .first()
+        )
+        if reconciled_at is None or timezone.now() - reconciled_at >= cls._reconcile_interval():
+            cls.reconcile()
+        else:
+            cls.advance()
+
+        return {
+            userid: AdminDeactivationService._build_metrics(likes, dislikes)
+            for userid, likes, dislikes in AdminFeedbackCounter.objects.values_list(
+                'admin_userid', 'total_likes', 'total_dislikes'
+            )
+        }
@@ -0,0 +1,60 @@
+"""
+Password hashers with costs taken from settings.PASSWORD_HASHING.
+
+Django rehashes a password on the next successful login whenever the stored
+hash uses a different algorithm than PASSWORD_HASHERS[0] or different cost
+parameters (must_update), so changing either setting migrates accounts
+gradually without a reset.
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, ScryptPasswordHasher
+
+
+def _params(name):
+    config = getattr(settings, 'PASSWORD_HASHING', {}) or {}
+    return config.get(name, {})
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    """
+    scrypt with configurable N (WORK_FACTOR), r (BLOCK_SIZE) and p
+    (PARALLELISM). Memory per hash is roughly 128 * N * r bytes.
+    """
+
+    @property
+    def work_factor(self):
+        return _params('SCRYPT').get('WORK_FACTOR', ScryptPasswordHasher.work_factor)
+
+    @property
+    def block_size(self):
+        return _params('SCRYPT').get('BLOCK_SIZE', ScryptPasswordHasher.block_size)
+
+    @property
+    def parallelism(self):
+        return _params('SCRYPT').get('PARALLELISM', ScryptPasswordHasher.parallelism)
+
+    @property
+    def maxmem(self):
+        # A ceiling, not an allocation. OpenSSL's own default of 32 MiB is
+        # too low for N=2**15, r=8, and the ceiling must also cover hashes
+        # made with an older, larger cost until they are upgraded.
+        return _params('SCRYPT').get('MAXMEM', 256 * 1024 * 1024)
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2id with configurable TIME_COST, MEMORY_COST (KiB) and PARALLELISM.
+    Needs the argon2-cffi package (in requirements.txt).
+    """
+
+    @property
+    def time_cost(self):
+        return _params('ARGON2').get('TIME_COST', Argon2PasswordHasher.time_cost)
+
+    @property
+    def memory_cost(self):
+        return _params('ARGON2').get('MEMORY_COST', Argon2PasswordHasher.memory_cost)
+
+    @property
+    def parallelism(self):
+        return _params('ARGON2').get('PARALLELISM', Argon2PasswordHasher.parallelism)
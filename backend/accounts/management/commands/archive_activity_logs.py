@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from accounts.archive import archive_activity_logs, archive_dir
+
+
+class Command(BaseCommand):
+    help = "Move activity log entries past the retention period into the Parquet archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None, help="Retention in days (defaults to ACTIVITY_LOG_RETENTION).")
+        parser.add_argument("--dry-run", action="store_true", help="Only count the entries that would be archived.")
+
+    def handle(self, *args, **options):
+        result = archive_activity_logs(days=options["days"], dry_run=options["dry_run"])
+        if options["dry_run"]:
+            self.stdout.write(f"{result['archived']} entries would be archived")
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {result['archived']} entries into {result['files']} file(s) under {archive_dir()}"
+        ))
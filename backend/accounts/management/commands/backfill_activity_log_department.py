@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from accounts.models import ActivityLog, User
+
+
+class Command(BaseCommand):
+    help = "Fill ActivityLog.department from the performer for entries written before the column existed."
+
+    def handle(self, *args, **options):
+        departments = (
+            User.objects.exclude(department="")
+            .values_list("department", flat=True)
+            .distinct()
+        )
+        total = 0
+        for department in departments:
+            # One UPDATE per department; the subquery only reads accounts_user.
+            updated = ActivityLog.objects.filter(
+                department="",
+                performed_by__in=User.objects.filter(department=department),
+            ).update(department=department)
+            total += updated
+            if updated:
+                self.stdout.write(f"{department}: {updated}")
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {total} activity log entries"))
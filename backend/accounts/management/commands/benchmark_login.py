@@ -0,0 +1,85 @@
+import time
+
+from django.contrib.auth.hashers import get_hasher, get_hashers, make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.conf import settings
+from django.test import RequestFactory, override_settings
+
+from accounts.authentication import CustomTokenObtainPairView
+from accounts.models import User
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure password verifications (or full token requests) per second on "
+        "one core for each configured hasher."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--hasher", action="append", help="Algorithm name to benchmark (repeatable).")
+        parser.add_argument(
+            "--endpoint",
+            action="store_true",
+            help="Time full /api/token/ requests against a throwaway user (rolled back) "
+                 "instead of bare hash checks. Uses the preferred hasher.",
+        )
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        if iterations < 1:
+            raise CommandError("--iterations must be positive")
+
+        if options["endpoint"]:
+            self._report(get_hasher().algorithm + " via /api/token/", self._time_endpoint(iterations), iterations)
+            return
+
+        names = options["hasher"] or [hasher.algorithm for hasher in get_hashers()]
+        for name in names:
+            try:
+                hasher = get_hasher(name)
+                encoded = make_password("benchmark-password", hasher=name)
+            except ValueError as exc:
+                self.stderr.write(f"{name}: skipped ({exc})")
+                continue
+
+            started = time.perf_counter()
+            for _ in range(iterations):
+                hasher.verify("benchmark-password", encoded)
+            self._report(name, time.perf_counter() - started, iterations)
+
+    def _time_endpoint(self, iterations):
+        factory = RequestFactory()
+        view = CustomTokenObtainPairView.as_view()
+        elapsed = 0.0
+        # Log the benchmark logins inline so they roll back with the user.
+        inline_logs = override_settings(
+            ACTIVITY_LOG_WRITER={**getattr(settings, "ACTIVITY_LOG_WRITER", {}), "ASYNC": False}
+        )
+        try:
+            with inline_logs, transaction.atomic():
+                User.objects.create_user(userid="BENCH1", password="benchmark-password")
+                for _ in range(iterations):
+                    request = factory.post(
+                        "/api/token/",
+                        {"userid": "BENCH1", "password": "benchmark-password"},
+                        content_type="application/json",
+                    )
+                    started = time.perf_counter()
+                    response = view(request)
+                    elapsed += time.perf_counter() - started
+                    if response.status_code != 200:
+                        raise CommandError(f"Token request failed: {response.status_code} {response.data}")
+                raise _Rollback
+        except _Rollback:
+            pass
+        return elapsed
+
+    def _report(self, label, elapsed, iterations):
+        per_login_ms = elapsed / iterations * 1000
+        self.stdout.write(f"{label:40} {per_login_ms:8.1f} ms/login  {iterations / elapsed:8.1f} logins/s/core")
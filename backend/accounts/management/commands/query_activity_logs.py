@@ -0,0 +1,43 @@
+import csv
+import json
+
+from django.core.management.base import BaseCommand
+
+from accounts.archive import ARCHIVE_SCHEMA, query_archived_logs
+from admin_hub.parquet import date_or_datetime
+
+
+class Command(BaseCommand):
+    help = "Search archived activity log entries."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--department")
+        parser.add_argument("--action")
+        parser.add_argument("--target-user")
+        parser.add_argument("--performed-by")
+        parser.add_argument("--since", type=date_or_datetime, help="ISO date or datetime (inclusive).")
+        parser.add_argument("--until", type=date_or_datetime, help="ISO date (inclusive) or datetime (exclusive).")
+        parser.add_argument("--contains", help="Case-insensitive substring of details.")
+        parser.add_argument("--limit", type=int, default=100)
+        parser.add_argument("--format", choices=("json", "csv"), default="json")
+
+    def handle(self, *args, **options):
+        rows = query_archived_logs(
+            department=options["department"],
+            action=options["action"],
+            target_user=options["target_user"],
+            performed_by=options["performed_by"],
+            since=options["since"],
+            until=options["until"],
+            contains=options["contains"],
+            limit=options["limit"],
+        )
+
+        if options["format"] == "csv":
+            writer = csv.DictWriter(self.stdout, fieldnames=ARCHIVE_SCHEMA.names + ["date"])
+            writer.writeheader()
+            writer.writerows(rows)
+        else:
+            for row in rows:
+                self.stdout.write(json.dumps(row, default=str))
+        self.stderr.write(f"{len(rows)} matching entries")
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from accounts.scheduler import SchedulerThread, run_due_jobs
+
+
+class Command(BaseCommand):
+    help = "Run periodic admin maintenance jobs (auto-deactivation, reactivation, ...)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Run due jobs once and exit.")
+        parser.add_argument("--poll", type=int, default=None, help="Seconds between polls.")
+
+    def handle(self, *args, **options):
+        if options["once"]:
+            ran = run_due_jobs()
+            self.stdout.write(self.style.SUCCESS(f"Ran: {', '.join(ran) or 'nothing due'}"))
+            return
+
+        # Run in the foreground; the lease still lets web workers with
+        # AUTOSTART enabled coexist with this daemon.
+        scheduler = SchedulerThread(poll_seconds=options["poll"])
+        scheduler.run()
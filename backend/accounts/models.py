@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
+from django.utils import timezone
 
 class UserManager(BaseUserManager):
     def create_user(self, userid, password=None, is_root=False, department="", full_name="", **extra_fields):
@@ -60,12 +61,67 @@ class ActivityLog(models.Model):
     performed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='actions_performed')
     target_user = models.CharField(max_length=6)
     action = models.CharField(max_length=20, choices=ACTION_CHOICES)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the entry is built rather than on insert, since entries are
+    # written in batches by accounts.activity.
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
     details = models.TextField(blank=True)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
+    # Copy of performed_by.department so listing a department's log does not
+    # join accounts_user; blank for system entries.
+    department = models.CharField(max_length=100, blank=True)
     
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['department', '-timestamp', '-id'], name='activitylog_dept_ts_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.performed_by} - {self.action} - {self.target_user}"
+
+
+class AdminFeedbackCounter(models.Model):
+    """
+    Running like/dislike totals per allocated admin, advanced incrementally
+    from the vote tables by accounts.feedback.FeedbackCounterService.
+    """
+    admin_userid = models.CharField(max_length=255, unique=True)
+    total_likes = models.PositiveIntegerField(default=0)
+    total_dislikes = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.admin_userid} +{self.total_likes}/-{self.total_dislikes}"
+
+
+class FeedbackWatermark(models.Model):
+    """
+    Highest vote ids already folded into AdminFeedbackCounter, and the ids
+    below them that were missing when the watermark moved (votes whose
+    transaction had not committed yet), to be counted once they appear.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    last_like_id = models.BigIntegerField(default=0)
+    last_dislike_id = models.BigIntegerField(default=0)
+    pending_like_ids = models.JSONField(default=list, blank=True)
+    pending_dislike_ids = models.JSONField(default=list, blank=True)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.name} likes<={self.last_like_id} dislikes<={self.last_dislike_id}"
+
+
+class ScheduledJob(models.Model):
+    """
+    Run bookkeeping and leader lease for a periodic job of accounts.scheduler.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    last_run_at = models.DateTimeField(null=True, blank=True)
+    last_duration_ms = models.PositiveIntegerField(null=True, blank=True)
+    lease_owner = models.CharField(max_length=255, blank=True)
+    # Also set, with no owner, to hold off retries after a failure.
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    failures = models.PositiveIntegerField(default=0)
     
     def __str__(self):
-        return f"{self.performed_by} - {self.action} - {self.target_user}"
\ No newline at end of file
+        return f"{self.name} (last run {self.last_run_at})"
@@ -0,0 +1,181 @@
+"""
+In-project scheduler for periodic maintenance jobs.
+
+Replaces the old AutoDeactivationMiddleware, which ran the admin evaluation
+inline on whichever request found its LocMemCache timestamp expired - once per
+gunicorn worker, since that cache is per-process. Each job now has a row in
+ScheduledJob; a worker runs a job only after winning a conditional UPDATE that
+checks the interval and the lease, so across all workers and hosts every job
+runs exactly once per interval.
+
+A failing job is retried after RETRY_SECONDS, doubling with each further
+failure up to MAX_RETRY_SECONDS (or the job's interval, if shorter).
+
+A job is a dotted ``callable``, its ``interval`` in seconds and optional
+``kwargs`` for the call, so the same function can be scheduled twice with
+different arguments (the incremental and the full priority refresh).
+
+Run it either as a daemon (``manage.py run_scheduler``) or as a background
+thread in each web worker (``ADMIN_SCHEDULER["AUTOSTART"] = True``).
+"""
+from datetime import timedelta
+import importlib
+import logging
+import os
+import socket
+import threading
+import time
+
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+
+from .conf import ADMIN_SCHEDULER
+from .models import ScheduledJob
+
+logger = logging.getLogger(__name__)
+
+def get_jobs():
+    return ADMIN_SCHEDULER.JOBS
+
+
+def _resolve(path):
+    module_path, _, attr_path = path.partition(':')
+    target = importlib.import_module(module_path)
+    for attr in attr_path.split('.'):
+        target = getattr(target, attr)
+    return target
+
+
+def _owner():
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def claim_job(name, interval, now=None):
+    """
+    Try to take the lease for ``name`` if its interval has elapsed.
+
+    The check and the lease are a single UPDATE, so when several workers race
+    for the same job only one of them sees a matched row.
+
+    Returns:
+        datetime or None: The claim time on success
+    """
+    now = now or timezone.now()
+    lease_seconds = ADMIN_SCHEDULER.LEASE_SECONDS
+    ScheduledJob.objects.get_or_create(name=name)
+
+    claimed = ScheduledJob.objects.filter(name=name).filter(
+        Q(last_run_at__isnull=True) | Q(last_run_at__lte=now - timedelta(seconds=interval)),
+        Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lt=now),
+    ).update(
+        lease_owner=_owner(),
+        lease_expires_at=now + timedelta(seconds=lease_seconds),
+    )
+    return now if claimed else None
+
+
+def _retry_delay(failures, interval):
+    delay = ADMIN_SCHEDULER.RETRY_SECONDS * 2 ** (failures - 1)
+    return min(delay, ADMIN_SCHEDULER.MAX_RETRY_SECONDS, interval)
+
+
+def run_job(name, job, now=None):
+    """
+    Run one job if it is due and this worker wins the lease.
+
+    Returns:
+        bool: Whether the job ran
+    """
+    claimed_at = claim_job(name, job['interval'], now=now)
+    if claimed_at is None:
+        return False
+
+    started = time.monotonic()
+    try:
+        result = _resolve(job['callable'])(**job.get('kwargs', {}))
+    except Exception as exc:
+        # Release the lease without recording a run; the job is retried once
+        # the backoff has passed.
+        failures = (ScheduledJob.objects.filter(name=name).values_list('failures', flat=True).first() or 0) + 1
+        delay = _retry_delay(failures, job['interval'])
+        ScheduledJob.objects.filter(name=name, lease_owner=_owner()).update(
+            lease_owner='',
+            lease_expires_at=(now or timezone.now()) + timedelta(seconds=delay),
+            failures=failures,
+        )
+        logger.error(f"Scheduled job {name} failed ({failures}x, retry in {delay}s): {exc}", exc_info=True)
+        return False
+
+    duration_ms = int((time.monotonic() - started) * 1000)
+    recorded = ScheduledJob.objects.filter(name=name, lease_owner=_owner()).update(
+        last_run_at=claimed_at,
+        last_duration_ms=duration_ms,
+        lease_owner='',
+        lease_expires_at=None,
+        failures=0,
+    )
+    if not recorded:
+        logger.warning(
+            f"Scheduled job {name} outlived its lease and another worker took it over; run not recorded"
+        )
+    logger.info(f"Scheduled job {name} finished in {duration_ms}ms: {result}")
+    return True
+
+
+def run_due_jobs(now=None):
+    """
+    Run every job that is due.
+
+    Returns:
+        list: Names of the jobs this worker ran
+    """
+    ran = []
+    for name, job in get_jobs().items():
+        if run_job(name, job, now=now):
+            ran.append(name)
+    return ran
+
+
+class SchedulerThread(threading.Thread):
+    """
+    Daemon thread polling run_due_jobs() every POLL_SECONDS.
+    """
+
+    def __init__(self, poll_seconds=None):
+        super().__init__(name='admin-scheduler', daemon=True)
+        self.poll_seconds = poll_seconds or ADMIN_SCHEDULER.POLL_SECONDS
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        logger.info(f"Scheduler started ({len(get_jobs())} jobs, poll {self.poll_seconds}s)")
+        while not self._stop_event.is_set():
+            try:
+                run_due_jobs()
+            except Exception as exc:
+                logger.error(f"Scheduler poll failed: {exc}", exc_info=True)
+            finally:
+                close_old_connections()
+            self._stop_event.wait(self.poll_seconds)
+
+
+_thread = None
+_thread_lock = threading.Lock()
+
+
+def start_scheduler():
+    """
+    Start the per-process scheduler thread when ADMIN_SCHEDULER["AUTOSTART"]
+    is set. Safe to call more than once.
+    """
+    global _thread
+    if not ADMIN_SCHEDULER.AUTOSTART:
+        return None
+    with _thread_lock:
+        if _thread is None or not _thread.is_alive():
+            _thread = SchedulerThread()
+            _thread.start()
+    return _thread
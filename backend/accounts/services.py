@@ -4,6 +4,8 @@ from django.contrib.auth import get_user_model
 from datetime import timedelta
 import logging
 
+from accounts.user_cache import invalidate_user, invalidate_users
+
 logger = logging.getLogger(__name__)
 
 User = get_user_model()
@@ -58,12 +60,7 @@ class AdminDeactivationService:
         )
         
         # Check if thresholds are met
-        should_deactivate = (
-            metrics['total_dislikes'] >= cls.MIN_DISLIKES and
-            metrics['dislike_ratio'] >= cls.DISLIKE_RATIO_THRESHOLD
-        )
-        
-        if should_deactivate:
+        if cls._should_deactivate(metrics):
             return cls._auto_deactivate_admin(user, metrics)
         
         return {
@@ -72,48 +69,68 @@ class AdminDeactivationService:
             'metrics': metrics
         }
     
+    # Likes and dislikes for every report, tagged so one GROUP BY over the
+    # allocated admin yields both counts.
+    FEEDBACK_METRICS_SQL = """
+        SELECT r.allocated_to,
+               SUM(v.is_like) AS total_likes,
+               SUM(1 - v.is_like) AS total_dislikes
+        FROM report_issuereport r
+        JOIN (
+            SELECT issuereport_id, 1 AS is_like FROM report_issuereport_likes {like_filter}
+            UNION ALL
+            SELECT issuereport_id, 0 AS is_like FROM report_issuereport_dislikes {dislike_filter}
+        ) v ON v.issuereport_id = r.id
+        WHERE {where}
+        GROUP BY r.allocated_to
+    """
+    
     @classmethod
-    def _calculate_feedback_metrics(cls, admin_userid):
+    def _feedback_metrics_by_admin(cls, admin_userid=None, like_ids=None, dislike_ids=None):
         """
-        Calculate aggregated feedback metrics for an admin.
-        Queries likes/dislikes directly from database since IssueReportRemote
-        doesn't have ManyToMany fields.
-        """
-        from remote_report.models import IssueReportRemote
-        
-        # Get all report IDs allocated to this admin
-        report_ids = list(
-            IssueReportRemote.objects
-            .filter(allocated_to=admin_userid)
-            .values_list('id', flat=True)
-        )
+        Aggregate likes/dislikes per allocated admin in a single query.
         
-        if not report_ids:
-            return {
-                'total_dislikes': 0,
-                'total_likes': 0,
-                'total_votes': 0,
-                'dislike_ratio': 0
-            }
+        Args:
+            admin_userid: Restrict the aggregation to one admin (optional)
+            like_ids: (after, upto) vote id window for likes, optionally
+                with a third item of further ids to include (optional)
+            dislike_ids: same for dislikes (optional)
+            
+        Returns:
+            dict: {admin_userid: metrics} for admins with at least one vote
+        """
+        params = []
+        filters = {}
+        for name, window in (('like_filter', like_ids), ('dislike_filter', dislike_ids)):
+            if window is None:
+                filters[name] = ""
+            else:
+                after, upto, *extra = window
+                extra = list(extra[0]) if extra else []
+                filters[name] = "WHERE (id > %s AND id <= %s)"
+                params.extend((after, upto))
+                if extra:
+                    filters[name] += f" OR id IN ({', '.join(['%s'] * len(extra))})"
+                    params.extend(extra)
+        
+        if admin_userid is None:
+            where = "r.allocated_to IS NOT NULL"
+        else:
+            where = "r.allocated_to = %s"
+            params.append(admin_userid)
+        sql = cls.FEEDBACK_METRICS_SQL.format(where=where, **filters)
         
-        # Query likes and dislikes directly from database
         with connection.cursor() as cursor:
-            # Count total likes for these reports
-            cursor.execute("""
-                SELECT COUNT(*) 
-                FROM report_issuereport_likes 
-                WHERE issuereport_id IN %s
-            """, [tuple(report_ids)])
-            total_likes = cursor.fetchone()[0]
-            
-            # Count total dislikes for these reports
-            cursor.execute("""
-                SELECT COUNT(*) 
-                FROM report_issuereport_dislikes 
-                WHERE issuereport_id IN %s
-            """, [tuple(report_ids)])
-            total_dislikes = cursor.fetchone()[0]
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
         
+        return {
+            allocated_to: cls._build_metrics(int(likes or 0), int(dislikes or 0))
+            for allocated_to, likes, dislikes in rows
+        }
+    
+    @staticmethod
+    def _build_metrics(total_likes, total_dislikes):
         total_votes = total_dislikes + total_likes
         dislike_ratio = total_dislikes / total_votes if total_votes > 0 else 0
         
@@ -124,6 +141,23 @@ class AdminDeactivationService:
             'dislike_ratio': dislike_ratio
         }
     
+    @classmethod
+    def _should_deactivate(cls, metrics):
+        return (
+            metrics['total_dislikes'] >= cls.MIN_DISLIKES and
+            metrics['dislike_ratio'] >= cls.DISLIKE_RATIO_THRESHOLD
+        )
+    
+    @classmethod
+    def _calculate_feedback_metrics(cls, admin_userid):
+        """
+        Calculate aggregated feedback metrics for an admin.
+        Queries likes/dislikes directly from database since IssueReportRemote
+        doesn't have ManyToMany fields.
+        """
+        metrics = cls._feedback_metrics_by_admin(admin_userid)
+        return metrics.get(admin_userid) or cls._build_metrics(0, 0)
+    
     @classmethod
     @transaction.atomic
     def _auto_deactivate_admin(cls, user, metrics):
@@ -146,6 +180,7 @@ class AdminDeactivationService:
             'auto_deactivated_at',
             'auto_reactivation_scheduled'
         ])
+        invalidate_user(user.pk)
         
         # Log the activity
         cls._log_auto_deactivation(user, metrics)
@@ -166,9 +201,9 @@ class AdminDeactivationService:
         }
     
     @classmethod
-    def _log_auto_deactivation(cls, user, metrics):
+    def _auto_deactivation_log(cls, userid, metrics):
         """
-        Create an activity log entry for auto-deactivation.
+        Build (unsaved) the activity log entry for an auto-deactivation.
         """
         from accounts.models import ActivityLog
         
@@ -179,14 +214,73 @@ class AdminDeactivationService:
             f"Total votes: {metrics['total_votes']}"
         )
         
-        ActivityLog.objects.create(
+        return ActivityLog(
             performed_by=None,  # System action
-            target_user=user.userid,
+            target_user=userid,
             action='auto_deactivate',
             details=details,
             ip_address=None
         )
     
+    @classmethod
+    def _log_auto_deactivation(cls, user, metrics):
+        """
+        Create an activity log entry for auto-deactivation.
+        """
+        cls._auto_deactivation_log(user.userid, metrics).save()
+    
+    @classmethod
+    @transaction.atomic
+    def _bulk_auto_deactivate(cls, metrics_by_admin):
+        """
+        Deactivate every admin in ``metrics_by_admin`` with one UPDATE and one
+        bulk log insert.
+        
+        Rows are locked and re-checked first, so an admin that was deactivated
+        or promoted concurrently is skipped exactly like the per-admin path.
+        
+        Returns:
+            list: userids that were actually deactivated
+        """
+        from accounts.models import ActivityLog
+        
+        locked = list(
+            User.objects.select_for_update()
+            .filter(
+                userid__in=list(metrics_by_admin),
+                is_root=False,
+                is_active=True,
+                auto_deactivated=False,
+            )
+            .order_by('pk')
+            .values_list('pk', 'userid')
+        )
+        if not locked:
+            return []
+        
+        pks = [pk for pk, _ in locked]
+        userids = [userid for _, userid in locked]
+        User.objects.filter(pk__in=pks).update(
+            is_active=False,
+            auto_deactivated=True,
+            auto_deactivated_at=timezone.now(),
+            auto_reactivation_scheduled=False,  # Not using scheduled tasks
+        )
+        invalidate_users(pks)
+        ActivityLog.objects.bulk_create(
+            [cls._auto_deactivation_log(userid, metrics_by_admin[userid]) for userid in userids]
+        )
+        
+        for userid in userids:
+            metrics = metrics_by_admin[userid]
+            logger.warning(
+                f"Auto-deactivated admin {userid} - "
+                f"dislikes: {metrics['total_dislikes']}, "
+                f"ratio: {metrics['dislike_ratio']:.2%}"
+            )
+        
+        return userids
+    
     @classmethod
     @transaction.atomic
     def auto_reactivate_admin(cls, admin_userid):
@@ -234,6 +328,7 @@ class AdminDeactivationService:
             'auto_deactivated_at',
             'auto_reactivation_scheduled'
         ])
+        invalidate_user(user.pk)
         
         # Log the activity
         cls._log_auto_reactivation(user)
@@ -247,96 +342,146 @@ class AdminDeactivationService:
         }
     
     @classmethod
-    def _log_auto_reactivation(cls, user):
+    def _auto_reactivation_log(cls, userid):
         """
-        Create an activity log entry for auto-reactivation.
+        Build (unsaved) the activity log entry for an auto-reactivation.
         """
         from accounts.models import ActivityLog
         
-        ActivityLog.objects.create(
+        return ActivityLog(
             performed_by=None,  # System action
-            target_user=user.userid,
+            target_user=userid,
             action='auto_reactivate',
             details="Automatically reactivated after 24-hour suspension period",
             ip_address=None
         )
     
     @classmethod
-    def process_pending_reactivations(cls):
+    def _log_auto_reactivation(cls, user):
         """
-        Process all users who are due for reactivation.
-        This should be called periodically (e.g., by a cron job or middleware).
+        Create an activity log entry for auto-reactivation.
+        """
+        cls._auto_reactivation_log(user.userid).save()
+    
+    @classmethod
+    @transaction.atomic
+    def bulk_reactivate_due_admins(cls, now=None):
+        """
+        Reactivate every admin whose suspension has elapsed in one pass.
+        
+        Due rows are locked with SKIP LOCKED (so a concurrent run or a
+        per-user reactivation never blocks this one), flipped with a single
+        UPDATE, and logged with one bulk insert. The outcome per admin is the
+        same as auto_reactivate_admin.
         
         Returns:
-            dict: Summary of processed reactivations
+            list: userids that were reactivated
         """
-        reactivation_threshold = timezone.now() - timedelta(hours=cls.DEACTIVATION_DURATION_HOURS)
+        from accounts.models import ActivityLog
         
-        # Find users who should be reactivated
-        users_to_reactivate = User.objects.filter(
-            auto_deactivated=True,
-            is_active=False,
-            auto_deactivated_at__lte=reactivation_threshold
+        now = now or timezone.now()
+        reactivation_threshold = now - timedelta(hours=cls.DEACTIVATION_DURATION_HOURS)
+        
+        due = list(
+            User.objects.select_for_update(
+                skip_locked=connection.features.has_select_for_update_skip_locked
+            )
+            .filter(
+                auto_deactivated=True,
+                is_active=False,
+                auto_deactivated_at__lte=reactivation_threshold
+            )
+            .order_by('pk')
+            .values_list('pk', 'userid')
         )
+        if not due:
+            return []
         
-        reactivated_count = 0
-        failed_count = 0
+        pks = [pk for pk, _ in due]
+        User.objects.filter(pk__in=pks).update(
+            is_active=True,
+            auto_deactivated=False,
+            auto_deactivated_at=None,
+            auto_reactivation_scheduled=False
+        )
+        invalidate_users(pks)
+        userids = [userid for _, userid in due]
+        ActivityLog.objects.bulk_create(
+            [cls._auto_reactivation_log(userid) for userid in userids]
+        )
         
-        for user in users_to_reactivate:
-            result = cls.auto_reactivate_admin(user.userid)
-            if result['success']:
-                reactivated_count += 1
-            else:
-                failed_count += 1
-                logger.error(
-                    f"Failed to reactivate {user.userid}: {result.get('reason')}"
-                )
+        for userid in userids:
+            logger.info(f"Auto-reactivated admin {userid}")
+        
+        return userids
+    
+    @classmethod
+    def process_pending_reactivations(cls):
+        """
+        Process all users who are due for reactivation.
+        This is run periodically by accounts.scheduler.
+        
+        Returns:
+            dict: Summary of processed reactivations
+        """
+        reactivated_count = len(cls.bulk_reactivate_due_admins())
         
         logger.info(
-            f"Processed reactivations: {reactivated_count} successful, {failed_count} failed"
+            f"Processed reactivations: {reactivated_count} successful, 0 failed"
         )
         
         return {
             'reactivated': reactivated_count,
-            'failed': failed_count,
-            'total_processed': reactivated_count + failed_count
+            'failed': 0,
+            'total_processed': reactivated_count
         }
     
     @classmethod  # FIXED: Added missing @ symbol
     def evaluate_all_admins(cls):
         """
         Evaluate all non-root, active admins for auto-deactivation.
-        This should be called periodically (e.g., every 5 minutes via middleware or cron).
+        This is run every 5 minutes by accounts.scheduler.
+        
+        Feedback comes from the incremental per-admin counters and qualifying
+        admins are deactivated in bulk; thresholds match evaluate_admin_feedback.
         
         Returns:
             dict: Summary of evaluations
         """
-        admins = User.objects.filter(
-            is_root=False,
-            is_active=True,
-            auto_deactivated=False
+        admins = list(
+            User.objects.filter(
+                is_root=False,
+                is_active=True,
+                auto_deactivated=False
+            ).values_list('userid', flat=True)
         )
         
-        evaluated_count = 0
-        deactivated_count = 0
+        # Counters are advanced from the vote tables' high-water marks, so
+        # only votes cast since the previous run are read here.
+        from accounts.feedback import FeedbackCounterService
+        metrics_by_admin = FeedbackCounterService.current_metrics() if admins else {}
+        no_feedback = cls._build_metrics(0, 0)
+        
+        qualifying = {}
+        for userid in admins:
+            metrics = metrics_by_admin.get(userid, no_feedback)
+            logger.debug(
+                f"Feedback metrics for {userid}: "
+                f"dislikes={metrics['total_dislikes']}, "
+                f"total_votes={metrics['total_votes']}, "
+                f"ratio={metrics['dislike_ratio']:.2%}"
+            )
+            if cls._should_deactivate(metrics):
+                qualifying[userid] = metrics
         
-        for admin in admins:
-            # evaluate_admin_feedback handles its own transaction now
-            result = cls.evaluate_admin_feedback(admin.userid)
-            evaluated_count += 1
-            
-            if result.get('success'):
-                deactivated_count += 1
-                logger.warning(
-                    f"Auto-deactivated {admin.userid} during batch evaluation"
-                )
+        deactivated = cls._bulk_auto_deactivate(qualifying) if qualifying else []
         
         logger.info(
-            f"Batch evaluation: {evaluated_count} admins evaluated, "
-            f"{deactivated_count} deactivated"
+            f"Batch evaluation: {len(admins)} admins evaluated, "
+            f"{len(deactivated)} deactivated"
         )
         
         return {
-            'evaluated': evaluated_count,
-            'deactivated': deactivated_count
-        }
\ No newline at end of file
+            'evaluated': len(admins),
+            'deactivated': len(deactivated)
+        }
@@ -2,8 +2,6 @@
 Celery tasks for admin auto-deactivation feature.
 """
 from celery import shared_task
-from django.utils import timezone
-from datetime import timedelta
 import logging
 
 logger = logging.getLogger(__name__)
@@ -73,29 +71,15 @@ def check_missed_reactivations():
     
     This serves as a fallback in case scheduled tasks fail.
     """
-    from django.contrib.auth import get_user_model
     from accounts.services import AdminDeactivationService
     
-    User = get_user_model()
-    
-    # Find users who should be reactivated
-    reactivation_threshold = timezone.now() - timedelta(hours=24)
-    
-    missed_reactivations = User.objects.filter(
-        auto_deactivated=True,
-        is_active=False,
-        auto_deactivated_at__lte=reactivation_threshold
-    )
-    
-    count = 0
-    for user in missed_reactivations:
+    reactivated = AdminDeactivationService.bulk_reactivate_due_admins()
+    for userid in reactivated:
         logger.warning(
-            f"Found missed reactivation for {user.userid}, processing now"
+            f"Found missed reactivation for {userid}, processed now"
         )
-        result = AdminDeactivationService.auto_reactivate_admin(user.userid)
-        if result['success']:
-            count += 1
     
+    count = len(reactivated)
     if count > 0:
         logger.info(f"Processed {count} missed reactivations")
     
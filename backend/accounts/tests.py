@@ -1,3 +1,668 @@
-from django.test import TestCase
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+import tempfile
+from unittest.mock import Mock, patch
 
-# Create your tests here.
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from admin_hub import parquet
+from remote_report.models import IssueReportRemote
+
+from . import authentication, user_cache
+from .activity import ActivityLogWriter, log_activity
+from .archive import archive_activity_logs, query_archived_logs
+from .conf import ADMIN_SCHEDULER
+from .feedback import FeedbackCounterService
+from .models import ActivityLog, AdminFeedbackCounter, FeedbackWatermark, ScheduledJob, User
+from .scheduler import claim_job, run_due_jobs
+from .services import AdminDeactivationService
+
+VOTE_TABLES = ("report_issuereport_likes", "report_issuereport_dislikes")
+
+
+class FeedbackTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        existing = set(connection.introspection.table_names())
+        with connection.schema_editor() as schema_editor:
+            if IssueReportRemote._meta.db_table not in existing:
+                schema_editor.create_model(IssueReportRemote)
+            for table in VOTE_TABLES:
+                if table not in existing:
+                    schema_editor.execute(
+                        f"CREATE TABLE {table} ("
+                        "id integer PRIMARY KEY AUTOINCREMENT, "
+                        "issuereport_id bigint NOT NULL, "
+                        "customuser_id bigint NOT NULL)"
+                        if connection.vendor == "sqlite"
+                        else f"CREATE TABLE {table} ("
+                        "id bigint AUTO_INCREMENT PRIMARY KEY, "
+                        "issuereport_id bigint NOT NULL, "
+                        "customuser_id bigint NOT NULL)"
+                    )
+
+    def _create_admin(self, userid, **kwargs):
+        return User.objects.create_user(userid=userid, password="pass", department="Road", **kwargs)
+
+    def _create_report(self, allocated_to):
+        now = timezone.now()
+        return IssueReportRemote.objects.create(
+            location="Block A",
+            issue_description="Pothole",
+            issue_date=now,
+            status="resolved",
+            updated_at=now,
+            user_id=1,
+            issue_title="Pothole",
+            department="Road",
+            allocated_to=allocated_to,
+        )
+
+    def _vote(self, report, likes=0, dislikes=0):
+        with connection.cursor() as cursor:
+            for table, count in zip(VOTE_TABLES, (likes, dislikes)):
+                for voter in range(count):
+                    cursor.execute(
+                        f"INSERT INTO {table} (issuereport_id, customuser_id) VALUES (%s, %s)",
+                        [report.id, voter + 1],
+                    )
+
+
+class BatchFeedbackEvaluationTests(FeedbackTestCase):
+    def test_metrics_match_per_admin_calculation(self):
+        self._create_admin("A00001")
+        self._create_admin("A00002")
+        self._vote(self._create_report("A00001"), likes=3, dislikes=1)
+        self._vote(self._create_report("A00001"), likes=1, dislikes=5)
+        self._vote(self._create_report("A00002"), likes=2)
+
+        batch = AdminDeactivationService._feedback_metrics_by_admin()
+
+        for userid in ("A00001", "A00002"):
+            self.assertEqual(
+                batch[userid],
+                AdminDeactivationService._calculate_feedback_metrics(userid),
+            )
+        self.assertEqual(batch["A00001"]["total_dislikes"], 6)
+        self.assertEqual(batch["A00001"]["total_votes"], 10)
+
+    def test_evaluate_all_admins_deactivates_only_qualifying_admins(self):
+        self._create_admin("A00001")
+        self._create_admin("A00002")
+        self._create_admin("A00003")
+        self._create_admin("R00001", is_root=True)
+        self._vote(self._create_report("A00001"), likes=5, dislikes=20)
+        self._vote(self._create_report("A00002"), likes=20, dislikes=20)
+        self._vote(self._create_report("R00001"), dislikes=30)
+
+        result = AdminDeactivationService.evaluate_all_admins()
+
+        self.assertEqual(result, {"evaluated": 3, "deactivated": 1})
+        deactivated = User.objects.get(userid="A00001")
+        self.assertFalse(deactivated.is_active)
+        self.assertTrue(deactivated.auto_deactivated)
+        self.assertIsNotNone(deactivated.auto_deactivated_at)
+        self.assertTrue(User.objects.get(userid="A00002").is_active)
+        self.assertTrue(User.objects.get(userid="R00001").is_active)
+        log = ActivityLog.objects.get(action="auto_deactivate")
+        self.assertEqual(log.target_user, "A00001")
+        self.assertEqual(
+            log.details,
+            "Auto-deactivated due to negative feedback. "
+            "Dislikes: 20, Ratio: 80.00%, Total votes: 25",
+        )
+
+    def test_evaluate_all_admins_query_count_does_not_grow_with_admins(self):
+        def run_with_admins(count):
+            for index in range(count):
+                userid = f"A{User.objects.count():05d}"
+                self._create_admin(userid)
+                self._vote(self._create_report(userid), likes=1, dislikes=1)
+            with CaptureQueriesContext(connection) as ctx:
+                AdminDeactivationService.evaluate_all_admins()
+            return len(ctx.captured_queries)
+
+        run_with_admins(1)  # first run reconciles the counters from scratch
+        self.assertEqual(run_with_admins(2), run_with_admins(10))
+
+
+class FeedbackCounterTests(FeedbackTestCase):
+    def setUp(self):
+        self._create_admin("A00001")
+        self.report = self._create_report("A00001")
+
+    def test_advance_only_reads_votes_past_the_watermark(self):
+        self._vote(self.report, likes=2, dislikes=1)
+        FeedbackCounterService.reconcile()
+
+        self._vote(self.report, likes=1, dislikes=3)
+        with CaptureQueriesContext(connection) as ctx:
+            result = FeedbackCounterService.advance()
+
+        counter = AdminFeedbackCounter.objects.get(admin_userid="A00001")
+        self.assertEqual(result["admins_updated"], 1)
+        self.assertEqual((counter.total_likes, counter.total_dislikes), (3, 4))
+        delta_queries = [q["sql"] for q in ctx.captured_queries if "GROUP BY" in q["sql"]]
+        self.assertEqual(len(delta_queries), 1)
+        self.assertIn("id > ", delta_queries[0])
+
+    def test_advance_counts_votes_that_commit_after_a_higher_id(self):
+        self._vote(self.report, dislikes=2)
+        FeedbackCounterService.reconcile()
+        _, top = FeedbackCounterService._max_vote_ids()
+        insert = "INSERT INTO report_issuereport_dislikes (id, issuereport_id, customuser_id) VALUES (%s, %s, 9)"
+        with connection.cursor() as cursor:
+            # top + 1 is taken by a transaction that has not committed yet.
+            cursor.execute(insert, [top + 2, self.report.id])
+        FeedbackCounterService.advance()
+        self.assertEqual(AdminFeedbackCounter.objects.get(admin_userid="A00001").total_dislikes, 3)
+        self.assertIn(top + 1, FeedbackWatermark.objects.get().pending_dislike_ids)
+
+        with connection.cursor() as cursor:
+            cursor.execute(insert, [top + 1, self.report.id])
+        FeedbackCounterService.advance()
+
+        self.assertEqual(AdminFeedbackCounter.objects.get(admin_userid="A00001").total_dislikes, 4)
+        self.assertNotIn(top + 1, FeedbackWatermark.objects.get().pending_dislike_ids)
+
+    def test_reconcile_corrects_drift_from_removed_votes(self):
+        self._vote(self.report, likes=2, dislikes=2)
+        FeedbackCounterService.advance()
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM report_issuereport_dislikes")
+
+        FeedbackCounterService.advance()
+        self.assertEqual(AdminFeedbackCounter.objects.get(admin_userid="A00001").total_dislikes, 2)
+
+        result = FeedbackCounterService.reconcile()
+
+        counter = AdminFeedbackCounter.objects.get(admin_userid="A00001")
+        self.assertEqual(result["corrected"], 1)
+        self.assertEqual((counter.total_likes, counter.total_dislikes), (2, 0))
+        self.assertIsNotNone(FeedbackWatermark.objects.get().reconciled_at)
+
+
+class BulkReactivationTests(TestCase):
+    def _suspend(self, userid, hours_ago):
+        return User.objects.create_user(
+            userid=userid,
+            password="pass",
+            department="Road",
+            is_active=False,
+            auto_deactivated=True,
+            auto_deactivated_at=timezone.now() - timedelta(hours=hours_ago),
+        )
+
+    def test_due_admins_reactivated_with_one_update_and_bulk_log(self):
+        for index in range(5):
+            self._suspend(f"A{index:05d}", hours_ago=25)
+        self._suspend("A00099", hours_ago=2)
+
+        with CaptureQueriesContext(connection) as ctx:
+            result = AdminDeactivationService.process_pending_reactivations()
+
+        updates = [q for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(result, {"reactivated": 5, "failed": 0, "total_processed": 5})
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(User.objects.filter(is_active=True, auto_deactivated=False).count(), 5)
+        early = User.objects.get(userid="A00099")
+        self.assertFalse(early.is_active)
+        self.assertTrue(early.auto_deactivated)
+
+    def test_bulk_path_matches_per_user_path(self):
+        self._suspend("A00001", hours_ago=30)
+        self._suspend("A00002", hours_ago=30)
+
+        AdminDeactivationService.auto_reactivate_admin("A00001")
+        AdminDeactivationService.bulk_reactivate_due_admins()
+
+        fields = ("is_active", "auto_deactivated", "auto_deactivated_at", "auto_reactivation_scheduled")
+        single, bulk = (
+            User.objects.filter(userid=userid).values(*fields).get()
+            for userid in ("A00001", "A00002")
+        )
+        self.assertEqual(single, bulk)
+        single_log, bulk_log = (
+            ActivityLog.objects.filter(target_user=userid).values("action", "details", "performed_by").get()
+            for userid in ("A00001", "A00002")
+        )
+        self.assertEqual(single_log, bulk_log)
+
+
+class ActivityLogWriterTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(userid="R00001", password="pass", is_root=True)
+
+    def _entry(self, target="A00001"):
+        return ActivityLog(performed_by=self.admin, target_user=target, action="create")
+
+    def test_entries_are_written_in_batches_on_flush(self):
+        writer = ActivityLogWriter(batch_size=3, start_thread=False)
+        for index in range(5):
+            writer.add([self._entry(f"A{index:05d}")])
+        self.assertEqual(ActivityLog.objects.count(), 0)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(writer.flush(), 5)
+
+        inserts = [q for q in ctx.captured_queries if q["sql"].startswith("INSERT")]
+        self.assertEqual(len(inserts), 2)
+        self.assertEqual(ActivityLog.objects.count(), 5)
+
+    def test_full_queue_falls_back_to_synchronous_write(self):
+        writer = ActivityLogWriter(max_buffer=1, start_thread=False)
+        writer.add([self._entry("A00001")])
+        writer.add([self._entry("A00002")])
+
+        self.assertEqual(list(ActivityLog.objects.values_list("target_user", flat=True)), ["A00002"])
+        self.assertEqual(writer.stats["sync_fallbacks"], 1)
+        writer.flush()
+        self.assertEqual(ActivityLog.objects.count(), 2)
+
+    def test_shutdown_flushes_and_later_entries_are_synchronous(self):
+        writer = ActivityLogWriter(start_thread=False)
+        writer.add([self._entry("A00001")])
+        writer.shutdown()
+        self.assertEqual(ActivityLog.objects.count(), 1)
+
+        writer.add([self._entry("A00002")])
+        self.assertEqual(ActivityLog.objects.count(), 2)
+        self.assertEqual(len(writer), 0)
+
+    def test_failed_rows_are_counted_as_lost(self):
+        writer = ActivityLogWriter(start_thread=False)
+        good, bad = self._entry("A00001"), self._entry("A00002")
+        bad.save = Mock(side_effect=IntegrityError("bad row"))
+        writer.add([good])
+        writer.add([bad])
+
+        with patch.object(ActivityLog.objects, "bulk_create", side_effect=IntegrityError("batch")):
+            self.assertEqual(writer.flush(), 1)
+
+        self.assertEqual(ActivityLog.objects.count(), 1)
+        self.assertEqual(writer.stats["written"], 1)
+        self.assertEqual(writer.stats["lost"], 1)
+
+    def test_entries_are_queued_on_commit(self):
+        writer = ActivityLogWriter(start_thread=False)
+        with patch("accounts.activity.activity_log_writer", writer):
+            with self.captureOnCommitCallbacks(execute=True):
+                try:
+                    with transaction.atomic():
+                        log_activity(self.admin, "A00001", "create")
+                        raise IntegrityError("rolled back")
+                except IntegrityError:
+                    pass
+                log_activity(self.admin, "A00002", "create")
+
+        self.assertEqual([entry.target_user for entry in writer._buffer], ["A00002"])
+
+    @override_settings(ACTIVITY_LOG_WRITER={"ASYNC": False})
+    def test_login_is_logged(self):
+        response = self.client.post("/api/token/", {"userid": "R00001", "password": "pass"})
+
+        self.assertEqual(response.status_code, 200)
+        log = ActivityLog.objects.get(action="login")
+        self.assertEqual(log.performed_by, self.admin)
+        self.assertEqual(log.target_user, "R00001")
+
+
+class ActivityLogsViewTests(APITestCase):
+    def setUp(self):
+        self.root = User.objects.create_user(userid="R00001", password="pass", is_root=True, department="Road")
+        self.other_root = User.objects.create_user(userid="R00002", password="pass", is_root=True, department="Water")
+        self.client.force_authenticate(user=self.root)
+        self.now = timezone.now()
+
+    def _log(self, performer, target, action="create", minutes_ago=0):
+        return ActivityLog.objects.create(
+            performed_by=performer,
+            target_user=target,
+            action=action,
+            department=performer.department,
+            timestamp=self.now - timedelta(minutes=minutes_ago),
+        )
+
+    def test_cursor_walks_every_entry_once_across_equal_timestamps(self):
+        expected = [self._log(self.root, f"A{index:05d}", minutes_ago=index // 3).id for index in range(7)]
+        self._log(self.other_root, "B00001")
+
+        seen = []
+        url = "/api/activity-logs/?limit=3"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(row["id"] for row in response.data["results"])
+            url = response.data["next"]
+
+        self.assertEqual(sorted(seen), sorted(expected))
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_filters(self):
+        self._log(self.root, "A00001", action="create", minutes_ago=90)
+        self._log(self.root, "A00001", action="deactivate", minutes_ago=30)
+        self._log(self.root, "A00002", action="deactivate", minutes_ago=10)
+
+        response = self.client.get("/api/activity-logs/", {"action": "deactivate", "target_user": "A00001"})
+        self.assertEqual([row["target_user"] for row in response.data["results"]], ["A00001"])
+        self.assertIsNone(response.data["next"])
+
+        since = (self.now - timedelta(minutes=60)).isoformat()
+        response = self.client.get("/api/activity-logs/", {"since": since})
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_invalid_parameters_are_rejected(self):
+        for params in ({"cursor": "not-a-cursor"}, {"action": "explode"}, {"since": "yesterday"}):
+            self.assertEqual(self.client.get("/api/activity-logs/", params).status_code, 400)
+
+    def test_listing_does_not_join_users_for_filtering(self):
+        self._log(self.root, "A00001")
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get("/api/activity-logs/")
+        log_query = next(q["sql"] for q in ctx.captured_queries if "accounts_activitylog" in q["sql"])
+        self.assertIn('"accounts_activitylog"."department" =', log_query)
+        self.assertNotIn("JOIN", log_query)
+
+
+class ActivityLogArchiveTests(TestCase):
+    def setUp(self):
+        archive_root = tempfile.TemporaryDirectory()
+        self.addCleanup(archive_root.cleanup)
+        settings_override = override_settings(ACTIVITY_LOG_RETENTION={"DAYS": 30, "ARCHIVE_DIR": archive_root.name})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.root = User.objects.create_user(userid="R00001", password="pass", is_root=True, department="Road")
+        self.now = timezone.now()
+
+    def _log(self, days_ago, action="create", target="A00001", details=""):
+        return ActivityLog.objects.create(
+            performed_by=self.root,
+            target_user=target,
+            action=action,
+            details=details,
+            department="Road",
+            timestamp=self.now - timedelta(days=days_ago),
+        )
+
+    def test_old_entries_move_to_the_archive(self):
+        old = [self._log(40), self._log(40), self._log(35)]
+        recent = self._log(5)
+
+        result = archive_activity_logs(now=self.now)
+
+        self.assertEqual(result, {"archived": 3, "files": 2})
+        self.assertEqual(list(ActivityLog.objects.values_list("id", flat=True)), [recent.id])
+        archived = query_archived_logs()
+        self.assertEqual(sorted(row["id"] for row in archived), sorted(entry.id for entry in old))
+        self.assertEqual(archived[0]["performed_by_userid"], "R00001")
+        self.assertEqual(archive_activity_logs(now=self.now)["archived"], 0)
+
+    def test_rerun_after_a_crash_does_not_archive_entries_twice(self):
+        first = [self._log(40), self._log(40)]
+        with patch("accounts.archive.transaction.atomic", side_effect=RuntimeError("crash")):
+            with self.assertRaises(RuntimeError):
+                archive_activity_logs(now=self.now)
+        self.assertEqual(ActivityLog.objects.count(), 2)
+
+        # The next run's batch spans more ids for the same day.
+        later = self._log(40)
+        result = archive_activity_logs(now=self.now + timedelta(hours=1))
+
+        self.assertEqual(result["archived"], 3)
+        self.assertEqual(ActivityLog.objects.count(), 0)
+        self.assertEqual(
+            sorted(row["id"] for row in query_archived_logs()),
+            sorted(entry.id for entry in first + [later]),
+        )
+
+    def test_query_filters_archived_entries(self):
+        self._log(60, action="deactivate", target="A00001", details="Deactivated for review")
+        self._log(50, action="deactivate", target="A00002")
+        self._log(40, action="create", target="A00001", details="Created account")
+        archive_activity_logs(now=self.now)
+
+        self.assertEqual(len(query_archived_logs(action="deactivate")), 2)
+        self.assertEqual(len(query_archived_logs(target_user="A00001", contains="REVIEW")), 1)
+        since = (self.now - timedelta(days=55)).date()
+        self.assertEqual(
+            [row["target_user"] for row in query_archived_logs(since=since)],
+            ["A00001", "A00002"],
+        )
+        self.assertEqual(query_archived_logs(department="Water"), [])
+
+    @override_settings(TIME_ZONE="Asia/Kolkata")
+    def test_naive_bounds_are_in_the_configured_time_zone(self):
+        self.assertEqual(
+            parquet.bound(datetime(2026, 1, 1, 5, 30)),
+            datetime(2026, 1, 1, tzinfo=dt_timezone.utc),
+        )
+
+    def test_query_command_parses_since(self):
+        self._log(40, action="deactivate")
+        archive_activity_logs(now=self.now)
+        out, err = StringIO(), StringIO()
+
+        since = (self.now - timedelta(days=45)).date().isoformat()
+        call_command("query_activity_logs", "--since", since, stdout=out, stderr=err)
+        self.assertIn('"deactivate"', out.getvalue())
+        with self.assertRaisesMessage(CommandError, "Expected an ISO date or datetime, got 'yesterday'"):
+            call_command("query_activity_logs", "--since", "yesterday", stdout=out, stderr=err)
+
+
+@override_settings(ACTIVITY_LOG_WRITER={"ASYNC": False})
+class CachedJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        user_cache._user_cache.clear()
+        self.root = User.objects.create_user(userid="R00001", password="pass", is_root=True, department="Road")
+        self.admin = User.objects.create_user(userid="A00001", password="pass", department="Road")
+
+    def _token(self, userid):
+        response = self.client.post("/api/token/", {"userid": userid, "password": "pass"})
+        return f"Bearer {response.data['access']}"
+
+    def _me(self, token):
+        self.client.credentials(HTTP_AUTHORIZATION=token)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/api/me/")
+        self.client.credentials()
+        user_queries = [q for q in ctx.captured_queries if 'FROM "accounts_user"' in q["sql"]]
+        return response, len(user_queries)
+
+    def test_repeat_requests_do_not_load_the_user(self):
+        token = self._token("A00001")
+
+        first, first_queries = self._me(token)
+        second, second_queries = self._me(token)
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.data["userid"], "A00001")
+        self.assertEqual((first_queries, second_queries), (1, 0))
+
+    def test_deactivated_admin_is_locked_out_immediately(self):
+        admin_token = self._token("A00001")
+        root_token = self._token("R00001")
+        self.assertEqual(self._me(admin_token)[0].status_code, 200)
+
+        self.client.credentials(HTTP_AUTHORIZATION=root_token)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch("/api/users/A00001/toggle-status/")
+        self.client.credentials()
+
+        self.assertEqual(self._me(admin_token)[0].status_code, 401)
+
+    def test_auto_deactivation_invalidates_cached_user(self):
+        token = self._token("A00001")
+        self._me(token)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            AdminDeactivationService._bulk_auto_deactivate({"A00001": AdminDeactivationService._build_metrics(0, 20)})
+
+        self.assertEqual(self._me(token)[0].status_code, 401)
+
+    def test_reactivation_refreshes_a_stale_cached_user(self):
+        token = self._token("A00001")
+        self._me(token)
+        # Suspended and moved by a worker whose cache this process cannot see.
+        User.objects.filter(userid="A00001").update(
+            is_active=False,
+            auto_deactivated=True,
+            auto_deactivated_at=timezone.now() - timedelta(hours=30),
+            department="Water",
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            AdminDeactivationService.bulk_reactivate_due_admins()
+
+        response, user_queries = self._me(token)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["department"], "Water")
+        self.assertEqual(user_queries, 1)
+
+
+@override_settings(
+    ACTIVITY_LOG_WRITER={"ASYNC": False},
+    PASSWORD_HASHING={"SCRYPT": {"WORK_FACTOR": 2 ** 10}},
+    PASSWORD_HASHERS=[
+        "accounts.hashers.TunedScryptPasswordHasher",
+        "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    ],
+)
+class LoginHashingTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(userid="A00001", password="pass")
+
+    def _login(self):
+        return self.client.post("/api/token/", {"userid": "A00001", "password": "pass"})
+
+    def test_legacy_hash_is_upgraded_on_login(self):
+        User.objects.filter(pk=self.user.pk).update(password=make_password("pass", hasher="pbkdf2_sha256"))
+
+        self.assertEqual(self._login().status_code, 200)
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("scrypt$1024$"))
+        self.assertTrue(self.user.check_password("pass"))
+
+    def test_hash_with_outdated_cost_is_upgraded_on_login(self):
+        with override_settings(PASSWORD_HASHING={"SCRYPT": {"WORK_FACTOR": 2 ** 11}}):
+            User.objects.filter(pk=self.user.pk).update(password=make_password("pass"))
+
+        self._login()
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("scrypt$1024$"))
+
+    @override_settings(LOGIN_CONCURRENCY={"MAX_CONCURRENT": 1, "WAIT_SECONDS": 0.01})
+    def test_login_storm_gets_503_when_no_slot_frees_up(self):
+        slots = authentication.threading.BoundedSemaphore(1)
+        with patch("accounts.authentication._get_login_slots", return_value=slots):
+            slots.acquire()
+            try:
+                response = self._login()
+            finally:
+                slots.release()
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response["Retry-After"], "2")
+            self.assertEqual(self._login().status_code, 200)
+
+
+job_calls = []
+
+
+def record_job_call(**kwargs):
+    job_calls.append(kwargs)
+    return len(job_calls)
+
+
+def failing_job():
+    raise RuntimeError("boom")
+
+
+@override_settings(ADMIN_SCHEDULER={
+    "JOBS": {
+        "record": {"callable": "accounts.tests:record_job_call", "interval": 300},
+    },
+})
+class SchedulerTests(TestCase):
+    def setUp(self):
+        job_calls.clear()
+
+    def test_job_runs_once_per_interval(self):
+        now = timezone.now()
+
+        self.assertEqual(run_due_jobs(now=now), ["record"])
+        self.assertEqual(run_due_jobs(now=now + timedelta(seconds=299)), [])
+        self.assertEqual(run_due_jobs(now=now + timedelta(seconds=300)), ["record"])
+        self.assertEqual(len(job_calls), 2)
+        self.assertEqual(ScheduledJob.objects.get(name="record").last_run_at, now + timedelta(seconds=300))
+
+    @override_settings(ADMIN_SCHEDULER={
+        "JOBS": {
+            "record": {"callable": "accounts.tests:record_job_call", "interval": 60},
+            "record_full": {"callable": "accounts.tests:record_job_call", "kwargs": {"full": True}, "interval": 3600},
+        },
+    })
+    def test_jobs_pass_their_kwargs(self):
+        now = timezone.now()
+
+        self.assertEqual(run_due_jobs(now=now), ["record", "record_full"])
+        self.assertEqual(run_due_jobs(now=now + timedelta(seconds=60)), ["record"])
+        self.assertEqual(job_calls, [{}, {"full": True}, {}])
+
+    def test_default_jobs_include_a_full_priority_refresh(self):
+        full_refreshes = [
+            job for job in ADMIN_SCHEDULER.defaults['JOBS'].values()
+            if job["callable"] == "remote_report.priority:refresh_issue_priorities" and job.get("kwargs") == {"full": True}
+        ]
+        self.assertEqual(len(full_refreshes), 1)
+
+    def test_only_one_worker_wins_the_lease(self):
+        now = timezone.now()
+        first = claim_job("record", 300, now=now)
+        with patch("accounts.scheduler._owner", return_value="other-worker"):
+            second = claim_job("record", 300, now=now)
+
+        self.assertIsNotNone(first)
+        self.assertIsNone(second)
+
+    @override_settings(ADMIN_SCHEDULER={
+        "JOBS": {"fail": {"callable": "accounts.tests:failing_job", "interval": 300}},
+    })
+    def test_failed_job_is_retried_with_backoff(self):
+        now = timezone.now()
+        with self.assertLogs("accounts.scheduler", level="ERROR"):
+            self.assertEqual(run_due_jobs(now=now), [])
+
+        job = ScheduledJob.objects.get(name="fail")
+        self.assertIsNone(job.last_run_at)
+        self.assertEqual((job.lease_owner, job.failures), ("", 1))
+        self.assertIsNone(claim_job("fail", 300, now=now + timedelta(seconds=59)))
+
+        with self.assertLogs("accounts.scheduler", level="ERROR"):
+            self.assertEqual(run_due_jobs(now=now + timedelta(seconds=61)), [])
+        job.refresh_from_db()
+        self.assertEqual(job.failures, 2)
+        self.assertEqual(job.lease_expires_at, now + timedelta(seconds=61 + 120))
+
+    def test_run_that_outlived_its_lease_keeps_the_new_owners_bookkeeping(self):
+        now = timezone.now()
+
+        def taken_over():
+            ScheduledJob.objects.filter(name="record").update(lease_owner="other-worker")
+
+        with patch("accounts.tests.record_job_call", side_effect=taken_over):
+            run_due_jobs(now=now)
+
+        job = ScheduledJob.objects.get(name="record")
+        self.assertEqual(job.lease_owner, "other-worker")
+        self.assertIsNone(job.last_run_at)
@@ -0,0 +1,96 @@
+"""
+Per-process cache of JWT-authenticated users.
+
+Kept apart from accounts.authentication, which imports DRF views: this class
+is loaded while DRF reads DEFAULT_AUTHENTICATION_CLASSES, so it must not.
+"""
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+VERSION_KEY_PREFIX = 'jwt_user_version'
+DEFAULT_USER_CACHE_TTL = 10
+MAX_CACHED_USERS = 1000
+
+# {user_id: (version, expires_at, user)}; local to this worker process.
+_user_cache = {}
+_user_cache_lock = threading.Lock()
+
+
+def _user_cache_ttl():
+    return getattr(settings, 'JWT_USER_CACHE_TTL', DEFAULT_USER_CACHE_TTL)
+
+
+def _version_key(user_id):
+    return f"{VERSION_KEY_PREFIX}:{user_id}"
+
+
+def _bump_versions(user_ids):
+    for user_id in user_ids:
+        try:
+            cache.incr(_version_key(user_id))
+        except ValueError:
+            cache.set(_version_key(user_id), 1, None)
+    with _user_cache_lock:
+        for user_id in user_ids:
+            _user_cache.pop(user_id, None)
+
+
+def invalidate_users(user_ids):
+    """
+    Drop cached authentication for ``user_ids`` (primary keys) once the
+    current transaction commits. Workers that cannot see this process's
+    cache still pick the change up within JWT_USER_CACHE_TTL seconds, or
+    immediately when CACHES is shared between them.
+    """
+    user_ids = list(user_ids)
+    if user_ids:
+        transaction.on_commit(lambda: _bump_versions(user_ids))
+
+
+def invalidate_user(user_id):
+    invalidate_users([user_id])
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that serves the user row from a short-lived per-process
+    cache instead of loading it on every request.
+
+    Entries are keyed on the user id and a version counter kept in the Django
+    cache; invalidate_user() bumps the version. Only active users are cached.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            return super().get_user(validated_token)
+
+        version = cache.get(_version_key(user_id), 0)
+        now = time.monotonic()
+        with _user_cache_lock:
+            entry = _user_cache.get(user_id)
+        if entry is not None and entry[0] == version and entry[1] > now:
+            user = entry[2]
+            if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed("The user's password has been changed.", code="password_changed")
+            # A copy, so a view mutating request.user cannot leak into other requests.
+            return copy.copy(user)
+
+        user = super().get_user(validated_token)
+        with _user_cache_lock:
+            if len(_user_cache) >= MAX_CACHED_USERS:
+                _user_cache.clear()
+            _user_cache[user_id] = (version, now + _user_cache_ttl(), copy.copy(user))
+        return user
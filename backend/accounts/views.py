@@ -8,27 +8,14 @@ from rest_framework.views import APIView
 from rest_framework.exceptions import ValidationError
 from django.conf import settings
 from .models import ActivityLog
+from .activity import log_activity
+from .user_cache import invalidate_user
+from admin_hub.pagination import KeysetPagination, parse_time_bound
+from django.db.models import Prefetch
 import boto3
 import uuid
 import os
 
-def log_activity(performed_by, target_user, action, details="", request=None):
-    ip_address = None
-    if request:
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip_address = x_forwarded_for.split(',')[0]
-        else:
-            ip_address = request.META.get('REMOTE_ADDR')
-    
-    ActivityLog.objects.create(
-        performed_by=performed_by,
-        target_user=target_user,
-        action=action,
-        details=details,
-        ip_address=ip_address
-    )
-
 class RegisterView(generics.CreateAPIView):
     serializer_class = RegisterSerializer
     permission_classes = [IsAuthenticated, IsRootUser]
@@ -94,6 +81,7 @@ class DeleteUserView(APIView):
                 request=request
             )
             
+            invalidate_user(user.pk)
             user.delete()
             return Response(
                 {"message": f"User {userid} deleted successfully"},
@@ -128,6 +116,7 @@ class ToggleUserStatusView(APIView):
             
             user.is_active = not user.is_active
             user.save()
+            invalidate_user(user.pk)
             
             action = 'activate' if user.is_active else 'deactivate'
             log_activity(
@@ -152,12 +141,34 @@ class ActivityLogsView(APIView):
     permission_classes = [IsAuthenticated, IsRootUser]
 
     def get(self, request):
-        logs = ActivityLog.objects.filter(
-            performed_by__department=request.user.department
-        ).select_related('performed_by')[:100]
-        
-        serializer = ActivityLogSerializer(logs, many=True)
-        return Response(serializer.data)
+        logs = ActivityLog.objects.filter(department=request.user.department)
+
+        action = request.query_params.get('action')
+        if action:
+            if action not in dict(ActivityLog.ACTION_CHOICES):
+                raise ValidationError({'action': f"Unknown action '{action}'."})
+            logs = logs.filter(action=action)
+
+        target_user = request.query_params.get('target_user')
+        if target_user:
+            logs = logs.filter(target_user=target_user)
+
+        since = parse_time_bound(request, 'since')
+        if since:
+            logs = logs.filter(timestamp__gte=since)
+        until = parse_time_bound(request, 'until')
+        if until:
+            logs = logs.filter(timestamp__lt=until)
+
+        # Performers are fetched for the page only, so the range scan on
+        # (department, timestamp, id) never joins accounts_user.
+        logs = logs.prefetch_related(
+            Prefetch('performed_by', queryset=get_user_model().objects.only('id', 'userid', 'full_name'))
+        )
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(logs, request, view=self)
+        serializer = ActivityLogSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
 class PresignS3UploadView(APIView):
     permission_classes = [IsAuthenticated]
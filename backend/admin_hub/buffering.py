@@ -0,0 +1,124 @@
+"""
+In-process write-behind buffer, shared by the activity log writer
+(accounts.activity) and the sensor telemetry writer (sensor_alerts.telemetry).
+"""
+import logging
+import threading
+
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class BufferedWriter:
+    """
+    Collects items in memory and hands them to write() in batches of at most
+    ``batch_size`` from a daemon thread, as soon as a batch is waiting or
+    every ``flush_interval`` seconds. Items that do not fit in ``max_buffer``,
+    or arrive after shutdown(), go to overflow() instead.
+
+    Subclasses implement write(batch), returning how many items were stored,
+    and overflow(items). Register shutdown() with atexit so the buffer is
+    written when the process exits.
+    """
+
+    thread_name = "buffered-writer"
+
+    def __init__(self, batch_size, flush_interval, max_buffer, start_thread=True):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._start_thread = start_thread
+        self._thread = None
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self.stats = {"buffered": 0, "written": 0, "lost": 0, "batches": 0}
+
+    def __len__(self):
+        return len(self._buffer)
+
+    def count(self, name, amount=1):
+        # Updated from request threads and the writer thread.
+        with self._lock:
+            self.stats[name] = self.stats.get(name, 0) + amount
+
+    def write(self, batch):
+        raise NotImplementedError
+
+    def overflow(self, items):
+        raise NotImplementedError
+
+    def _ensure_thread(self):
+        if not self._start_thread or self._stopped.is_set():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+                self._thread.start()
+
+    def add(self, items):
+        """Buffer ``items`` (a list) for the next flush."""
+        if self._stopped.is_set():
+            self.overflow(items)
+            return
+        with self._lock:
+            room = max(self.max_buffer - len(self._buffer), 0)
+            accepted, rejected = items[:room], items[room:]
+            self._buffer.extend(accepted)
+            self.stats["buffered"] += len(accepted)
+            full = len(self._buffer) >= self.batch_size
+        if rejected:
+            self.overflow(rejected)
+        if accepted:
+            self._ensure_thread()
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        """
+        Write everything buffered so far from the calling thread.
+
+        Returns:
+            int: Number of items stored
+        """
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = self._buffer[:self.batch_size]
+                    del self._buffer[:self.batch_size]
+                if not batch:
+                    return written
+                try:
+                    saved = self.write(batch)
+                except Exception:
+                    logger.exception("%s lost a batch of %s", self.thread_name, len(batch))
+                    saved = 0
+                self.count("batches")
+                self.count("written", saved)
+                self.count("lost", len(batch) - saved)
+                written += saved
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("%s flush failed", self.thread_name)
+            finally:
+                close_old_connections()
+
+    def shutdown(self):
+        """
+        Stop the background thread and write whatever is still buffered.
+        """
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
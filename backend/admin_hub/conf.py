@@ -0,0 +1,29 @@
+"""
+Tunables for the feature modules.
+
+Each group of settings is declared once, with its defaults, as an AppSettings
+in its app's ``conf`` module. A dict of the same name in Django settings
+overrides it key by key; settings/base.py only fills in the keys that come
+from the environment.
+"""
+from django.conf import settings
+
+
+class AppSettings:
+    """
+    One settings group, read as attributes (``SENSOR_INGEST.MODE``). Django
+    settings are looked up on every access, so override_settings applies.
+    """
+
+    def __init__(self, name, defaults):
+        self.name = name
+        self.defaults = defaults
+
+    def __getattr__(self, key):
+        if key.startswith("_") or key not in self.defaults:
+            raise AttributeError(f"{self.name} has no setting {key!r}")
+        overrides = getattr(settings, self.name, None) or {}
+        return overrides.get(key, self.defaults[key])
+
+    def __repr__(self):
+        return f"<AppSettings {self.name}>"
@@ -0,0 +1,124 @@
+"""
+Keyset (seek) pagination shared by the list endpoints.
+
+Pages are addressed by the sort key of the last row returned rather than by
+an OFFSET, so every page is an index range scan no matter how deep the client
+has scrolled, and rows inserted at the head do not shift later pages.
+"""
+import base64
+from datetime import datetime, time, timedelta
+import json
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def parse_time_bound(request, name):
+    """
+    Parse the ``since``/``until`` query parameter ``name`` as an aware
+    datetime. A bare date covers the whole day, so ``until=2026-02-14``
+    ends at midnight of the 15th. Use with ``__gte`` for since and ``__lt``
+    for until.
+    """
+    raw = request.query_params.get(name)
+    if not raw:
+        return None
+    value = parse_datetime(raw)
+    if value is None:
+        day = parse_date(raw)
+        if day is None:
+            raise ValidationError({name: "Expected an ISO date or datetime."})
+        value = datetime.combine(day, time.min)
+        if name == 'until':
+            value += timedelta(days=1)
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginates a queryset ordered descending on (timestamp_field, id_field).
+
+    Responses are ``{"results": [...], "next": <url or null>}``.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'limit'
+    page_size = 50
+    max_page_size = 200
+    timestamp_field = 'timestamp'
+    id_field = 'id'
+
+    def __init__(self, timestamp_field=None, id_field=None, page_size=None):
+        self.timestamp_field = timestamp_field or self.timestamp_field
+        self.id_field = id_field or self.id_field
+        self.page_size = page_size or self.page_size
+        self.next_cursor = None
+
+    def get_page_size(self, request):
+        raw = request.query_params.get(self.page_size_query_param)
+        if raw is None:
+            return self.page_size
+        try:
+            return max(1, min(self.max_page_size, int(raw)))
+        except ValueError:
+            raise ValidationError({self.page_size_query_param: "Must be an integer."})
+
+    @staticmethod
+    def encode_cursor(timestamp, row_id):
+        payload = json.dumps([timestamp.isoformat(), row_id]).encode()
+        return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            raw_timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded))
+            timestamp = parse_datetime(raw_timestamp)
+            if timestamp is None or not isinstance(row_id, int):
+                raise ValueError
+        except (ValueError, TypeError):
+            raise ValidationError({'cursor': "Invalid cursor."})
+        return timestamp, row_id
+
+    def _row_key(self, row):
+        if isinstance(row, dict):
+            return row[self.timestamp_field], row[self.id_field]
+        return getattr(row, self.timestamp_field), getattr(row, self.id_field)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            timestamp, row_id = self.decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(**{f'{self.timestamp_field}__lt': timestamp})
+                | Q(**{self.timestamp_field: timestamp, f'{self.id_field}__lt': row_id})
+            )
+
+        queryset = queryset.order_by(f'-{self.timestamp_field}', f'-{self.id_field}')
+        # One extra row tells us whether there is a next page without a COUNT.
+        rows = list(queryset[:page_size + 1])
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            self.next_cursor = self.encode_cursor(*self._row_key(rows[-1]))
+        else:
+            self.next_cursor = None
+        return rows
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({'results': data, 'next': self.get_next_link()})
@@ -0,0 +1,163 @@
+"""
+Helpers for the date-partitioned Parquet archives.
+
+Archives are plain directories laid out hive-style (``date=YYYY-MM-DD/``) so
+that pyarrow.dataset can prune whole days from a filter on ``date`` and push
+the remaining predicates down to row-group statistics.
+"""
+import argparse
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+PARTITION_FIELD = 'date'
+COMPRESSION = 'zstd'
+
+
+def partition_dir(root, day):
+    return Path(root) / f"{PARTITION_FIELD}={day.isoformat()}"
+
+
+def write_partition(root, day, rows, schema, basename):
+    """
+    Write ``rows`` (a list of dicts matching ``schema``) as one file in the
+    partition for ``day``. Writing the same basename again replaces the file,
+    which keeps re-runs after a crash idempotent.
+
+    Returns:
+        Path: The file written
+    """
+    return write_table(root, day, pa.Table.from_pylist(rows, schema=schema), basename)
+
+
+def write_table(root, day, table, basename):
+    """Like write_partition() for an existing pyarrow Table."""
+    directory = partition_dir(root, day)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{basename}.parquet"
+    # Dot-prefixed so dataset discovery skips a half-written file.
+    tmp_path = directory / f".{basename}.parquet.tmp"
+
+    pq.write_table(table, tmp_path, compression=COMPRESSION)
+    tmp_path.replace(path)
+    return path
+
+
+def partition_files(root):
+    """
+    Returns:
+        dict: date -> sorted list of the finished files in that partition
+    """
+    partitions = {}
+    root = Path(root)
+    if not root.is_dir():
+        return partitions
+    for directory in sorted(root.glob(f"{PARTITION_FIELD}=*")):
+        day = datetime.strptime(directory.name.split("=", 1)[1], "%Y-%m-%d").date()
+        files = sorted(path for path in directory.glob("*.parquet") if not path.name.startswith("."))
+        if files:
+            partitions[day] = files
+    return partitions
+
+
+def bound(value, end=False):
+    """
+    A filter bound as an aware UTC datetime. A naive datetime is taken to be
+    in TIME_ZONE. A date covers the whole (UTC) day: ``since`` starts it and
+    ``until`` (``end=True``) ends it.
+    """
+    if isinstance(value, datetime):
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        return value.astimezone(dt_timezone.utc)
+    if end:
+        value += timedelta(days=1)
+    return datetime.combine(value, time.min, tzinfo=dt_timezone.utc)
+
+
+def date_or_datetime(value):
+    """
+    argparse ``type`` for the ``--since``/``--until`` options of the query
+    commands.
+    """
+    parsed = parse_datetime(value) or parse_date(value)
+    if parsed is None:
+        raise argparse.ArgumentTypeError(f"Expected an ISO date or datetime, got '{value}'")
+    return parsed
+
+
+def dataset(root, schema):
+    """
+    Open every partition under ``root``; ``date`` is exposed as a string column.
+    """
+    partitioning = ds.partitioning(
+        pa.schema([(PARTITION_FIELD, pa.string())]), flavor='hive'
+    )
+    return ds.dataset(
+        str(root),
+        schema=schema.append(pa.field(PARTITION_FIELD, pa.string())),
+        format='parquet',
+        partitioning=partitioning,
+    )
+
+
+def scan(root, schema, filter=None, columns=None, limit=None):
+    """
+    Scan the archive under ``root`` with ``filter`` pushed down to pyarrow.
+
+    Returns:
+        pyarrow.Table: Matching rows (empty when the archive does not exist)
+    """
+    if not Path(root).is_dir():
+        empty = schema.append(pa.field(PARTITION_FIELD, pa.string())).empty_table()
+        return empty.select(columns) if columns else empty
+
+    archive = dataset(root, schema)
+    if limit is not None:
+        return archive.head(limit, columns=columns, filter=filter)
+    return archive.to_table(columns=columns, filter=filter)
+
+
+def query(root, schema, since=None, until=None, equals=None, conditions=(),
+          order_by=('timestamp',), limit=None, columns=None):
+    """
+    Search the archive under ``root``. ``since``/``until`` (dates or
+    datetimes) bound the ``timestamp`` column and prune whole partitions;
+    ``equals`` maps column names to values, empty values are ignored.
+    Further pyarrow ``conditions`` are AND-ed in.
+
+    Returns:
+        list: Matching rows as dicts, sorted by ``order_by`` descending
+    """
+    field = ds.field
+    timestamp_type = schema.field('timestamp').type
+    conditions = list(conditions)
+    if since is not None:
+        since = bound(since)
+        conditions.append(field(PARTITION_FIELD) >= since.date().isoformat())
+        conditions.append(field('timestamp') >= pa.scalar(since, timestamp_type))
+    if until is not None:
+        until = bound(until, end=True)
+        conditions.append(field(PARTITION_FIELD) <= until.date().isoformat())
+        conditions.append(field('timestamp') < pa.scalar(until, timestamp_type))
+    for name, value in (equals or {}).items():
+        if value:
+            conditions.append(field(name) == value)
+
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+
+    # Sorting needs every match, so the limit is applied after the scan.
+    table = scan(root, schema, filter=expression, columns=columns)
+    sort_keys = [(name, 'descending') for name in order_by if name in table.column_names]
+    if sort_keys:
+        table = table.sort_by(sort_keys)
+    if limit is not None:
+        table = table.slice(0, limit)
+    return table.to_pylist()
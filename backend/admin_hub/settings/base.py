@@ -8,6 +8,19 @@ load_dotenv()
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
 
+def _from_env(**variables):
+    """
+    Overrides for an AppSettings group (admin_hub.conf) from the environment.
+    Each key maps to (variable, parse); variables that are not set are left
+    out, so the group's defaults in its app's conf module apply.
+    """
+    return {key: parse(os.environ[name]) for key, (name, parse) in variables.items() if name in os.environ}
+
+
+def _flag(value):
+    return value.lower() == "true"
+
+
 # SECURITY
 SECRET_KEY = os.environ.get("DJANGO_SECRET_KEY")
 
@@ -44,8 +57,6 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-
-    "accounts.middleware.AutoDeactivationMiddleware",
 ]
 
 ROOT_URLCONF = "admin_hub.urls"
@@ -66,13 +77,16 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "admin_hub.wsgi.application"
+# The live sensor alert stream is only served by the ASGI application; under
+# WSGI it answers 503 unless DEBUG is on.
+ASGI_APPLICATION = "admin_hub.asgi.application"
 
 # Auth
 AUTH_USER_MODEL = "accounts.User"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.user_cache.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
@@ -86,6 +100,52 @@ CACHES = {
        }
    }
 
+# Password hashing. PASSWORD_HASHERS[0] hashes new passwords; the rest only
+# verify older hashes, which are upgraded on the next successful login.
+# Measure candidate costs with `manage.py benchmark_login`.
+# scrypt N=2**15 (Django defaults to 2**14) measured ~105 ms and 32 MiB per
+# verification on one core, ~225 ms at 2**16. That keeps a login near 100 ms
+# and LOGIN_CONCURRENCY at 2 bounds hashing memory to 64 MiB per worker.
+# "argon2" needs the argon2-cffi package from requirements.txt.
+PASSWORD_HASHING = {
+    "ALGORITHM": os.environ.get("PASSWORD_HASH_ALGORITHM", "scrypt"),
+    "SCRYPT": {
+        "WORK_FACTOR": int(os.environ.get("SCRYPT_WORK_FACTOR", 2 ** 15)),
+        "BLOCK_SIZE": 8,
+        "PARALLELISM": 1,
+    },
+    "ARGON2": {
+        "TIME_COST": int(os.environ.get("ARGON2_TIME_COST", 2)),
+        "MEMORY_COST": int(os.environ.get("ARGON2_MEMORY_COST", 65536)),
+        "PARALLELISM": 1,
+    },
+}
+_PREFERRED_HASHERS = {
+    "scrypt": "accounts.hashers.TunedScryptPasswordHasher",
+    "argon2": "accounts.hashers.TunedArgon2PasswordHasher",
+}
+PASSWORD_HASHERS = [_PREFERRED_HASHERS[PASSWORD_HASHING["ALGORITHM"]]] + [
+    hasher for hasher in (
+        "accounts.hashers.TunedScryptPasswordHasher",
+        "accounts.hashers.TunedArgon2PasswordHasher",
+        "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+        "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    )
+    if hasher != _PREFERRED_HASHERS[PASSWORD_HASHING["ALGORITHM"]]
+]
+
+# Concurrent password checks per worker process on the token endpoint;
+# further logins wait up to WAIT_SECONDS and then get a 503.
+LOGIN_CONCURRENCY = {
+    "MAX_CONCURRENT": int(os.environ.get("LOGIN_MAX_CONCURRENT", 2)),
+    "WAIT_SECONDS": 2.0,
+}
+
+# Seconds an authenticated user row is reused by CachedJWTAuthentication.
+# Also bounds how long a deactivated admin keeps access on other workers when
+# CACHES is per-process.
+JWT_USER_CACHE_TTL = 10
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
@@ -98,6 +158,31 @@ ADMIN_AUTO_DEACTIVATION = {
     'DEACTIVATION_DURATION_HOURS': 24,
 }
 
+# Feature settings groups. Their defaults and what each key means live in the
+# app's conf module (accounts.conf, remote_report.conf, sensor_alerts.conf);
+# only the keys set from the environment are filled in here. Any key can be
+# overridden by adding it to the dict.
+ADMIN_SCHEDULER = _from_env(AUTOSTART=("ADMIN_SCHEDULER_AUTOSTART", _flag))
+ACTIVITY_LOG_WRITER = _from_env(ASYNC=("ACTIVITY_LOG_ASYNC", _flag))
+ACTIVITY_LOG_RETENTION = _from_env(
+    DAYS=("ACTIVITY_LOG_RETENTION_DAYS", int),
+    ARCHIVE_DIR=("ACTIVITY_LOG_ARCHIVE_DIR", Path),
+)
+SENSOR_INGEST = _from_env(
+    RAW_PAYLOAD=("SENSOR_RAW_PAYLOAD", str),
+    MODE=("SENSOR_INGEST_MODE", str),
+    SPOOL_PATH=("SENSOR_SPOOL_PATH", Path),
+)
+SENSOR_TELEMETRY = _from_env(
+    ENABLED=("SENSOR_TELEMETRY_ENABLED", _flag),
+    TELEMETRY_DIR=("SENSOR_TELEMETRY_DIR", Path),
+)
+SENSOR_ALERT_NOTIFIER = _from_env(AUTOSTART=("SENSOR_ALERT_NOTIFIER_AUTOSTART", _flag))
+DUPLICATE_DETECTION = _from_env(WARM_ON_START=("DUPLICATE_INDEX_WARM", _flag))
+
+# Seconds a reporter's trust_score / deactivated_until may be served from cache
+REPORTER_STATE_CACHE_TTL = 30
+
 # Database
 DATABASES = {
     "default": {
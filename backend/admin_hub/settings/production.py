@@ -4,6 +4,10 @@ import os
 DEBUG = False
 APPEND_SLASH = False
 
+# Serve admin_hub.asgi:application (e.g. `uvicorn admin_hub.asgi:application`
+# or gunicorn with uvicorn workers). The sensor alert stream is long-lived and
+# answers 503 under the WSGI application.
+
 ALLOWED_HOSTS = os.environ.get("ALLOWED_HOSTS", "").split(",")
 
 CORS_ALLOW_CREDENTIALS=True
@@ -18,3 +18,13 @@ os.environ.setdefault(
 
 
 application = get_wsgi_application()
+
+from accounts.scheduler import start_scheduler  # noqa: E402
+from remote_report.duplicates import start_duplicate_index  # noqa: E402
+from sensor_alerts.notifier import start_alert_notifier  # noqa: E402
+from sensor_alerts.spool import start_spool_flusher  # noqa: E402
+
+start_scheduler()
+start_duplicate_index()
+start_spool_flusher()
+start_alert_notifier()
@@ -0,0 +1,22 @@
+from admin_hub.conf import AppSettings
+
+# Near-duplicate report detection (remote_report.duplicates, MinHash/LSH
+# over location + text)
+DUPLICATE_DETECTION = AppSettings("DUPLICATE_DETECTION", {
+    "THRESHOLD": 0.45,
+    "REFRESH_INTERVAL": 5,
+    "MAX_DESCRIPTION_CHARS": 500,
+    # Refreshes re-read this many seconds before the last change seen, for
+    # transactions that stamped updated_at earlier but committed later.
+    "OVERLAP_SECONDS": 10,
+    # Build the index in the background when a worker starts.
+    "WARM_ON_START": True,
+})
+
+# Deadlock retry policy for report + reporter transactions
+# (remote_report.transactions)
+REMOTE_REPORT_TRANSACTIONS = AppSettings("REMOTE_REPORT_TRANSACTIONS", {
+    "MAX_ATTEMPTS": 4,
+    "BASE_DELAY": 0.05,
+    "MAX_DELAY": 1.0,
+})
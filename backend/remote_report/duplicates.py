@@ -0,0 +1,302 @@
+"""
+Near-duplicate detection for incoming reports.
+
+Each report is reduced to a set of shingles (normalized location tokens plus
+word uni/bigrams from the title and description), summarized by a MinHash
+signature and bucketed with LSH banding per department. Looking up candidates
+only touches the buckets a report falls into, so query cost does not grow with
+the number of open issues.
+
+The index is built once per process from every open report, off the request
+path when start_duplicate_index() runs at startup, and afterwards only reads
+the reports changed since the last refresh.
+"""
+import logging
+import re
+import threading
+import time
+import zlib
+
+from datetime import timedelta
+
+import numpy as np
+from django.db import close_old_connections
+from django.db.models import Max
+
+from .conf import DUPLICATE_DETECTION
+from .models import OPEN_STATUSES, IssueReportRemote
+
+logger = logging.getLogger(__name__)
+
+# With b bands of r rows, a pair of similarity s becomes a candidate with
+# probability 1 - (1 - s**r)**b, an S-curve rising around (1/b)**(1/r). 32
+# bands of 2 rows put that near 0.18, well below THRESHOLD (0.45, which is a
+# candidate with probability ~0.999); 16 bands of 4 caught only ~0.49 of the
+# pairs at the threshold. Extra candidates are cheap: each is checked against
+# its full signature.
+NUM_PERM = 64
+BANDS = 32
+ROWS_PER_BAND = NUM_PERM // BANDS
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20260214)
+_HASH_A = _rng.integers(1, _PRIME, size=NUM_PERM, dtype=np.uint64)
+_HASH_B = _rng.integers(0, _PRIME, size=NUM_PERM, dtype=np.uint64)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and at by for from in is it near of on or opposite the to with".split()
+)
+_LOCATION_ALIASES = {
+    "rd": "road",
+    "st": "street",
+    "ave": "avenue",
+    "nr": "near",
+    "opp": "opposite",
+    "blk": "block",
+    "sec": "sector",
+    "mkt": "market",
+    "jn": "junction",
+    "jct": "junction",
+}
+
+_FIELDS = ("id", "tracking_id", "issue_title", "issue_description", "location", "department", "status", "updated_at")
+
+
+def _tokens(text, aliases=None):
+    tokens = _TOKEN_RE.findall((text or "").lower())
+    if aliases:
+        tokens = [aliases.get(token, token) for token in tokens]
+    return [token for token in tokens if token not in _STOPWORDS]
+
+
+def location_tokens(location):
+    return set(_tokens(location, _LOCATION_ALIASES))
+
+
+def shingles(*, title, description, location):
+    description = (description or "")[: DUPLICATE_DETECTION.MAX_DESCRIPTION_CHARS]
+    words = _tokens(f"{title or ''} {description}")
+    result = {f"w:{word}" for word in words}
+    result.update(f"b:{first} {second}" for first, second in zip(words, words[1:]))
+    result.update(f"l:{token}" for token in location_tokens(location))
+    return result
+
+
+def minhash_signature(shingle_set):
+    if not shingle_set:
+        return np.full(NUM_PERM, _PRIME, dtype=np.uint32)
+    base = np.fromiter(
+        (zlib.crc32(item.encode()) % _PRIME for item in shingle_set),
+        dtype=np.uint64,
+        count=len(shingle_set),
+    )
+    hashed = (_HASH_A[:, None] * base[None, :] + _HASH_B[:, None]) % _PRIME
+    return hashed.min(axis=1).astype(np.uint32)
+
+
+def _band_keys(department, signature):
+    for band in range(BANDS):
+        chunk = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        yield (department, band, chunk.tobytes())
+
+
+class DuplicateIndex:
+    """In-memory LSH index over open reports, refreshed incrementally."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._signatures = {}
+            self._meta = {}
+            self._versions = {}
+            self._buckets = {}
+            self._built = False
+            self._high_water_mark = None
+            self._last_refresh = 0.0
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def _remove(self, issue_id):
+        signature = self._signatures.pop(issue_id, None)
+        meta = self._meta.pop(issue_id, None)
+        self._versions.pop(issue_id, None)
+        if signature is None:
+            return
+        for key in _band_keys(meta["department"], signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(issue_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    @staticmethod
+    def _signature(row):
+        return minhash_signature(
+            shingles(
+                title=row["issue_title"],
+                description=row["issue_description"],
+                location=row["location"],
+            )
+        )
+
+    def _add(self, row, signature=None):
+        """
+        Index ``row``, or drop it once it is no longer open. ``signature`` is
+        computed when not given.
+
+        Returns:
+            bool: False when the row was already indexed at this version
+        """
+        if row["id"] in self._versions and self._versions[row["id"]] == row["updated_at"]:
+            return False
+        self._remove(row["id"])
+        if row["status"] not in OPEN_STATUSES:
+            return True
+        if signature is None:
+            signature = self._signature(row)
+        self._signatures[row["id"]] = signature
+        self._meta[row["id"]] = {
+            "tracking_id": row["tracking_id"],
+            "issue_title": row["issue_title"],
+            "location": row["location"],
+            "department": row["department"],
+            "status": row["status"],
+        }
+        self._versions[row["id"]] = row["updated_at"]
+        for key in _band_keys(row["department"], signature):
+            self._buckets.setdefault(key, set()).add(row["id"])
+        return True
+
+    def build(self):
+        """
+        Index every open report. The signatures are computed into a separate
+        index and swapped in, so lookups are not blocked meanwhile; concurrent
+        callers wait for the one build instead of starting their own.
+
+        Returns:
+            int: Number of reports indexed
+        """
+        with self._build_lock:
+            if self._built:
+                return 0
+            staging = DuplicateIndex()
+            mark = IssueReportRemote.objects.aggregate(mark=Max("updated_at"))["mark"]
+            rows = IssueReportRemote.objects.values(*_FIELDS).order_by().filter(status__in=OPEN_STATUSES)
+            for row in rows.iterator(chunk_size=2000):
+                staging._add(row)
+                if mark is None or row["updated_at"] > mark:
+                    mark = row["updated_at"]
+
+            with self._lock:
+                self._signatures = staging._signatures
+                self._meta = staging._meta
+                self._versions = staging._versions
+                self._buckets = staging._buckets
+                self._high_water_mark = mark
+                self._built = True
+                # Catch up on what changed during the build.
+                self._last_refresh = 0.0
+            logger.info("Duplicate index built: %s open reports", len(self))
+            return len(self)
+
+    def refresh(self, force=False):
+        """
+        Pull reports changed since the last refresh, building the index first
+        if nothing did yet. Rows are read and hashed without holding the index
+        lock, which is only taken to apply them, so lookups are not blocked
+        by the query. A refresh already running elsewhere makes a non-forced
+        call return right away.
+        """
+        if not self._built:
+            self.build()
+        if not self._refresh_lock.acquire(blocking=force):
+            return 0
+        try:
+            with self._lock:
+                if not force and time.monotonic() - self._last_refresh < DUPLICATE_DETECTION.REFRESH_INTERVAL:
+                    return 0
+                mark = self._high_water_mark
+
+            rows = IssueReportRemote.objects.values(*_FIELDS).order_by()
+            if mark is not None:
+                rows = rows.filter(updated_at__gte=mark - timedelta(seconds=DUPLICATE_DETECTION.OVERLAP_SECONDS))
+            updates = []
+            for row in rows.iterator(chunk_size=2000):
+                if mark is None or row["updated_at"] > mark:
+                    mark = row["updated_at"]
+                if self._versions.get(row["id"]) == row["updated_at"]:
+                    continue
+                signature = self._signature(row) if row["status"] in OPEN_STATUSES else None
+                updates.append((row, signature))
+
+            with self._lock:
+                changed = sum(self._add(row, signature) for row, signature in updates)
+                self._high_water_mark = mark
+                self._last_refresh = time.monotonic()
+        finally:
+            self._refresh_lock.release()
+        if changed:
+            logger.debug("Duplicate index refreshed: %s rows, %s indexed", changed, len(self))
+        return changed
+
+    def candidates(self, issue, limit=10, threshold=None):
+        threshold = DUPLICATE_DETECTION.THRESHOLD if threshold is None else threshold
+        with self._lock:
+            signature = self._signatures.get(issue.id)
+            if signature is None:
+                signature = minhash_signature(
+                    shingles(
+                        title=issue.issue_title,
+                        description=issue.issue_description,
+                        location=issue.location,
+                    )
+                )
+
+            matches = set()
+            for key in _band_keys(issue.department, signature):
+                matches.update(self._buckets.get(key, ()))
+            matches.discard(issue.id)
+
+            results = []
+            for candidate_id in matches:
+                similarity = float(np.mean(self._signatures[candidate_id] == signature))
+                if similarity >= threshold:
+                    results.append({"id": candidate_id, **self._meta[candidate_id], "similarity": round(similarity, 3)})
+
+        results.sort(key=lambda item: item["similarity"], reverse=True)
+        return results[:limit]
+
+
+duplicate_index = DuplicateIndex()
+
+
+def find_duplicate_candidates(issue, limit=10):
+    duplicate_index.refresh()
+    return duplicate_index.candidates(issue, limit=limit)
+
+
+def _warm():
+    try:
+        duplicate_index.build()
+    except Exception:
+        logger.exception("Building the duplicate index failed")
+    finally:
+        close_old_connections()
+
+
+def start_duplicate_index():
+    """
+    Build this process's index in a background thread, so the first
+    duplicates request does not pay for it. Safe to call more than once.
+    """
+    if not DUPLICATE_DETECTION.WARM_ON_START or duplicate_index._built:
+        return None
+    thread = threading.Thread(target=_warm, name="duplicate-index-build", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from remote_report.priority import refresh_issue_priorities
+
+
+class Command(BaseCommand):
+    help = "Recompute issue priority scores (incrementally by default)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Rescore every open issue.")
+        parser.add_argument(
+            "--loop",
+            type=int,
+            default=0,
+            metavar="SECONDS",
+            help="Keep running, refreshing incrementally every SECONDS.",
+        )
+        parser.add_argument(
+            "--full-every",
+            type=int,
+            default=3600,
+            metavar="SECONDS",
+            help="In --loop mode, run a full rescore this often.",
+        )
+
+    def handle(self, *args, **options):
+        result = refresh_issue_priorities(full=options["full"])
+        self.stdout.write(self.style.SUCCESS(f"Scored {result['scored']}, removed {result['removed']}"))
+
+        if not options["loop"]:
+            return
+
+        last_full = time.monotonic()
+        while True:
+            time.sleep(options["loop"])
+            full = time.monotonic() - last_full >= options["full_every"]
+            result = refresh_issue_priorities(full=full)
+            if full:
+                last_full = time.monotonic()
+            self.stdout.write(f"Scored {result['scored']}, removed {result['removed']}")
@@ -1,5 +1,8 @@
 from django.db import models
 
+# Issues still waiting on an admin: ranked for priority and matched for duplicates.
+OPEN_STATUSES = ("pending", "in_progress", "escalated")
+
 class IssueReportRemote(models.Model):
     id = models.BigAutoField(primary_key=True)
     location = models.CharField(max_length=255)
@@ -67,3 +70,34 @@ class TrustScoreLogRemote(models.Model):
     class Meta:
         managed = False
         db_table = "users_trustscorelog"
+
+
+class IssuePriority(models.Model):
+    """
+    App-managed side table holding a precomputed priority score for every open
+    report, so the pending queue can be ordered by an index instead of in Python.
+    """
+
+    issue = models.OneToOneField(
+        IssueReportRemote,
+        primary_key=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="priority",
+    )
+    department = models.CharField(max_length=255, null=True, blank=True)
+    status = models.CharField(max_length=50)
+    score = models.FloatField()
+    source_updated_at = models.DateTimeField()
+    computed_at = models.DateTimeField()
+    # Set when the reporter's trust changes; the next refresh rescores the row.
+    stale = models.BooleanField(default=False, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["department", "-score"], name="issueprio_dept_score_idx"),
+            models.Index(fields=["source_updated_at"], name="issueprio_source_upd_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.issue_id} — {self.score:.2f}"
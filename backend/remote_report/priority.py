@@ -0,0 +1,167 @@
+import logging
+import math
+
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .models import OPEN_STATUSES, IssuePriority, IssueReportRemote
+from .reporter_state import get_reporter_states
+from .services import TRUST_MAX
+
+logger = logging.getLogger(__name__)
+
+CONFIDENCE_WEIGHT = 0.45
+TRUST_WEIGHT = 0.35
+AGE_WEIGHT = 0.15
+BACKLOG_WEIGHT = 0.05
+
+DEFAULT_CONFIDENCE = 50
+AGE_SATURATION_HOURS = 72
+DEACTIVATED_TRUST_FACTOR = 0.5
+BATCH_SIZE = 500
+
+_UPDATE_FIELDS = ["department", "status", "score", "source_updated_at", "computed_at", "stale"]
+
+
+def calculate_priority_score(*, confidence_score, trust_score, age_hours, backlog_share, deactivated=False):
+    """
+    Blend report confidence, reporter trust, waiting time and department backlog
+    into a 0-100 score; higher means "look at this first".
+    """
+    confidence = DEFAULT_CONFIDENCE if confidence_score is None else confidence_score
+    confidence = max(0, min(100, confidence)) / 100
+
+    trust = TRUST_MAX if trust_score is None else trust_score
+    trust = max(0, min(TRUST_MAX, trust)) / TRUST_MAX
+    if deactivated:
+        trust *= DEACTIVATED_TRUST_FACTOR
+
+    # Log curve: the first day of waiting matters more than the third.
+    age = min(1.0, math.log1p(max(0.0, age_hours)) / math.log1p(AGE_SATURATION_HOURS))
+    backlog = max(0.0, min(1.0, backlog_share))
+
+    score = (
+        CONFIDENCE_WEIGHT * confidence
+        + TRUST_WEIGHT * trust
+        + AGE_WEIGHT * age
+        + BACKLOG_WEIGHT * backlog
+    )
+    return round(score * 100, 2)
+
+
+def _backlog_shares():
+    counts = dict(
+        IssueReportRemote.objects.filter(status__in=OPEN_STATUSES)
+        .values_list("department")
+        .annotate(total=Count("id"))
+        .values_list("department", "total")
+    )
+    largest = max(counts.values(), default=0)
+    if not largest:
+        return {}
+    return {department: total / largest for department, total in counts.items()}
+
+
+def _score_rows(issues, now):
+    states = get_reporter_states(issue.user_id for issue in issues)
+    backlog = _backlog_shares()
+    rows = []
+    for issue in issues:
+        state = states.get(issue.user_id) or {}
+        deactivated_until = state.get("deactivated_until")
+        rows.append(
+            IssuePriority(
+                issue_id=issue.id,
+                department=issue.department,
+                status=issue.status,
+                score=calculate_priority_score(
+                    confidence_score=issue.confidence_score,
+                    trust_score=state.get("trust_score"),
+                    age_hours=(now - issue.issue_date).total_seconds() / 3600,
+                    backlog_share=backlog.get(issue.department, 0),
+                    deactivated=bool(deactivated_until and deactivated_until > now),
+                ),
+                source_updated_at=issue.updated_at,
+                computed_at=now,
+            )
+        )
+    return rows
+
+
+def _apply(issues, now):
+    open_issues = [issue for issue in issues if issue.status in OPEN_STATUSES]
+    closed_ids = [issue.id for issue in issues if issue.status not in OPEN_STATUSES]
+
+    with transaction.atomic():
+        if closed_ids:
+            IssuePriority.objects.filter(issue_id__in=closed_ids).delete()
+        if open_issues:
+            IssuePriority.objects.bulk_create(
+                _score_rows(open_issues, now),
+                update_conflicts=True,
+                unique_fields=["issue"],
+                update_fields=_UPDATE_FIELDS,
+            )
+    return len(open_issues), len(closed_ids)
+
+
+def _iter_batches(queryset):
+    last_id = 0
+    while True:
+        batch = list(queryset.filter(id__gt=last_id).order_by("id")[:BATCH_SIZE])
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1].id
+
+
+def refresh_issue_priorities(*, full=False, now=None):
+    """
+    Bring the priority table up to date.
+
+    Incremental runs only rescore reports whose ``updated_at`` moved past the
+    newest ``source_updated_at`` already stored, plus those marked stale by
+    mark_reporter_priorities_stale(). A full run rescores every open report
+    (ages drift even when rows do not change) and prunes stale entries.
+    """
+    now = now or timezone.now()
+    source = IssueReportRemote.objects.only(
+        "id", "user_id", "status", "department", "confidence_score", "issue_date", "updated_at"
+    )
+
+    if full:
+        sources = [source.filter(status__in=OPEN_STATUSES)]
+    else:
+        high_water_mark = IssuePriority.objects.aggregate(mark=Max("source_updated_at"))["mark"]
+        if high_water_mark is not None:
+            # >= so rows sharing the mark's timestamp are never skipped.
+            sources = [source.filter(updated_at__gte=high_water_mark), source.filter(priority__stale=True)]
+        else:
+            sources = [source.filter(status__in=OPEN_STATUSES)]
+
+    scored = removed = 0
+    for queryset in sources:
+        for batch in _iter_batches(queryset):
+            batch_scored, batch_removed = _apply(batch, now)
+            scored += batch_scored
+            removed += batch_removed
+
+    if full:
+        removed += IssuePriority.objects.exclude(issue__status__in=OPEN_STATUSES).delete()[0]
+
+    logger.info(
+        "Issue priority refresh (%s): %s scored, %s removed",
+        "full" if full else "incremental",
+        scored,
+        removed,
+    )
+    return {"scored": scored, "removed": removed}
+
+
+def mark_reporter_priorities_stale(user_id):
+    """
+    Queue one reporter's ranked reports for the next refresh after their trust
+    score changed, instead of rescoring them on the request.
+    """
+    return IssuePriority.objects.filter(issue__user_id=user_id).update(stale=True)
@@ -0,0 +1,88 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import CustomUserRemote
+
+KEY_PREFIX = "reporter_state"
+DEACTIVATED_KEY = "reporter_state:deactivated"
+DEFAULT_TTL = 30
+
+# Cached placeholder for reporter ids that have no users_customuser row.
+_MISSING = {"trust_score": None, "deactivated_until": None, "missing": True}
+
+
+def _ttl():
+    return getattr(settings, "REPORTER_STATE_CACHE_TTL", DEFAULT_TTL)
+
+
+def _key(user_id):
+    return f"{KEY_PREFIX}:{user_id}"
+
+
+def _public(state):
+    if state is None or state.get("missing"):
+        return None
+    return state
+
+
+def get_reporter_states(user_ids):
+    """
+    Return {user_id: {"trust_score", "deactivated_until"}} for ``user_ids``,
+    loading cache misses with a single query. Unknown reporters map to None.
+    """
+    user_ids = {int(user_id) for user_id in user_ids if user_id is not None}
+    if not user_ids:
+        return {}
+
+    keys = {_key(user_id): user_id for user_id in user_ids}
+    cached = cache.get_many(list(keys))
+    states = {keys[key]: value for key, value in cached.items()}
+
+    missing = user_ids - set(states)
+    if missing:
+        loaded = {
+            row["id"]: {
+                "trust_score": row["trust_score"],
+                "deactivated_until": row["deactivated_until"],
+            }
+            for row in CustomUserRemote.objects.filter(id__in=missing).values(
+                "id", "trust_score", "deactivated_until"
+            )
+        }
+        fresh = {user_id: loaded.get(user_id, _MISSING) for user_id in missing}
+        cache.set_many({_key(user_id): state for user_id, state in fresh.items()}, _ttl())
+        states.update(fresh)
+
+    return {user_id: _public(state) for user_id, state in states.items()}
+
+
+def get_reporter_state(user_id):
+    return get_reporter_states([user_id]).get(user_id)
+
+
+def get_deactivated_reporter_ids(now=None):
+    now = now or timezone.now()
+    bans = cache.get(DEACTIVATED_KEY)
+    if bans is None:
+        bans = list(
+            CustomUserRemote.objects.filter(deactivated_until__gt=now).values_list(
+                "id", "deactivated_until"
+            )
+        )
+        cache.set(DEACTIVATED_KEY, bans, _ttl())
+    # Bans are stored with their end time so an expired ban drops out without
+    # waiting for the cache entry to expire.
+    return [user_id for user_id, until in bans if until > now]
+
+
+def invalidate_reporter_state(user_id, *, deactivation_changed=False):
+    def _invalidate():
+        cache.delete(_key(user_id))
+        if deactivation_changed:
+            cache.delete(DEACTIVATED_KEY)
+
+    # Drop the entry once the new state is visible to other connections;
+    # deleting earlier would let a concurrent reader re-cache the old row.
+    transaction.on_commit(_invalidate)
@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import IssueReportRemote, CustomUserRemote
+from .models import IssueReportRemote
+from .reporter_state import get_reporter_state
 
 class IssueReportSerializer(serializers.ModelSerializer):
     user_trust_score = serializers.SerializerMethodField()
@@ -27,10 +28,18 @@ class IssueReportSerializer(serializers.ModelSerializer):
             "user_deactivated_until",
         ]
 
+    def _reporter_state(self, obj):
+        # List views prefetch every reporter with get_reporter_states() and pass
+        # the mapping in context; single-object callers fall back to the cache.
+        states = self.context.get("reporter_states")
+        if states is not None and obj.user_id in states:
+            return states[obj.user_id]
+        return get_reporter_state(obj.user_id)
+
     def get_user_trust_score(self, obj):
-        user = CustomUserRemote.objects.filter(id=obj.user_id).only("trust_score").first()
-        return user.trust_score if user else None
+        state = self._reporter_state(obj)
+        return state["trust_score"] if state else None
 
     def get_user_deactivated_until(self, obj):
-        user = CustomUserRemote.objects.filter(id=obj.user_id).only("deactivated_until").first()
-        return user.deactivated_until if user else None
+        state = self._reporter_state(obj)
+        return state["deactivated_until"] if state else None
@@ -4,7 +4,9 @@ from datetime import timedelta
 from django.db import transaction
 from django.utils import timezone
 
-from .models import CustomUserRemote, TrustScoreLogRemote
+from .models import CustomUserRemote, IssueReportRemote, TrustScoreLogRemote
+from .reporter_state import invalidate_reporter_state
+from .transactions import deadlock_safe, lock_one
 
 TRUST_MIN = 0
 TRUST_MAX = 110
@@ -24,6 +26,12 @@ def _clamp_trust_score(score):
     return max(TRUST_MIN, min(TRUST_MAX, score))
 
 
+def _mark_reporter_priorities_stale(user_id):
+    from .priority import mark_reporter_priorities_stale
+
+    mark_reporter_priorities_stale(user_id)
+
+
 def _is_currently_deactivated(user, now):
     return bool(user.deactivated_until and user.deactivated_until > now)
 
@@ -40,7 +48,7 @@ def apply_trust_mutation(
     now=None,
 ):
     now = now or timezone.now()
-    user = CustomUserRemote.objects.select_for_update().get(id=user_id)
+    user = lock_one(CustomUserRemote, id=user_id)
 
     # Trust freeze: active deactivation blocks further negative mutations.
     if delta < 0 and _is_currently_deactivated(user, now):
@@ -57,6 +65,8 @@ def apply_trust_mutation(
 
     user.trust_score = next_score
     user.save(update_fields=["trust_score"])
+    invalidate_reporter_state(user_id)
+    transaction.on_commit(lambda: _mark_reporter_priorities_stale(user_id), robust=True)
 
     log = TrustScoreLogRemote.objects.create(
         user_id=user_id,
@@ -126,6 +136,7 @@ def apply_reject_penalty(*, report, admin_user, now=None):
         ban_days = calculate_ban_days(days_since_last_violation)
         user.deactivated_until = now + timedelta(days=ban_days)
         user.save(update_fields=["deactivated_until"])
+        invalidate_reporter_state(user.id, deactivation_changed=True)
 
     report.updated_at = now
     report.save(update_fields=["status", "trust_score_delta", "appeal_status", "updated_at"])
@@ -191,3 +202,17 @@ def adjudicate_appeal(*, report, decision, admin_user, now=None):
         "effective_delta": mutation["effective_delta"],
         "user": mutation["user"],
     }
+
+
+@deadlock_safe
+def reject_report(*, report_id, admin_user, now=None):
+    report = lock_one(IssueReportRemote, pk=report_id)
+    result = apply_reject_penalty(report=report, admin_user=admin_user, now=now)
+    return {**result, "report": report}
+
+
+@deadlock_safe
+def decide_appeal(*, report_id, decision, admin_user, now=None):
+    report = lock_one(IssueReportRemote, pk=report_id)
+    result = adjudicate_appeal(report=report, decision=decision, admin_user=admin_user, now=now)
+    return {**result, "report": report}
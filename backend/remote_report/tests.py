@@ -1,17 +1,31 @@
 from datetime import timedelta
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
-from django.db import connection
+from django.core.cache import cache
+from django.db import OperationalError, connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
 
-from .models import CustomUserRemote, IssueReportRemote, TrustScoreLogRemote
+from .duplicates import _band_keys, duplicate_index, location_tokens, minhash_signature
+from .models import CustomUserRemote, IssuePriority, IssueReportRemote, TrustScoreLogRemote
+from .priority import calculate_priority_score, refresh_issue_priorities
+from .reporter_state import get_reporter_state, get_reporter_states
 from .services import calculate_ban_days
+from .transactions import (
+    LockOrderViolation,
+    get_transaction_metrics,
+    lock_one,
+    reset_transaction_metrics,
+    run_in_transaction,
+)
 
 
-class TrustEnforcementTests(APITestCase):
+class RemoteReportTestCase(APITestCase):
     @classmethod
     def setUpClass(cls):
         super().setUpClass()
@@ -22,6 +36,7 @@ class TrustEnforcementTests(APITestCase):
                     schema_editor.create_model(model)
 
     def setUp(self):
+        cache.clear()
         User = get_user_model()
         self.admin = User.objects.create_user(
             userid="A10001",
@@ -66,6 +81,9 @@ class TrustEnforcementTests(APITestCase):
         defaults.update(kwargs)
         return IssueReportRemote.objects.create(**defaults)
 
+
+class TrustEnforcementTests(RemoteReportTestCase):
+
     def test_reject_applies_minus_ten_exactly_once(self):
         issue = self._create_issue()
         self.client.force_authenticate(user=self.admin)
@@ -201,3 +219,259 @@ class TrustEnforcementTests(APITestCase):
         self.assertEqual(non_root_res.status_code, status.HTTP_403_FORBIDDEN)
         self.assertEqual(other_dept_root_res.status_code, status.HTTP_403_FORBIDDEN)
         self.assertEqual(normal_admin_reject_res.status_code, status.HTTP_200_OK)
+
+    def test_reject_invalidates_cached_reporter_state(self):
+        self.reporter.trust_score = 75
+        self.reporter.save(update_fields=["trust_score"])
+        issue = self._create_issue()
+        self.assertEqual(get_reporter_state(self.reporter.id)["trust_score"], 75)
+        self.client.force_authenticate(user=self.admin)
+
+        url = reverse("issue-status", kwargs={"tracking_id": issue.tracking_id})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(url, {"status": "rejected"}, format="json")
+
+        state = get_reporter_state(self.reporter.id)
+        self.assertEqual(state["trust_score"], 65)
+        self.assertIsNotNone(state["deactivated_until"])
+
+    def test_issue_list_loads_reporter_states_in_one_query(self):
+        other = CustomUserRemote.objects.create(trust_score=50)
+        for _ in range(3):
+            self._create_issue()
+            self._create_issue(user_id=other.id)
+        self.client.force_authenticate(user=self.admin)
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(reverse("issue-list"))
+
+        reporter_queries = [q for q in ctx.captured_queries if "users_customuser" in q["sql"]]
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(reporter_queries), 1)
+        self.assertEqual(
+            sorted({row["user_trust_score"] for row in res.data}),
+            [50, 80],
+        )
+        with self.assertNumQueries(0):
+            states = get_reporter_states([self.reporter.id, other.id])
+        self.assertEqual(states[other.id]["trust_score"], 50)
+
+
+class IssuePriorityTests(RemoteReportTestCase):
+    def test_score_prefers_confident_reports_from_trusted_reporters(self):
+        strong = calculate_priority_score(
+            confidence_score=95, trust_score=110, age_hours=1, backlog_share=0.5
+        )
+        weak = calculate_priority_score(
+            confidence_score=30, trust_score=40, age_hours=1, backlog_share=0.5
+        )
+        banned = calculate_priority_score(
+            confidence_score=95, trust_score=110, age_hours=1, backlog_share=0.5, deactivated=True
+        )
+        self.assertGreater(strong, weak)
+        self.assertGreater(strong, banned)
+
+    def test_incremental_refresh_scores_open_and_drops_closed_issues(self):
+        issue = self._create_issue()
+        refresh_issue_priorities()
+        self.assertTrue(IssuePriority.objects.filter(issue_id=issue.id).exists())
+
+        issue.status = "resolved"
+        issue.updated_at = timezone.now()
+        issue.save(update_fields=["status", "updated_at"])
+        result = refresh_issue_priorities()
+
+        self.assertEqual(result["removed"], 1)
+        self.assertFalse(IssuePriority.objects.filter(issue_id=issue.id).exists())
+
+    def test_escalated_issues_stay_ranked(self):
+        issue = self._create_issue()
+        refresh_issue_priorities()
+
+        issue.status = "escalated"
+        issue.updated_at = timezone.now()
+        issue.save(update_fields=["status", "updated_at"])
+        result = refresh_issue_priorities()
+
+        self.assertEqual(result["removed"], 0)
+        self.assertEqual(IssuePriority.objects.get(issue_id=issue.id).status, "escalated")
+
+    def test_trust_change_queues_the_reporters_issues_for_rescoring(self):
+        rejected = self._create_issue()
+        other = self._create_issue()
+        refresh_issue_priorities(full=True)
+        before = IssuePriority.objects.get(issue_id=other.id).score
+        self.client.force_authenticate(user=self.admin)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                reverse("issue-status", kwargs={"tracking_id": rejected.tracking_id}),
+                {"status": "rejected"},
+                format="json",
+            )
+
+        queued = IssuePriority.objects.get(issue_id=other.id)
+        self.assertEqual((queued.score, queued.stale), (before, True))
+        refresh_issue_priorities()
+        rescored = IssuePriority.objects.get(issue_id=other.id)
+        self.assertLess(rescored.score, before)
+        self.assertFalse(rescored.stale)
+
+    def test_issue_list_can_sort_by_priority(self):
+        doubtful = CustomUserRemote.objects.create(trust_score=20)
+        low = self._create_issue(confidence_score=20, user_id=doubtful.id)
+        high = self._create_issue(confidence_score=95)
+        refresh_issue_priorities(full=True)
+        fresh = self._create_issue(tracking_id="NEW1")
+        self.client.force_authenticate(user=self.admin)
+
+        res = self.client.get(reverse("issue-list"), {"ordering": "priority"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [row["tracking_id"] for row in res.data],
+            [high.tracking_id, low.tracking_id, fresh.tracking_id],
+        )
+
+
+class DuplicateDetectionTests(RemoteReportTestCase):
+    def setUp(self):
+        super().setUp()
+        duplicate_index.clear()
+
+    def test_location_tokens_are_normalized(self):
+        self.assertEqual(
+            location_tokens("Opp. City Mkt, MG Rd"),
+            location_tokens("opposite city market mg road"),
+        )
+
+    def test_pairs_at_the_threshold_share_a_bucket(self):
+        # Jaccard similarity 18 / 40 = 0.45, the default THRESHOLD.
+        found = 0
+        for pair in range(200):
+            shared = {f"w:shared{pair}-{index}" for index in range(18)}
+            first = shared | {f"w:first{pair}-{index}" for index in range(11)}
+            second = shared | {f"w:second{pair}-{index}" for index in range(11)}
+            first_keys = set(_band_keys("Road", minhash_signature(first)))
+            found += bool(first_keys & set(_band_keys("Road", minhash_signature(second))))
+
+        self.assertGreaterEqual(found / 200, 0.95)
+
+    def test_duplicates_endpoint_returns_near_copies_in_department(self):
+        description = "Large pothole in the middle of the road causing accidents near the bus stop"
+        original = self._create_issue(
+            issue_title="Pothole on MG Road",
+            issue_description=description,
+            location="MG Rd, Sector 4",
+        )
+        copy = self._create_issue(
+            issue_title="Pothole on MG Road",
+            issue_description=description + " every day",
+            location="MG Road, Sec 4",
+        )
+        self._create_issue(
+            issue_title="Street light not working",
+            issue_description="The street light outside house 12 has been off for a week",
+            location="Park Street, Sector 9",
+        )
+        self._create_issue(
+            issue_title="Pothole on MG Road",
+            issue_description=description,
+            location="MG Rd, Sector 4",
+            department="Water",
+        )
+        self.client.force_authenticate(user=self.admin)
+
+        res = self.client.get(
+            reverse("issue-duplicates", kwargs={"tracking_id": original.tracking_id})
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [row["tracking_id"] for row in res.data["candidates"]],
+            [copy.tracking_id],
+        )
+
+    def test_refresh_drops_closed_issues(self):
+        first = self._create_issue(issue_title="Broken pipe leaking water", location="Lane 3")
+        second = self._create_issue(issue_title="Broken pipe leaking water", location="Lane 3")
+        duplicate_index.refresh(force=True)
+        self.assertEqual(len(duplicate_index.candidates(first)), 1)
+
+        second.status = "rejected"
+        second.updated_at = timezone.now()
+        second.save(update_fields=["status", "updated_at"])
+        duplicate_index.refresh(force=True)
+
+        self.assertEqual(duplicate_index.candidates(first), [])
+
+    def test_refresh_picks_up_late_commits(self):
+        first = self._create_issue(issue_title="Broken pipe leaking water", location="Lane 3")
+        duplicate_index.build()
+
+        # Stamped before the index's high-water mark, committed after it.
+        late = self._create_issue(issue_title="Broken pipe leaking water", location="Lane 3")
+        IssueReportRemote.objects.filter(pk=late.pk).update(updated_at=first.updated_at - timedelta(seconds=2))
+        duplicate_index.refresh(force=True)
+
+        self.assertEqual([row["id"] for row in duplicate_index.candidates(first)], [late.pk])
+
+
+class TransactionToolkitTests(TransactionTestCase):
+    def setUp(self):
+        existing = set(connection.introspection.table_names())
+        with connection.schema_editor() as schema_editor:
+            for model in [CustomUserRemote, IssueReportRemote, TrustScoreLogRemote]:
+                if model._meta.db_table not in existing:
+                    schema_editor.create_model(model)
+        reset_transaction_metrics()
+        self.reporter = CustomUserRemote.objects.create(trust_score=80)
+        now = timezone.now()
+        self.issue = IssueReportRemote.objects.create(
+            location="Block A",
+            issue_description="Pothole",
+            issue_date=now,
+            status="pending",
+            updated_at=now,
+            user_id=self.reporter.id,
+            issue_title="Pothole",
+            tracking_id="TX1",
+            department="Road",
+        )
+
+    @patch("remote_report.transactions.time.sleep")
+    def test_deadlock_is_retried_with_backoff(self, mock_sleep):
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) == 1:
+                raise OperationalError(1213, "Deadlock found when trying to get lock")
+            return lock_one(IssueReportRemote, pk=self.issue.pk)
+
+        issue = run_in_transaction(flaky)
+
+        metrics = get_transaction_metrics()
+        self.assertEqual(issue.pk, self.issue.pk)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(metrics["retries"], 1)
+        self.assertEqual(metrics["deadlocks"], 1)
+        mock_sleep.assert_called_once()
+
+    @patch("remote_report.transactions.time.sleep")
+    def test_non_lock_errors_are_not_retried(self, mock_sleep):
+        def broken():
+            raise OperationalError(1146, "Table doesn't exist")
+
+        with self.assertRaises(OperationalError):
+            run_in_transaction(broken)
+        self.assertEqual(get_transaction_metrics()["retries"], 0)
+        mock_sleep.assert_not_called()
+
+    def test_locking_reporter_before_issue_is_rejected(self):
+        def wrong_order():
+            lock_one(CustomUserRemote, id=self.reporter.id)
+            lock_one(IssueReportRemote, pk=self.issue.pk)
+
+        with self.assertRaises(LockOrderViolation):
+            run_in_transaction(wrong_order)
@@ -0,0 +1,172 @@
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.db import OperationalError, transaction
+
+from .conf import REMOTE_REPORT_TRANSACTIONS
+
+logger = logging.getLogger(__name__)
+
+# MySQL error codes that mean "the transaction lost a lock race, run it again".
+MYSQL_DEADLOCK = 1213
+MYSQL_LOCK_WAIT_TIMEOUT = 1205
+RETRYABLE_ERROR_CODES = (MYSQL_DEADLOCK, MYSQL_LOCK_WAIT_TIMEOUT)
+
+# Global lock order: a transaction may only lock tables left-to-right, and rows
+# within a table in ascending primary key order.
+LOCK_ORDER = (
+    "report_issuereport",
+    "users_customuser",
+)
+
+
+class LockOrderViolation(RuntimeError):
+    pass
+
+
+_state = threading.local()
+_metrics_lock = threading.Lock()
+_metrics = {
+    "transactions": 0,
+    "retries": 0,
+    "deadlocks": 0,
+    "lock_wait_timeouts": 0,
+    "exhausted": 0,
+    "lock_acquisitions": 0,
+    "lock_wait_seconds_total": 0.0,
+    "lock_wait_seconds_max": 0.0,
+}
+
+
+def _bump(name, amount=1):
+    with _metrics_lock:
+        _metrics[name] += amount
+
+
+def _record_lock_wait(seconds):
+    with _metrics_lock:
+        _metrics["lock_acquisitions"] += 1
+        _metrics["lock_wait_seconds_total"] += seconds
+        _metrics["lock_wait_seconds_max"] = max(_metrics["lock_wait_seconds_max"], seconds)
+
+
+def get_transaction_metrics():
+    with _metrics_lock:
+        return dict(_metrics)
+
+
+def reset_transaction_metrics():
+    with _metrics_lock:
+        for key in _metrics:
+            _metrics[key] = 0.0 if isinstance(_metrics[key], float) else 0
+
+
+def is_retryable_error(exc):
+    code = exc.args[0] if isinstance(exc, OperationalError) and exc.args else None
+    return code in RETRYABLE_ERROR_CODES
+
+
+def _lock_rank(model):
+    table = model._meta.db_table
+    try:
+        return LOCK_ORDER.index(table)
+    except ValueError as exc:
+        raise LockOrderViolation(f"{table} has no position in LOCK_ORDER") from exc
+
+
+@contextmanager
+def _lock_ledger():
+    previous = getattr(_state, "held_rank", None)
+    _state.held_rank = -1
+    try:
+        yield
+    finally:
+        _state.held_rank = previous
+
+
+def lock_rows(queryset):
+    """
+    select_for_update() the rows of ``queryset`` in primary key order, checking
+    the global lock order when called inside ``run_in_transaction``.
+    """
+    rank = _lock_rank(queryset.model)
+    held_rank = getattr(_state, "held_rank", None)
+    if held_rank is not None and rank < held_rank:
+        raise LockOrderViolation(
+            f"Cannot lock {LOCK_ORDER[rank]} after {LOCK_ORDER[held_rank]}"
+        )
+
+    started = time.monotonic()
+    rows = list(queryset.select_for_update().order_by("pk"))
+    _record_lock_wait(time.monotonic() - started)
+
+    if held_rank is not None:
+        _state.held_rank = max(held_rank, rank)
+    return rows
+
+
+def lock_one(model, **filters):
+    rows = lock_rows(model.objects.filter(**filters))
+    if not rows:
+        raise model.DoesNotExist(f"{model.__name__} matching {filters} does not exist")
+    return rows[0]
+
+
+def _backoff(attempt):
+    base = REMOTE_REPORT_TRANSACTIONS.BASE_DELAY
+    ceiling = min(REMOTE_REPORT_TRANSACTIONS.MAX_DELAY, base * (2 ** attempt))
+    # Full jitter keeps retrying workers from colliding on the same schedule.
+    return random.uniform(0, ceiling)
+
+
+def run_in_transaction(func, *args, **kwargs):
+    """
+    Run ``func`` in its own atomic block, retrying on MySQL deadlock and
+    lock-wait timeout. Nested calls join the outer transaction and do not retry,
+    since only the outermost block can be safely replayed.
+    """
+    if transaction.get_connection().in_atomic_block:
+        return func(*args, **kwargs)
+
+    max_attempts = REMOTE_REPORT_TRANSACTIONS.MAX_ATTEMPTS
+    _bump("transactions")
+    for attempt in range(max_attempts):
+        try:
+            with _lock_ledger(), transaction.atomic():
+                return func(*args, **kwargs)
+        except OperationalError as exc:
+            if not is_retryable_error(exc):
+                raise
+            _bump("deadlocks" if exc.args[0] == MYSQL_DEADLOCK else "lock_wait_timeouts")
+            if attempt + 1 >= max_attempts:
+                _bump("exhausted")
+                logger.error(
+                    "Transaction %s failed after %s attempts: %s",
+                    getattr(func, "__name__", func),
+                    max_attempts,
+                    exc,
+                )
+                raise
+            _bump("retries")
+            delay = _backoff(attempt)
+            logger.warning(
+                "Retrying %s after MySQL error %s (attempt %s/%s, sleeping %.3fs)",
+                getattr(func, "__name__", func),
+                exc.args[0],
+                attempt + 1,
+                max_attempts,
+                delay,
+            )
+            time.sleep(delay)
+
+
+def deadlock_safe(func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        return run_in_transaction(func, *args, **kwargs)
+
+    return wrapper
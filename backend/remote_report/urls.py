@@ -2,6 +2,7 @@ from django.urls import path
 from .views import (
     IssueListView,
     IssueDetailView,
+    IssueDuplicatesView,
     IssueResolveView,
     IssueStatusUpdateView,
     IssueAppealDecisionView,
@@ -11,6 +12,11 @@ from .views import (
 urlpatterns = [
     path("issues/", IssueListView.as_view(), name="issue-list"),
     path("issues/<str:tracking_id>/", IssueDetailView.as_view(), name="issue-detail"),
+    path(
+        "issues/<str:tracking_id>/duplicates/",
+        IssueDuplicatesView.as_view(),
+        name="issue-duplicates",
+    ),
     path(
         "issues/<str:tracking_id>/status/",
         IssueStatusUpdateView.as_view(),
@@ -5,11 +5,12 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
-from django.db import transaction
 
-from .models import IssueReportRemote, CustomUserRemote
+from .duplicates import find_duplicate_candidates
+from .models import OPEN_STATUSES, IssueReportRemote
+from .reporter_state import get_deactivated_reporter_ids, get_reporter_state, get_reporter_states
 from .serializers import IssueReportSerializer
-from .services import apply_reject_penalty, adjudicate_appeal
+from .services import decide_appeal, reject_report
 from rest_framework import status
 from django.conf import settings
 import boto3
@@ -63,21 +64,35 @@ class IssueListView(APIView):
 
         if deactivated_filter is not None:
             if str(deactivated_filter).lower() == "true":
-                reporter_ids = CustomUserRemote.objects.filter(
-                    deactivated_until__gt=timezone.now()
-                ).values_list("id", flat=True)
-                issues = issues.filter(user_id__in=reporter_ids)
+                issues = issues.filter(user_id__in=get_deactivated_reporter_ids())
             elif str(deactivated_filter).lower() == "false":
-                reporter_ids = CustomUserRemote.objects.filter(
-                    deactivated_until__gt=timezone.now()
-                ).values_list("id", flat=True)
-                issues = issues.exclude(user_id__in=reporter_ids)
+                issues = issues.exclude(user_id__in=get_deactivated_reporter_ids())
 
-        issues = issues.order_by("-issue_date")
+        if request.GET.get("ordering") == "priority" and (status_param or "pending") in OPEN_STATUSES:
+            issues = self._order_by_priority(issues, user.department)
+        else:
+            issues = list(issues.order_by("-issue_date"))
+        reporter_states = get_reporter_states(issue.user_id for issue in issues)
 
-        serializer = IssueReportSerializer(issues, many=True)
+        serializer = IssueReportSerializer(
+            issues, many=True, context={"reporter_states": reporter_states}
+        )
         return Response(serializer.data)
     
+    def _order_by_priority(self, issues, department):
+        # Drive the ranking from the priority table so MySQL walks the
+        # (department, -score) index instead of sorting the queue; the status
+        # filters stay on the report row, which is always current.
+        ranked = list(
+            issues.filter(priority__department=department).order_by("-priority__score", "-id")
+        )
+
+        # Reports filed since the last scoring run have no row yet.
+        unscored = list(
+            issues.exclude(priority__department=department).order_by("-issue_date")
+        )
+        return ranked + unscored
+
     def _auto_escalate_stale_issues(self, department):
         """Auto-escalate in_progress issues not updated for 3 days"""
         three_days_ago = timezone.now() - timedelta(days=3)
@@ -125,6 +140,31 @@ class IssueDetailView(APIView):
         return Response(data)
 
 
+class IssueDuplicatesView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, tracking_id):
+        try:
+            issue = IssueReportRemote.objects.get(tracking_id=tracking_id)
+        except IssueReportRemote.DoesNotExist:
+            raise NotFound("Issue not found")
+
+        if issue.department != request.user.department:
+            raise PermissionDenied("You do not have access to this issue")
+
+        try:
+            limit = max(1, min(50, int(request.GET.get("limit", 10))))
+        except ValueError:
+            raise ValidationError("limit must be an integer")
+
+        return Response(
+            {
+                "tracking_id": issue.tracking_id,
+                "candidates": find_duplicate_candidates(issue, limit=limit),
+            }
+        )
+
+
 class IssueStatusUpdateView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -143,9 +183,8 @@ class IssueStatusUpdateView(APIView):
             )
 
         if new_status == "rejected":
-            with transaction.atomic():
-                locked_issue = IssueReportRemote.objects.select_for_update().get(pk=issue.pk)
-                result = apply_reject_penalty(report=locked_issue, admin_user=request.user)
+            result = reject_report(report_id=issue.pk, admin_user=request.user)
+            locked_issue = result["report"]
 
             return Response(
                 {
@@ -186,14 +225,15 @@ class IssueStatusUpdateView(APIView):
         issue.updated_at = timezone.now()
         issue.save()
 
+        reporter = get_reporter_state(issue.user_id) or {}
         return Response(
             {
                 "status": issue.status,
                 "allocated_to": issue.allocated_to,
                 "appeal_status": issue.appeal_status,
                 "trust_score_delta": issue.trust_score_delta,
-                "user_trust_score": CustomUserRemote.objects.filter(id=issue.user_id).values_list("trust_score", flat=True).first(),
-                "user_deactivated_until": CustomUserRemote.objects.filter(id=issue.user_id).values_list("deactivated_until", flat=True).first(),
+                "user_trust_score": reporter.get("trust_score"),
+                "user_deactivated_until": reporter.get("deactivated_until"),
             }
         )
 
@@ -212,13 +252,12 @@ class IssueAppealDecisionView(APIView):
             raise PermissionDenied("Access denied")
 
         try:
-            with transaction.atomic():
-                locked_issue = IssueReportRemote.objects.select_for_update().get(pk=issue.pk)
-                result = adjudicate_appeal(
-                    report=locked_issue,
-                    decision=decision,
-                    admin_user=request.user,
-                )
+            result = decide_appeal(
+                report_id=issue.pk,
+                decision=decision,
+                admin_user=request.user,
+            )
+            locked_issue = result["report"]
         except ValueError as exc:
             raise ValidationError(str(exc))
 
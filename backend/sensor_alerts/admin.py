@@ -1,6 +1,13 @@
+import json
+
 from django.contrib import admin
 
-from .models import Sensor, SensorReport
+from django.db import transaction
+from django.utils.html import format_html
+
+from .authentication import invalidate_sensor_cache
+from .models import AlertNotification, Sensor, SensorReport
+from .payloads import reconstruct_raw_payload
 
 
 @admin.register(Sensor)
@@ -8,11 +15,40 @@ class SensorAdmin(admin.ModelAdmin):
     list_display = ("sensorId", "lat", "lng", "isActive")
     search_fields = ("sensorId",)
     list_filter = ("isActive",)
+    actions = ("activate_sensors", "deactivate_sensors")
+
+    def _set_active(self, request, queryset, is_active):
+        # A queryset update sends no post_save, so drop cached keys here.
+        updated = queryset.update(isActive=is_active)
+        transaction.on_commit(invalidate_sensor_cache)
+        self.message_user(request, f"{updated} sensor(s) {'activated' if is_active else 'deactivated'}.")
+
+    @admin.action(description="Activate selected sensors")
+    def activate_sensors(self, request, queryset):
+        self._set_active(request, queryset, True)
+
+    @admin.action(description="Deactivate selected sensors")
+    def deactivate_sensors(self, request, queryset):
+        self._set_active(request, queryset, False)
 
 
 @admin.register(SensorReport)
 class SensorReportAdmin(admin.ModelAdmin):
-    list_display = ("alert_id", "sensor", "hazard", "department", "status", "timestamp", "isAcknowledged", "isResolved")
+    list_display = (
+        "alert_id", "sensor", "hazard", "department", "status", "timestamp", "lastSeenAt", "readingCount",
+        "isAcknowledged", "isResolved",
+    )
     search_fields = ("sensor__sensorId", "hazard", "department")
     list_filter = ("status", "department", "isAcknowledged", "isResolved")
-    readonly_fields = ("createdAt",)
+    readonly_fields = ("createdAt", "updatedAt", "original_payload")
+
+    @admin.display(description="Raw payload (as received)")
+    def original_payload(self, obj):
+        return format_html("<pre>{}</pre>", json.dumps(reconstruct_raw_payload(obj), indent=2))
+
+
+@admin.register(AlertNotification)
+class AlertNotificationAdmin(admin.ModelAdmin):
+    list_display = ("id", "report", "department", "status", "attempts", "createdAt", "sentAt")
+    list_filter = ("status", "department")
+    readonly_fields = ("report", "createdAt", "claimedAt", "sentAt", "lastError")
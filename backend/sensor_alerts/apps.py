@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SensorAlertsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "sensor_alerts"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -1,10 +1,70 @@
+import copy
+import hashlib
+import threading
+import time
+
+from django.core.cache import cache
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 
+from .conf import SENSOR_AUTH_CACHE
 from .models import Sensor
 
+VERSION_KEY = "sensor_auth_version"
+
+# Per-process maps of sha256(api key) -> (version, expires_at, value). Known
+# keys map to a Sensor, unknown or inactive keys to None. Kept apart so a
+# flood of bad keys can only evict other bad keys.
+_sensors = {}
+_rejected = {}
+_lock = threading.Lock()
+
+
+def _digest(api_key):
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+def _store(table, digest, version, ttl, value):
+    with _lock:
+        if len(table) >= SENSOR_AUTH_CACHE.MAX_ENTRIES:
+            table.clear()
+        table[digest] = (version, time.monotonic() + ttl, value)
+
+
+def _lookup(table, digest, version):
+    entry = table.get(digest)
+    if entry is None or entry[0] != version or entry[1] <= time.monotonic():
+        return None
+    return entry
+
+
+def invalidate_sensor_cache():
+    """
+    Forget every cached key. Bumping the shared version also reaches other
+    workers when CACHES is shared; otherwise they catch up within TTL.
+    """
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+    with _lock:
+        _sensors.clear()
+        _rejected.clear()
+
+
+def refresh_cached_sensor(sensor):
+    """Replace this process's cached copy of ``sensor`` after a non-auth field changed."""
+    digest = _digest(sensor.apiKey)
+    with _lock:
+        entry = _sensors.get(digest)
+        if entry is not None and entry[2].pk == sensor.pk:
+            _sensors[digest] = (entry[0], entry[1], copy.copy(sensor))
+
 
 class SensorAuthentication(BaseAuthentication):
+    def authenticate_header(self, request):
+        return "Sensor"
+
     def authenticate(self, request):
         header = request.META.get("HTTP_AUTHORIZATION")
         if not header:
@@ -18,9 +78,20 @@ class SensorAuthentication(BaseAuthentication):
         if token_type != "Sensor":
             raise AuthenticationFailed("Invalid token prefix")
 
+        digest = _digest(api_key)
+        version = cache.get(VERSION_KEY, 0)
+
+        if _lookup(_rejected, digest, version) is not None:
+            raise AuthenticationFailed("Invalid API Key")
+        entry = _lookup(_sensors, digest, version)
+        if entry is not None:
+            return (copy.copy(entry[2]), None)
+
         try:
             sensor = Sensor.objects.get(apiKey=api_key, isActive=True)
         except Sensor.DoesNotExist as exc:
+            _store(_rejected, digest, version, SENSOR_AUTH_CACHE.NEGATIVE_TTL, None)
             raise AuthenticationFailed("Invalid API Key") from exc
 
+        _store(_sensors, digest, version, SENSOR_AUTH_CACHE.TTL, copy.copy(sensor))
         return (sensor, None)
@@ -0,0 +1,74 @@
+from django.conf import settings
+
+from admin_hub.conf import AppSettings
+
+# Sensor readings ingest (sensor_alerts.services, .payloads and .spool).
+# RAW_PAYLOAD "compact" keeps only the rawPayload keys not already stored in
+# columns; "full" stores the payload as received. MODE "spool" acknowledges
+# with 202 once a reading is in a local SQLite WAL spool and lets a
+# background flusher write it to the database in batches.
+SENSOR_INGEST = AppSettings("SENSOR_INGEST", {
+    "MAX_BATCH_SIZE": 1000,
+    "RAW_PAYLOAD": "compact",
+    "MODE": "sync",
+    "SPOOL_PATH": settings.BASE_DIR / "spool" / "sensor_ingest.sqlite3",
+    "FLUSH_BATCH_SIZE": 500,
+    "FLUSH_INTERVAL": 1.0,
+    "MAX_PENDING": 100000,
+    "CLAIM_SECONDS": 120,
+    "MAX_ATTEMPTS": 10,
+})
+
+# Sensor alert state: a TRIGGERED reading within REOPEN_SECONDS of the sensor
+# clearing the same hazard reopens that alert instead of opening a new one.
+SENSOR_ALERTS = AppSettings("SENSOR_ALERTS", {
+    "REOPEN_SECONDS": 60,
+})
+
+# SensorAuthentication key cache (seconds; per process)
+SENSOR_AUTH_CACHE = AppSettings("SENSOR_AUTH_CACHE", {
+    "TTL": 60,
+    "NEGATIVE_TTL": 30,
+    "MAX_ENTRIES": 10000,
+})
+
+# Raw sensor readings, appended to daily Parquet partitions
+# (sensor_alerts.telemetry) instead of SensorReport.
+SENSOR_TELEMETRY = AppSettings("SENSOR_TELEMETRY", {
+    "ENABLED": True,
+    "TELEMETRY_DIR": settings.BASE_DIR / "telemetry" / "sensor_readings",
+    "BATCH_SIZE": 5000,
+    "FLUSH_INTERVAL": 10.0,
+    "MAX_BUFFER": 100000,
+})
+
+# Live alert stream (sensor_alerts.events). Alerts changed by other processes
+# are read from the database every POLL_INTERVAL seconds while a stream is
+# open in this one; 0 turns that off. Browsers open it with a single-use
+# ticket valid for TICKET_SECONDS.
+SENSOR_ALERT_STREAM = AppSettings("SENSOR_ALERT_STREAM", {
+    "POLL_INTERVAL": 1.0,
+    "POLL_OVERLAP": 2.0,
+    "HEARTBEAT_SECONDS": 15,
+    "RETRY_MS": 3000,
+    "QUEUE_SIZE": 1000,
+    "TICKET_SECONDS": 30,
+})
+
+# Sensor alert emails (sensor_alerts.notifier): one digest per department
+# every DIGEST_WINDOW seconds, sent by WORKERS threads over reused SMTP
+# connections. RECIPIENTS maps a department to its addresses; others go to
+# ADMIN_ALERT_EMAIL.
+SENSOR_ALERT_NOTIFIER = AppSettings("SENSOR_ALERT_NOTIFIER", {
+    "AUTOSTART": True,
+    "WORKERS": 2,
+    "DIGEST_WINDOW": 10,
+    "DIGEST_MAX_ALERTS": 50,
+    "RATE_PER_MINUTE": 30,
+    "POLL_INTERVAL": 2.0,
+    "CLAIM_SECONDS": 300,
+    "MAX_ATTEMPTS": 5,
+    "RETRY_SECONDS": 60,
+    "CONNECTION_IDLE_SECONDS": 60,
+    "RECIPIENTS": {},
+})
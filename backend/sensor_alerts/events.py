@@ -0,0 +1,256 @@
+"""
+Live sensor alert events for the Server-Sent Events stream
+(views.alert_stream).
+
+Ingest and the acknowledge/resolve views publish an event once their
+transaction commits, and the broker hands it to every stream open in this
+process for the alert's department. Each stream owns an asyncio queue on the
+ASGI event loop.
+
+Changes committed in another process (other workers, the spool flusher,
+manage.py) never reach this broker directly. While at least one stream is
+open, a poller thread reads the alerts whose updatedAt moved since its last
+look every POLL_INTERVAL seconds and publishes those. That is one query per
+process however many clients are connected. Events are deduplicated on
+(alert_id, updatedAt), so an alert changed here is not sent twice.
+
+Browsers open the stream with a ticket from issue_ticket() rather than the
+access token, which would otherwise end up in access logs and history.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .conf import SENSOR_ALERT_STREAM
+from .models import SensorReport, StreamTicket
+from .serializers import SensorAlertSerializer
+
+logger = logging.getLogger(__name__)
+
+RECENT_EVENTS = 10000
+
+# Put on a subscriber's queue in place of the events it could not hold.
+RESYNC = {"type": "resync"}
+
+
+def _ticket_hash(ticket):
+    return hashlib.sha256(ticket.encode()).hexdigest()
+
+
+def issue_ticket(user):
+    """
+    A ticket that opens one stream for ``user`` within TICKET_SECONDS.
+    Expired tickets are dropped on the way.
+    """
+    now = timezone.now()
+    StreamTicket.objects.filter(expiresAt__lte=now).delete()
+    ticket = secrets.token_urlsafe(32)
+    StreamTicket.objects.create(
+        keyHash=_ticket_hash(ticket),
+        user=user,
+        expiresAt=now + timedelta(seconds=SENSOR_ALERT_STREAM.TICKET_SECONDS),
+    )
+    return ticket
+
+
+def redeem_ticket(ticket):
+    """
+    The active user ``ticket`` was issued to, or None. The row is deleted on
+    first use, so of two requests racing with the same ticket only one wins.
+    """
+    issued = (
+        StreamTicket.objects.select_related("user")
+        .filter(keyHash=_ticket_hash(ticket), expiresAt__gt=timezone.now())
+        .first()
+    )
+    if issued is None or not StreamTicket.objects.filter(pk=issued.pk).delete()[0]:
+        return None
+    return issued.user if issued.user.is_active else None
+
+
+def alert_event(event_type, report):
+    """Event for ``report``. Reads ``report.sensor``."""
+    return {"type": event_type, "alert": SensorAlertSerializer(report).data}
+
+
+def format_event(event_type, data):
+    """One SSE message."""
+    return f"event: {event_type}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+
+
+async def stream_events(subscription, snapshot, load_snapshot):
+    """
+    SSE messages for one client: ``snapshot`` first, then the subscription's
+    events, with a comment every HEARTBEAT_SECONDS so proxies keep the
+    connection open. ``load_snapshot`` is awaited for a fresh snapshot when
+    the client fell behind. Unsubscribes when the client goes away.
+    """
+    try:
+        yield f"retry: {SENSOR_ALERT_STREAM.RETRY_MS}\n\n"
+        yield format_event("snapshot", snapshot)
+        heartbeat = SENSOR_ALERT_STREAM.HEARTBEAT_SECONDS
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event is RESYNC:
+                yield format_event("snapshot", await load_snapshot())
+            else:
+                yield format_event(event["type"], event["alert"])
+    finally:
+        broker.unsubscribe(subscription)
+
+
+class Subscription:
+    def __init__(self, department, loop, maxsize):
+        self.department = department
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+
+    def wants(self, event):
+        return self.department is None or event["alert"]["department"] == self.department
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # The client is not keeping up: drop what is queued and let the
+            # stream send a fresh snapshot instead.
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+    def deliver(self, event):
+        """Queue ``event`` from any thread."""
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The loop has closed; the stream is gone.
+            pass
+
+
+class AlertEventBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+        self._recent = OrderedDict()
+        self._poller = None
+        self.stats = {"published": 0, "polled": 0}
+
+    @property
+    def has_subscribers(self):
+        return bool(self._subscriptions)
+
+    def subscribe(self, department=None):
+        """
+        Open a subscription on the running event loop for one department, or
+        for all of them with None.
+        """
+        subscription = Subscription(department, asyncio.get_running_loop(), SENSOR_ALERT_STREAM.QUEUE_SIZE)
+        with self._lock:
+            self._subscriptions.add(subscription)
+            self._ensure_poller()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event):
+        """
+        Hand ``event`` to the matching subscriptions unless the same alert
+        version was already published.
+
+        Returns:
+            bool: Whether the event was new
+        """
+        alert = event["alert"]
+        key = (alert["alert_id"], alert["updatedAt"])
+        with self._lock:
+            if key in self._recent:
+                return False
+            self._recent[key] = None
+            while len(self._recent) > RECENT_EVENTS:
+                self._recent.popitem(last=False)
+            subscriptions = [subscription for subscription in self._subscriptions if subscription.wants(event)]
+        self.stats["published"] += 1
+        for subscription in subscriptions:
+            subscription.deliver(event)
+        return True
+
+    def poll(self, since):
+        """
+        Publish every alert changed since ``since``, looking POLL_OVERLAP
+        seconds further back for transactions that committed late.
+
+        Returns:
+            datetime: The cursor for the next poll
+        """
+        changed = (
+            SensorReport.objects.select_related("sensor")
+            .defer("rawPayload")
+            .filter(updatedAt__gte=since - timedelta(seconds=SENSOR_ALERT_STREAM.POLL_OVERLAP))
+            .order_by("updatedAt", "alert_id")
+        )
+        for report in changed.iterator(chunk_size=500):
+            self.stats["polled"] += self.publish(alert_event("changed", report))
+            since = max(since, report.updatedAt)
+        return since
+
+    def _ensure_poller(self):
+        # Called with self._lock held.
+        if not SENSOR_ALERT_STREAM.POLL_INTERVAL:
+            return
+        if self._poller is None or not self._poller.is_alive():
+            self._poller = threading.Thread(target=self._poll_loop, name="sensor-alert-events", daemon=True)
+            self._poller.start()
+
+    def _poll_loop(self):
+        since = timezone.now()
+        while True:
+            time.sleep(SENSOR_ALERT_STREAM.POLL_INTERVAL)
+            with self._lock:
+                if not self._subscriptions:
+                    self._poller = None
+                    return
+            try:
+                since = self.poll(since)
+            except Exception:
+                logger.exception("Sensor alert event poll failed")
+            finally:
+                close_old_connections()
+
+
+broker = AlertEventBroker()
+
+
+def publish_on_commit(changes):
+    """
+    Publish [(event type, report), ...] once the current transaction
+    commits. Nothing is serialized when no stream is open in this process.
+    """
+    if not changes:
+        return
+
+    def publish():
+        if not broker.has_subscribers:
+            return
+        for event_type, report in changes:
+            try:
+                broker.publish(alert_event(event_type, report))
+            except Exception:
+                logger.exception("Publishing sensor alert %s failed", report.pk)
+
+    transaction.on_commit(publish)
@@ -0,0 +1,108 @@
+import json
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory
+from django.utils import timezone
+
+from sensor_alerts.models import Sensor, SensorReport
+from sensor_alerts.spool import get_spool, spool_enabled
+from sensor_alerts.views import SensorReportBatchView, SensorReportView
+
+SENSOR_ID = "BENCH_SENSOR"
+API_KEY = "benchmark-sensor-key"
+# 201 when stored directly, 202 when queued in spool mode.
+ACCEPTED = (201, 202)
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _readings(count):
+    start = timezone.now() - timedelta(seconds=count)
+    return [
+        {
+            "sensorId": SENSOR_ID,
+            "lat": 12.9716,
+            "lng": 77.5946,
+            "hazard": "FIRE",
+            "dept": "Fire Department",
+            "location": "Benchmark",
+            "status": "TRIGGERED",
+            "sensor_values": {"mq2_level": 0.1 + index % 10 / 100},
+            "timestamp": (start + timedelta(seconds=index)).isoformat(),
+        }
+        for index in range(count)
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare readings/s of the single-reading and batch sensor endpoints. "
+        "Runs against a throwaway sensor inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--readings", type=int, default=1000)
+        parser.add_argument("--batch-size", type=int, action="append", help="Batch size to try (repeatable).")
+
+    def handle(self, *args, **options):
+        count = options["readings"]
+        if count < 1:
+            raise CommandError("--readings must be positive")
+        batch_sizes = options["batch_size"] or [50, 500]
+        readings = _readings(count)
+        factory = RequestFactory()
+        auth = {"HTTP_AUTHORIZATION": f"Sensor {API_KEY}"}
+
+        try:
+            with transaction.atomic():
+                sensor = Sensor.objects.create(sensorId=SENSOR_ID, lat=12.9716, lng=77.5946, apiKey=API_KEY)
+                # An alert that is already open makes every reading a
+                # coalesced update, the steady state, and sends no emails.
+                alert = SensorReport.objects.create(
+                    sensor=sensor,
+                    hazard="FIRE",
+                    department="Fire Department",
+                    status=SensorReport.STATUS_TRIGGERED,
+                    timestamp=timezone.now() - timedelta(seconds=count + 1),
+                )
+
+                single_view = SensorReportView.as_view()
+                started = time.perf_counter()
+                for reading in readings:
+                    request = factory.post("/api/sensors/report/", json.dumps(reading), content_type="application/json", **auth)
+                    response = single_view(request)
+                    if response.status_code not in ACCEPTED:
+                        raise CommandError(f"Single ingest failed: {response.status_code} {response.data}")
+                self._report("single", count, time.perf_counter() - started)
+
+                batch_view = SensorReportBatchView.as_view()
+                for batch_size in batch_sizes:
+                    started = time.perf_counter()
+                    for offset in range(0, count, batch_size):
+                        body = json.dumps(readings[offset:offset + batch_size])
+                        request = factory.post("/api/sensors/report/batch/", body, content_type="application/json", **auth)
+                        response = batch_view(request)
+                        if response.status_code not in ACCEPTED:
+                            raise CommandError(f"Batch ingest failed: {response.status_code} {response.data}")
+                    self._report(f"batch of {batch_size}", count, time.perf_counter() - started)
+
+                if spool_enabled():
+                    # The spool is outside the transaction; its rows would be
+                    # dead-lettered once the sensor is rolled back.
+                    discarded = get_spool().discard(sensor.pk)
+                    self.stdout.write(f"Spool mode: rates are for queueing; {discarded} spooled reading(s) discarded")
+                else:
+                    alert.refresh_from_db()
+                    stored = SensorReport.objects.filter(sensor=sensor).count()
+                    self.stdout.write(f"{alert.readingCount - 1} readings coalesced into {stored} alert row(s) (rolled back)")
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _report(self, label, count, elapsed):
+        self.stdout.write(f"{label:16} {count / elapsed:10.1f} readings/s  ({elapsed:.2f}s for {count})")
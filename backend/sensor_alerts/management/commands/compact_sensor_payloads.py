@@ -0,0 +1,57 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from sensor_alerts.models import SensorReport
+from sensor_alerts.payloads import compact_raw_payload, is_compact
+
+
+class Command(BaseCommand):
+    help = (
+        "Rewrite SensorReport.rawPayload of existing rows in the compact form. "
+        "Safe to re-run; rows already compact are skipped. On MySQL, run "
+        "OPTIMIZE TABLE sensor_alerts_sensorreport afterwards to return the space."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true", help="Report the savings without writing.")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        last_id = 0
+        rows = 0
+        before = 0
+        after = 0
+        while True:
+            batch = list(
+                SensorReport.objects.select_related("sensor")
+                .filter(alert_id__gt=last_id)
+                .order_by("alert_id")
+                .only("alert_id", "sensor__sensorId", "hazard", "department", "location", "timestamp", "rawPayload")
+                [:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].alert_id
+
+            changed = []
+            for report in batch:
+                if is_compact(report.rawPayload):
+                    continue
+                compact = compact_raw_payload(report, report.rawPayload)
+                before += len(json.dumps(report.rawPayload))
+                after += len(json.dumps(compact))
+                report.rawPayload = compact
+                changed.append(report)
+
+            if changed and not options["dry_run"]:
+                with transaction.atomic():
+                    SensorReport.objects.bulk_update(changed, ["rawPayload"])
+            rows += len(changed)
+
+        verb = "Would compact" if options["dry_run"] else "Compacted"
+        self.stdout.write(
+            self.style.SUCCESS(f"{verb} {rows} report(s): rawPayload {before} -> {after} bytes of JSON")
+        )
@@ -0,0 +1,41 @@
+import csv
+import json
+
+from django.core.management.base import BaseCommand
+
+from admin_hub.parquet import date_or_datetime
+from sensor_alerts.telemetry import TELEMETRY_SCHEMA, query_telemetry
+
+
+class Command(BaseCommand):
+    help = "Search raw sensor readings in the telemetry store."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sensor", help="sensorId of the device.")
+        parser.add_argument("--hazard")
+        parser.add_argument("--department")
+        parser.add_argument("--status", choices=("TRIGGERED", "CLEARED"))
+        parser.add_argument("--since", type=date_or_datetime, help="ISO date or datetime (inclusive).")
+        parser.add_argument("--until", type=date_or_datetime, help="ISO date (inclusive) or datetime (exclusive).")
+        parser.add_argument("--limit", type=int, default=100)
+        parser.add_argument("--format", choices=("json", "csv"), default="json")
+
+    def handle(self, *args, **options):
+        rows = query_telemetry(
+            sensor_id=options["sensor"],
+            hazard=options["hazard"],
+            department=options["department"],
+            status=options["status"],
+            since=options["since"],
+            until=options["until"],
+            limit=options["limit"],
+        )
+
+        if options["format"] == "csv":
+            writer = csv.DictWriter(self.stdout, fieldnames=TELEMETRY_SCHEMA.names + ["date"])
+            writer.writeheader()
+            writer.writerows(rows)
+        else:
+            for row in rows:
+                self.stdout.write(json.dumps(row, default=str))
+        self.stderr.write(f"{len(rows)} matching readings")
@@ -0,0 +1,32 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from sensor_alerts.models import AlertNotification
+from sensor_alerts.notifier import AlertNotifier
+
+
+class Command(BaseCommand):
+    help = "Send pending sensor alert emails, or show the notification backlog."
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument("--send", action="store_true", help="Send every due digest once, then exit.")
+        group.add_argument("--flush", action="store_true", help="Like --send, without waiting for the digest window.")
+        group.add_argument("--loop", action="store_true", help="Run the notifier in the foreground.")
+
+    def handle(self, *args, **options):
+        notifier = AlertNotifier()
+        if options["send"] or options["flush"]:
+            sent = notifier.send_due(ignore_window=options["flush"])
+            self.stdout.write(self.style.SUCCESS(f"Sent {sent} digest(s)"))
+        elif options["loop"]:
+            notifier.start()
+            try:
+                notifier.join()
+            except KeyboardInterrupt:
+                notifier.stop()
+            return
+        counts = AlertNotification.objects.order_by().values("status").annotate(count=Count("id"))
+        self.stdout.write(json.dumps({row["status"]: row["count"] for row in counts}, indent=2))
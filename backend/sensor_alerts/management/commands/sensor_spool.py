@@ -0,0 +1,24 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from sensor_alerts.spool import SpoolFlusherThread, get_spool
+
+
+class Command(BaseCommand):
+    help = "Inspect or drain the sensor ingest spool."
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument("--drain", action="store_true", help="Deliver everything spooled, then exit.")
+        group.add_argument("--loop", action="store_true", help="Run a flusher in the foreground.")
+
+    def handle(self, *args, **options):
+        spool = get_spool()
+        if options["drain"]:
+            delivered = spool.drain()
+            self.stdout.write(self.style.SUCCESS(f"Delivered {delivered} reading(s)"))
+        elif options["loop"]:
+            SpoolFlusherThread(spool).run()
+            return
+        self.stdout.write(json.dumps(spool.metrics(), indent=2))
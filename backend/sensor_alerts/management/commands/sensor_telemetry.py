@@ -0,0 +1,39 @@
+import json
+
+import pyarrow.parquet as pq
+from django.core.management.base import BaseCommand
+
+from admin_hub import parquet
+from sensor_alerts.telemetry import compact_telemetry, move_legacy_readings, telemetry_dir
+
+
+class Command(BaseCommand):
+    help = "Inspect and maintain the sensor telemetry store."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--compact", action="store_true", help="Merge each finished day's files into one.")
+        parser.add_argument(
+            "--import-legacy",
+            action="store_true",
+            help="Move plain CLEARED readings stored in SensorReport into the telemetry store.",
+        )
+
+    def handle(self, *args, **options):
+        if options["import_legacy"]:
+            moved = move_legacy_readings()
+            self.stdout.write(self.style.SUCCESS(f"Moved {moved} legacy reading(s) out of SensorReport"))
+        if options["compact"]:
+            result = compact_telemetry()
+            self.stdout.write(
+                self.style.SUCCESS(f"Compacted {result['days']} day(s), removed {result['files_removed']} file(s)")
+            )
+
+        partitions = parquet.partition_files(telemetry_dir())
+        summary = {
+            day.isoformat(): {
+                "files": len(files),
+                "readings": sum(pq.ParquetFile(path).metadata.num_rows for path in files),
+            }
+            for day, files in partitions.items()
+        }
+        self.stdout.write(json.dumps(summary, indent=2))
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 
 
@@ -36,6 +37,14 @@ class SensorReport(models.Model):
 
     timestamp = models.DateTimeField()
     createdAt = models.DateTimeField(auto_now_add=True)
+    updatedAt = models.DateTimeField(auto_now=True)
+
+    # Repeat TRIGGERED readings are folded into the open alert for the same
+    # (sensor, hazard) instead of creating rows; see services.store_readings.
+    lastSeenAt = models.DateTimeField(null=True, blank=True)
+    clearedAt = models.DateTimeField(null=True, blank=True)
+    peakValues = models.JSONField(default=dict)
+    readingCount = models.PositiveIntegerField(default=1)
 
     isAcknowledged = models.BooleanField(default=False)
     acknowledgedAt = models.DateTimeField(null=True, blank=True)
@@ -43,12 +52,83 @@ class SensorReport(models.Model):
     resolvedAt = models.DateTimeField(null=True, blank=True)
 
     class Meta:
-        ordering = ["-timestamp"]
+        ordering = ["-timestamp", "-alert_id"]
+        # One index per list query shape: the equality filters first, then
+        # the sort. alert_id is spelled out (InnoDB would append it
+        # ascending) so the (-timestamp, -alert_id) order needs no filesort.
+        # Non-root users always filter on department; root users do not.
         indexes = [
-            models.Index(fields=["status"]),
-            models.Index(fields=["department"]),
-            models.Index(fields=["isResolved"]),
+            # ActiveSensorAlertListView
+            models.Index(
+                fields=["department", "status", "isResolved", "-timestamp", "-alert_id"],
+                name="sensorreport_dept_active_idx",
+            ),
+            models.Index(fields=["status", "isResolved", "-timestamp", "-alert_id"], name="sensorreport_active_idx"),
+            # SensorAlertListView, with and without ?status=
+            models.Index(fields=["department", "status", "-timestamp", "-alert_id"], name="sensorreport_dept_status_idx"),
+            models.Index(fields=["department", "-timestamp", "-alert_id"], name="sensorreport_dept_ts_idx"),
+            models.Index(fields=["status", "-timestamp", "-alert_id"], name="sensorreport_status_ts_idx"),
+            models.Index(fields=["-timestamp", "-alert_id"], name="sensorreport_ts_idx"),
+            # ?sensorId= (hazard is left as a residual filter: few values)
+            models.Index(fields=["sensor", "-timestamp", "-alert_id"], name="sensorreport_sensor_ts_idx"),
+            # Open alert lookup while ingesting (services.store_readings)
+            models.Index(fields=["sensor", "hazard", "isResolved"], name="sensorreport_incident_idx"),
+            # Changes from other processes for the live stream (events.AlertEventBroker.poll)
+            models.Index(fields=["updatedAt"], name="sensorreport_updated_idx"),
         ]
 
     def __str__(self):
         return f"{self.sensor.sensorId} - {self.hazard} - {self.status}"
+
+
+class AlertNotification(models.Model):
+    """
+    An alert email waiting to go out. Stored in the transaction that opens
+    the alert and sent by sensor_alerts.notifier, batched per department.
+    """
+
+    STATUS_PENDING = "PENDING"
+    STATUS_SENDING = "SENDING"
+    STATUS_SENT = "SENT"
+    STATUS_FAILED = "FAILED"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENDING, "Sending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    report = models.ForeignKey(SensorReport, on_delete=models.CASCADE, related_name="notifications")
+    department = models.CharField(max_length=100)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    lastError = models.TextField(blank=True, default="")
+
+    createdAt = models.DateTimeField(auto_now_add=True)
+    nextAttemptAt = models.DateTimeField(null=True, blank=True)
+    claimedAt = models.DateTimeField(null=True, blank=True)
+    sentAt = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["createdAt"]
+        indexes = [
+            models.Index(fields=["status", "department", "createdAt"], name="alertnotification_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.report_id} - {self.department} - {self.status}"
+
+
+class StreamTicket(models.Model):
+    """
+    A short-lived, single-use ticket for opening the alert stream. EventSource
+    cannot send an Authorization header, so the ticket goes in the URL in
+    place of the access token; only its SHA-256 is stored.
+    """
+
+    keyHash = models.CharField(max_length=64, unique=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+")
+    expiresAt = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.user_id} - {self.expiresAt}"
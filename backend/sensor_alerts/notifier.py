@@ -0,0 +1,308 @@
+"""
+Alert email notifier.
+
+Opening an alert stores an AlertNotification in the same transaction, so a
+restart never loses an email. A dispatcher thread waits until a department's
+oldest pending notification is DIGEST_WINDOW seconds old, claims everything
+pending for that department and hands it as one digest to a fixed pool of
+WORKERS sender threads. Each worker keeps one SMTP connection from
+get_connection() open across messages, and all workers share a token bucket
+of RATE_PER_MINUTE messages (per process, like the notifier itself).
+
+More than one process may run a notifier: digests are claimed with
+SELECT ... FOR UPDATE SKIP LOCKED where the database supports it, and claims
+older than CLAIM_SECONDS (the process died mid-send) are handed out again.
+"""
+import logging
+import queue
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Min, Q
+from django.utils import timezone
+
+from .conf import SENSOR_ALERT_NOTIFIER
+from .models import AlertNotification
+
+logger = logging.getLogger(__name__)
+
+
+def recipients(department):
+    """RECIPIENTS[department], falling back to ADMIN_ALERT_EMAIL."""
+    configured = SENSOR_ALERT_NOTIFIER.RECIPIENTS.get(department)
+    if configured:
+        return list(configured)
+    return [getattr(settings, "ADMIN_ALERT_EMAIL", "admin@example.com")]
+
+
+def _describe(report):
+    return (
+        f"Sensor: {report.sensor.sensorId}\n"
+        f"Location: ({report.sensor.lat}, {report.sensor.lng})\n"
+        f"Hazard: {report.hazard}\n"
+        f"Department: {report.department}\n"
+        f"Status: {report.status}\n"
+        f"Time: {report.timestamp.isoformat()}\n"
+        f"Readings: {report.readingCount}\n\n"
+        f"Sensor Values:\n{report.sensorValues}"
+    )
+
+
+def build_digest(department, reports, connection=None):
+    if len(reports) == 1:
+        report = reports[0]
+        subject = f"[ALERT] {report.hazard} detected - {report.sensor.sensorId}"
+    else:
+        subject = f"[ALERT] {len(reports)} sensor alerts - {department}"
+    return EmailMessage(
+        subject,
+        "\n\n----\n\n".join(_describe(report) for report in reports),
+        getattr(settings, "DEFAULT_FROM_EMAIL", "noreply@example.com"),
+        recipients(department),
+        connection=connection,
+    )
+
+
+def _close(mail_connection):
+    try:
+        mail_connection.close()
+    except Exception:
+        logger.debug("Closing the alert mail connection failed", exc_info=True)
+
+
+class RateLimiter:
+    """Token bucket allowing ``per_minute`` messages, bursting up to the same number."""
+
+    def __init__(self, per_minute, clock=time.monotonic):
+        self.per_minute = per_minute
+        self._clock = clock
+        self._tokens = float(per_minute or 0)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        """
+        Take a token if one is available.
+
+        Returns:
+            float: 0 when a message may go out now, else seconds until one may
+        """
+        if not self.per_minute:
+            return 0
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.per_minute, self._tokens + (now - self._updated) * self.per_minute / 60)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) * 60 / self.per_minute
+
+    def acquire(self):
+        wait = self.try_acquire()
+        while wait:
+            time.sleep(wait)
+            wait = self.try_acquire()
+
+
+class AlertNotifier:
+    def __init__(self, workers=None):
+        self.workers = workers or SENSOR_ALERT_NOTIFIER.WORKERS
+        self.rate_limiter = RateLimiter(SENSOR_ALERT_NOTIFIER.RATE_PER_MINUTE)
+        self.stats = {"digests": 0, "alerts": 0, "failed": 0}
+        self._jobs = queue.Queue()
+        self._stop_event = threading.Event()
+        self._threads = []
+
+    @property
+    def running(self):
+        return any(thread.is_alive() for thread in self._threads)
+
+    def _pending(self, now):
+        return AlertNotification.objects.filter(status=AlertNotification.STATUS_PENDING).filter(
+            Q(nextAttemptAt__isnull=True) | Q(nextAttemptAt__lte=now)
+        )
+
+    def _claim(self, pending, department, now):
+        with transaction.atomic():
+            rows = pending.filter(department=department).order_by("createdAt", "id")
+            if connection.features.has_select_for_update_skip_locked:
+                rows = rows.select_for_update(skip_locked=True)
+            ids = list(rows.values_list("pk", flat=True)[:SENSOR_ALERT_NOTIFIER.DIGEST_MAX_ALERTS])
+            if ids:
+                AlertNotification.objects.filter(pk__in=ids).update(
+                    status=AlertNotification.STATUS_SENDING, claimedAt=now
+                )
+        return ids
+
+    def claim_due(self, now=None, ignore_window=False):
+        """
+        Claim one digest per department whose oldest pending notification is
+        older than DIGEST_WINDOW (or every department with ``ignore_window``).
+
+        Returns:
+            list: (department, [notification ids]) pairs
+        """
+        now = now or timezone.now()
+        AlertNotification.objects.filter(
+            status=AlertNotification.STATUS_SENDING,
+            claimedAt__lt=now - timedelta(seconds=SENSOR_ALERT_NOTIFIER.CLAIM_SECONDS),
+        ).update(status=AlertNotification.STATUS_PENDING, claimedAt=None)
+
+        pending = self._pending(now)
+        departments = pending.order_by().values("department").annotate(oldest=Min("createdAt"))
+        if not ignore_window:
+            departments = departments.filter(oldest__lte=now - timedelta(seconds=SENSOR_ALERT_NOTIFIER.DIGEST_WINDOW))
+
+        claims = []
+        for department in [row["department"] for row in departments]:
+            ids = self._claim(pending, department, now)
+            if ids:
+                claims.append((department, ids))
+        return claims
+
+    def send_digest(self, department, ids, mail_connection):
+        """
+        Send claimed notifications as one message over ``mail_connection``.
+
+        Returns:
+            bool: Whether the message was accepted
+        """
+        notifications = list(
+            AlertNotification.objects.select_related("report__sensor").filter(pk__in=ids).order_by("createdAt", "id")
+        )
+        if not notifications:
+            return True
+
+        message = build_digest(department, [notification.report for notification in notifications], mail_connection)
+        self.rate_limiter.acquire()
+        try:
+            mail_connection.open()
+            if not mail_connection.send_messages([message]):
+                raise RuntimeError("message was not accepted")
+        except Exception as exc:
+            _close(mail_connection)
+            self._failed(notifications, exc)
+            return False
+
+        AlertNotification.objects.filter(pk__in=ids).update(
+            status=AlertNotification.STATUS_SENT, sentAt=timezone.now(), claimedAt=None
+        )
+        self.stats["digests"] += 1
+        self.stats["alerts"] += len(notifications)
+        logger.info("Sensor alert digest sent department=%s alerts=%s", department, len(notifications))
+        return True
+
+    def _failed(self, notifications, error):
+        attempts = max(notification.attempts for notification in notifications) + 1
+        final = attempts >= SENSOR_ALERT_NOTIFIER.MAX_ATTEMPTS
+        AlertNotification.objects.filter(pk__in=[notification.pk for notification in notifications]).update(
+            status=AlertNotification.STATUS_FAILED if final else AlertNotification.STATUS_PENDING,
+            attempts=attempts,
+            lastError=str(error)[:1000],
+            claimedAt=None,
+            nextAttemptAt=None if final else timezone.now() + timedelta(seconds=SENSOR_ALERT_NOTIFIER.RETRY_SECONDS * attempts),
+        )
+        self.stats["failed"] += len(notifications)
+        log = logger.error if final else logger.warning
+        log("Sensor alert digest failed (attempt %s) for %s alert(s): %s", attempts, len(notifications), error)
+
+    def send_due(self, now=None, ignore_window=False):
+        """
+        Claim and send every due digest in the calling thread over one
+        connection.
+
+        Returns:
+            int: Number of digests sent
+        """
+        sent = 0
+        mail_connection = get_connection()
+        try:
+            for department, ids in self.claim_due(now, ignore_window):
+                sent += self.send_digest(department, ids, mail_connection)
+        finally:
+            _close(mail_connection)
+        return sent
+
+    def start(self):
+        self._stop_event.clear()
+        self._threads = [threading.Thread(target=self._dispatch, name="alert-notifier-dispatch", daemon=True)]
+        self._threads += [
+            threading.Thread(target=self._work, name=f"alert-notifier-{index}", daemon=True)
+            for index in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join(timeout=5)
+
+    def join(self, timeout=None):
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+
+    def _dispatch(self):
+        while not self._stop_event.is_set():
+            try:
+                # Claim only when the workers have caught up, so claims do not
+                # sit in the queue long enough to expire.
+                if self._jobs.empty():
+                    for claim in self.claim_due():
+                        self._jobs.put(claim)
+            except Exception:
+                logger.exception("Sensor alert dispatch failed")
+            finally:
+                close_old_connections()
+            self._stop_event.wait(SENSOR_ALERT_NOTIFIER.POLL_INTERVAL)
+
+    def _work(self):
+        mail_connection = get_connection()
+        last_used = time.monotonic()
+        while not self._stop_event.is_set():
+            try:
+                department, ids = self._jobs.get(timeout=1)
+            except queue.Empty:
+                if time.monotonic() - last_used > SENSOR_ALERT_NOTIFIER.CONNECTION_IDLE_SECONDS:
+                    _close(mail_connection)
+                continue
+            try:
+                self.send_digest(department, ids, mail_connection)
+            except Exception:
+                logger.exception("Sensor alert digest for %s crashed", department)
+            finally:
+                last_used = time.monotonic()
+                self._jobs.task_done()
+                close_old_connections()
+        _close(mail_connection)
+
+
+_notifier = None
+_lock = threading.Lock()
+
+
+def get_notifier():
+    global _notifier
+    with _lock:
+        if _notifier is None:
+            _notifier = AlertNotifier()
+        return _notifier
+
+
+def start_alert_notifier():
+    """
+    Start this process's notifier unless AUTOSTART is off (e.g. because
+    ``manage.py send_alert_notifications --loop`` runs separately). Safe to
+    call more than once.
+    """
+    if not SENSOR_ALERT_NOTIFIER.AUTOSTART:
+        return None
+    notifier = get_notifier()
+    with _lock:
+        if not notifier.running:
+            notifier.start()
+    return notifier
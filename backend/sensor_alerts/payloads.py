@@ -0,0 +1,73 @@
+"""
+Compact storage for SensorReport.rawPayload.
+
+A reading's payload mostly repeats what the report already stores in typed
+columns. In compact mode (SENSOR_INGEST["RAW_PAYLOAD"] = "compact") only the
+keys that cannot be rebuilt are kept:
+
+    {"_compact": 1, "omit": ["sensorId", "hazard", ...], "extra": {...}}
+
+``omit`` lists the keys whose original value equals the column it maps to,
+and reconstruct_raw_payload() rebuilds the full payload from those columns.
+Only columns that never change after insert qualify; status and
+sensor_values stay in ``extra`` because coalescing updates status and
+sensorValues on the open alert.
+"""
+from .conf import SENSOR_INGEST
+
+COMPACT_MARKER = "_compact"
+
+
+def _format_timestamp(value):
+    return value.isoformat().replace("+00:00", "Z")
+
+
+# Payload key -> the report's value for it.
+_COLUMNS = {
+    "sensorId": lambda report: report.sensor.sensorId,
+    "hazard": lambda report: report.hazard,
+    "dept": lambda report: report.department,
+    "location": lambda report: report.location,
+    "timestamp": lambda report: _format_timestamp(report.timestamp),
+}
+
+
+def compact_enabled():
+    return SENSOR_INGEST.RAW_PAYLOAD == "compact"
+
+
+def is_compact(payload):
+    return isinstance(payload, dict) and COMPACT_MARKER in payload
+
+
+def compact_raw_payload(report, raw):
+    """
+    Compact form of ``raw`` for ``report``. Keys are only dropped when the
+    report's column reproduces their value exactly, so anything a device
+    sent differently (other timestamp format, padded strings) is kept.
+    """
+    if not isinstance(raw, dict) or is_compact(raw):
+        return raw
+    omit = []
+    extra = {}
+    for key, value in raw.items():
+        column = _COLUMNS.get(key)
+        if column is not None and column(report) == value:
+            omit.append(key)
+        else:
+            extra[key] = value
+    return {COMPACT_MARKER: 1, "omit": omit, "extra": extra}
+
+
+def reconstruct_raw_payload(report):
+    """
+    The payload the device sent, whichever way it is stored. Reads
+    ``report.sensor``, so select_related("sensor") when doing this in bulk.
+    """
+    payload = report.rawPayload
+    if not is_compact(payload):
+        return payload
+    rebuilt = dict(payload["extra"])
+    for key in payload["omit"]:
+        rebuilt[key] = _COLUMNS[key](report)
+    return rebuilt
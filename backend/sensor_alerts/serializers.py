@@ -38,10 +38,24 @@ class SensorAlertSerializer(serializers.ModelSerializer):
             "location",
             "status",
             "sensorValues",
+            "peakValues",
+            "readingCount",
             "timestamp",
+            "lastSeenAt",
+            "clearedAt",
             "createdAt",
+            "updatedAt",
             "isAcknowledged",
             "acknowledgedAt",
             "isResolved",
             "resolvedAt",
         ]
+
+
+class SensorAlertSummarySerializer(SensorAlertSerializer):
+    """List rows without the sensor value payloads."""
+
+    class Meta(SensorAlertSerializer.Meta):
+        fields = [
+            field for field in SensorAlertSerializer.Meta.fields if field not in ("sensorValues", "peakValues")
+        ]
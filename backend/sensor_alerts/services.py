@@ -0,0 +1,255 @@
+import logging
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .conf import SENSOR_ALERTS, SENSOR_INGEST
+from .events import publish_on_commit
+from .models import AlertNotification, Sensor, SensorReport
+from .payloads import compact_enabled, compact_raw_payload
+from .telemetry import record_readings
+from .serializers import SensorReportSerializer
+
+logger = logging.getLogger(__name__)
+
+_COALESCED_FIELDS = ["status", "sensorValues", "peakValues", "lastSeenAt", "clearedAt", "readingCount", "updatedAt"]
+
+
+def max_batch_size():
+    return SENSOR_INGEST.MAX_BATCH_SIZE
+
+
+def reopen_window():
+    return timedelta(seconds=SENSOR_ALERTS.REOPEN_SECONDS)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def merge_peak(peak, values):
+    """
+    Rolling peak of sensor values: numbers keep their maximum (per key, also
+    in nested objects), anything else takes the latest value.
+    """
+    if isinstance(peak, dict) and isinstance(values, dict):
+        merged = dict(peak)
+        for key, value in values.items():
+            merged[key] = merge_peak(merged[key], value) if key in merged else value
+        return merged
+    if _is_number(peak) and _is_number(values):
+        return max(peak, values)
+    return values
+
+
+def build_report(sensor, data, raw_payload):
+    """Unsaved SensorReport for one validated reading."""
+    report = SensorReport(
+        sensor=sensor,
+        hazard=data["hazard"],
+        department=data["dept"],
+        location=data.get("location") or f'{data["lat"]}, {data["lng"]}',
+        status=data["status"],
+        sensorValues=data["sensor_values"],
+        rawPayload=raw_payload,
+        timestamp=data["timestamp"],
+        lastSeenAt=data["timestamp"],
+        peakValues=data["sensor_values"],
+    )
+    if compact_enabled():
+        report.rawPayload = compact_raw_payload(report, raw_payload)
+    return report
+
+
+def update_sensor_location(sensor, lat, lng):
+    if sensor.lat != lat or sensor.lng != lng:
+        sensor.lat = lat
+        sensor.lng = lng
+        sensor.save(update_fields=["lat", "lng"])
+
+
+def validate_readings(sensor, readings):
+    """
+    Validate each reading independently.
+
+    Returns:
+        tuple: (results with None for valid items, [(index, validated_data, raw)])
+    """
+    results = [None] * len(readings)
+    valid = []
+    for index, raw in enumerate(readings):
+        if not isinstance(raw, dict):
+            results[index] = {"index": index, "status": "invalid", "errors": {"non_field_errors": ["Expected an object"]}}
+            continue
+        serializer = SensorReportSerializer(data=raw, context={"sensor": sensor})
+        if not serializer.is_valid():
+            results[index] = {"index": index, "status": "invalid", "errors": serializer.errors}
+            continue
+        valid.append((index, serializer.validated_data, raw))
+    return results, valid
+
+
+def _current_alerts(sensor, valid):
+    """
+    Per hazard in ``valid``: the open alert, or else the newest alert the
+    sensor cleared recently enough to be reopened.
+    """
+    hazards = {data["hazard"] for _, data, _ in valid}
+    oldest = min(data["timestamp"] for _, data, _ in valid)
+    candidates = (
+        SensorReport.objects.filter(sensor=sensor, hazard__in=hazards, isResolved=False)
+        .filter(
+            Q(status=SensorReport.STATUS_TRIGGERED)
+            | Q(status=SensorReport.STATUS_CLEARED, clearedAt__gte=oldest - reopen_window())
+        )
+        .order_by("timestamp", "alert_id")
+    )
+    alerts = {}
+    for report in candidates:
+        report.sensor = sensor
+        current = alerts.get(report.hazard)
+        if current is None or report.status == SensorReport.STATUS_TRIGGERED or current.status != SensorReport.STATUS_TRIGGERED:
+            alerts[report.hazard] = report
+    return alerts
+
+
+def _coalesce(alert, data):
+    timestamp = data["timestamp"]
+    alert.readingCount += 1
+    alert.peakValues = merge_peak(alert.peakValues or alert.sensorValues, data["sensor_values"])
+    if timestamp >= (alert.lastSeenAt or alert.timestamp):
+        alert.lastSeenAt = timestamp
+        alert.sensorValues = data["sensor_values"]
+
+
+def store_readings(sensor, valid):
+    """
+    Fold validated readings of one sensor into its alerts, keeping one open
+    alert per (sensor, hazard):
+
+    - TRIGGERED with an open alert updates it in place (lastSeenAt,
+      readingCount, the latest sensorValues and the rolling peakValues);
+    - TRIGGERED with none reopens an alert the sensor cleared less than
+      SENSOR_ALERTS["REOPEN_SECONDS"] ago, so a flapping sensor does not page
+      twice, or opens a new one;
+    - CLEARED closes the open alert. It is ignored when nothing is open or
+      when it is older than the alert's last TRIGGERED reading.
+
+    Each opened alert queues an AlertNotification for the notifier, each
+    changed alert is published to the live alert stream with its last
+    outcome, and every reading goes to the telemetry store, not to
+    SensorReport.
+    Everything runs in one transaction holding the sensor row lock, so
+    concurrent requests from one sensor cannot both open an alert for the
+    same hazard. The sensor's position is updated once from the newest
+    reading.
+
+    Returns:
+        list: (outcome, report or None) per reading, in input order. The
+        outcome is "opened", "reopened", "updated", "closed" or "ignored".
+    """
+    if not valid:
+        return []
+
+    outcomes = [None] * len(valid)
+    order = sorted(range(len(valid)), key=lambda position: valid[position][1]["timestamp"])
+    window = reopen_window()
+
+    with transaction.atomic():
+        list(Sensor.objects.select_for_update().filter(pk=sensor.pk).values_list("pk", flat=True))
+        newest = valid[order[-1]][1]
+        update_sensor_location(sensor, newest["lat"], newest["lng"])
+
+        alerts = _current_alerts(sensor, valid)
+        opened = []
+        changed = {}
+        events = {}
+        for position in order:
+            _, data, raw = valid[position]
+            alert = alerts.get(data["hazard"])
+            timestamp = data["timestamp"]
+
+            if data["status"] == SensorReport.STATUS_TRIGGERED:
+                if alert is not None and alert.status == SensorReport.STATUS_TRIGGERED:
+                    _coalesce(alert, data)
+                    outcome = "updated"
+                elif alert is not None and alert.clearedAt and alert.clearedAt >= timestamp - window:
+                    alert.status = SensorReport.STATUS_TRIGGERED
+                    alert.clearedAt = None
+                    _coalesce(alert, data)
+                    outcome = "reopened"
+                else:
+                    alert = build_report(sensor, data, raw)
+                    alerts[data["hazard"]] = alert
+                    opened.append(alert)
+                    outcome = "opened"
+            elif (
+                alert is not None
+                and alert.status == SensorReport.STATUS_TRIGGERED
+                and timestamp >= (alert.lastSeenAt or alert.timestamp)
+            ):
+                alert.status = SensorReport.STATUS_CLEARED
+                alert.clearedAt = timestamp
+                outcome = "closed"
+            else:
+                outcomes[position] = ("ignored", None)
+                continue
+
+            if alert.pk is not None:
+                changed[alert.pk] = alert
+            outcomes[position] = (outcome, alert)
+            events[id(alert)] = (outcome, alert)
+
+        if changed:
+            # bulk_update skips auto_now.
+            now = timezone.now()
+            for alert in changed.values():
+                alert.updatedAt = now
+            SensorReport.objects.bulk_update(list(changed.values()), _COALESCED_FIELDS)
+
+        if connection.features.can_return_rows_from_bulk_insert:
+            SensorReport.objects.bulk_create(opened)
+        else:
+            # Without RETURNING (MySQL) bulk_create leaves alert_id unset, and
+            # every opened alert needs its id for the alert email. Openings
+            # are rare now that repeats are coalesced.
+            for alert in opened:
+                alert.save(force_insert=True)
+        AlertNotification.objects.bulk_create(
+            [AlertNotification(report=alert, department=alert.department) for alert in opened]
+        )
+        record_readings(sensor, valid)
+        publish_on_commit(list(events.values()))
+    return outcomes
+
+
+def ingest_batch(sensor, readings):
+    """
+    Validate and store many readings from one sensor.
+
+    Every reading is validated independently, so one bad item does not reject
+    the batch.
+
+    Returns:
+        tuple: (per-item results in input order, newly opened alerts)
+    """
+    results, valid = validate_readings(sensor, readings)
+    outcomes = store_readings(sensor, valid)
+
+    opened = []
+    for (index, _, _), (outcome, report) in zip(valid, outcomes):
+        results[index] = {"index": index, "status": outcome, "alert_id": report.alert_id if report else None}
+        if outcome == "opened":
+            opened.append(report)
+
+    logger.info(
+        "Sensor batch sensorId=%s received=%s accepted=%s invalid=%s opened=%s",
+        sensor.sensorId,
+        len(readings),
+        len(valid),
+        len(readings) - len(valid),
+        len(opened),
+    )
+    return results, opened
@@ -0,0 +1,24 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_sensor_cache, refresh_cached_sensor
+from .models import Sensor
+
+# Fields SensorAuthentication does not depend on; saving only these keeps
+# the cached key valid.
+_NON_AUTH_FIELDS = {"lat", "lng"}
+
+
+@receiver(post_save, sender=Sensor)
+def sensor_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= _NON_AUTH_FIELDS:
+        refresh_cached_sensor(instance)
+        return
+    # After commit, so a concurrent miss cannot re-cache the old row.
+    transaction.on_commit(invalidate_sensor_cache)
+
+
+@receiver(post_delete, sender=Sensor)
+def sensor_deleted(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_sensor_cache)
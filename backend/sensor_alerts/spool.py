@@ -0,0 +1,330 @@
+"""
+Write-behind spool for sensor readings (SENSOR_INGEST["MODE"] = "spool").
+
+Ingest views validate a reading, append it to a local SQLite database in WAL
+mode with synchronous=FULL and answer 202 once the append has committed, so a
+slow or unavailable MySQL no longer stalls devices. A flusher thread drains
+the spool to SensorReport in batches through services.store_readings().
+
+Delivery is at-least-once: rows are claimed, inserted into MySQL and only
+then deleted from the spool. A crash between the insert and the delete
+replays the batch, and claims left behind by a dead process expire after
+CLAIM_SECONDS. Rows that keep failing are moved to a dead-letter table after
+MAX_ATTEMPTS. A replayed TRIGGERED reading is coalesced into the open alert,
+so it only bumps readingCount again.
+"""
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.db import InterfaceError, OperationalError, close_old_connections
+from django.utils.dateparse import parse_datetime
+
+from .conf import SENSOR_INGEST
+from .models import Sensor
+from .services import store_readings
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS spool ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+    " sensor_id INTEGER NOT NULL,"
+    " payload TEXT NOT NULL,"
+    " enqueued_at REAL NOT NULL,"
+    " attempts INTEGER NOT NULL DEFAULT 0,"
+    " claimed_by TEXT,"
+    " claimed_at REAL)",
+    "CREATE TABLE IF NOT EXISTS dead_letter ("
+    " id INTEGER PRIMARY KEY,"
+    " sensor_id INTEGER NOT NULL,"
+    " payload TEXT NOT NULL,"
+    " enqueued_at REAL NOT NULL,"
+    " attempts INTEGER NOT NULL,"
+    " error TEXT,"
+    " failed_at REAL NOT NULL)",
+)
+
+
+class SpoolFull(Exception):
+    """Raised by enqueue when MAX_PENDING readings are already waiting."""
+
+
+def spool_enabled():
+    return SENSOR_INGEST.MODE == "spool"
+
+
+def _encode(data, raw):
+    data = dict(data)
+    data["timestamp"] = data["timestamp"].isoformat()
+    return json.dumps({"data": data, "raw": raw})
+
+
+def _decode(payload):
+    decoded = json.loads(payload)
+    data = decoded["data"]
+    data["timestamp"] = parse_datetime(data["timestamp"])
+    return data, decoded["raw"]
+
+
+class SensorSpool:
+    def __init__(self, path=None):
+        self.path = Path(path or SENSOR_INGEST.SPOOL_PATH)
+        self._lock = threading.Lock()
+        self._connection = None
+        self.stats = {"enqueued": 0, "flushed": 0, "failed": 0, "dead_lettered": 0, "rejected_full": 0}
+        self.last_flush_at = None
+
+    def _connect(self):
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            # FULL fsyncs the WAL on every commit: a 202 means the reading
+            # survives a power loss.
+            connection.execute("PRAGMA synchronous=FULL")
+            for statement in _SCHEMA:
+                connection.execute(statement)
+            self._connection = connection
+        return self._connection
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def _pending(self, connection):
+        # MAX - MIN reads both ends of the rowid b-tree instead of counting;
+        # gaps left by out-of-order deletes only make it an upper bound.
+        low, high = connection.execute("SELECT MIN(id), MAX(id) FROM spool").fetchone()
+        return 0 if low is None else high - low + 1
+
+    def enqueue(self, sensor_id, items):
+        """
+        Durably append validated readings [(data, raw), ...] for one sensor.
+
+        Raises:
+            SpoolFull: When MAX_PENDING readings are already waiting
+        """
+        now = time.time()
+        rows = [(sensor_id, _encode(data, raw), now) for data, raw in items]
+        with self._transaction() as connection:
+            if self._pending(connection) + len(rows) > SENSOR_INGEST.MAX_PENDING:
+                self.stats["rejected_full"] += len(rows)
+                raise SpoolFull()
+            connection.executemany(
+                "INSERT INTO spool (sensor_id, payload, enqueued_at) VALUES (?, ?, ?)", rows
+            )
+        self.stats["enqueued"] += len(rows)
+
+    @staticmethod
+    def _owner():
+        return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+    def _claim(self, limit):
+        now = time.time()
+        owner = self._owner()
+        with self._transaction() as connection:
+            connection.execute(
+                "UPDATE spool SET claimed_by = ?, claimed_at = ? WHERE id IN ("
+                " SELECT id FROM spool WHERE claimed_by IS NULL OR claimed_at < ?"
+                " ORDER BY id LIMIT ?)",
+                (owner, now, now - SENSOR_INGEST.CLAIM_SECONDS, limit),
+            )
+            return connection.execute(
+                "SELECT id, sensor_id, payload, attempts FROM spool"
+                " WHERE claimed_by = ? AND claimed_at = ? ORDER BY id",
+                (owner, now),
+            ).fetchall()
+
+    def _delete(self, ids):
+        with self._transaction() as connection:
+            connection.executemany("DELETE FROM spool WHERE id = ?", [(row_id,) for row_id in ids])
+
+    def _unclaim(self, rows):
+        """Hand rows back without charging an attempt (the database was unavailable)."""
+        with self._transaction() as connection:
+            connection.executemany(
+                "UPDATE spool SET claimed_by = NULL, claimed_at = NULL WHERE id = ?",
+                [(row[0],) for row in rows],
+            )
+
+    def _release(self, rows, error, dead=False):
+        """Unclaim rows the database rejected, dead-lettering those out of attempts."""
+        max_attempts = SENSOR_INGEST.MAX_ATTEMPTS
+        now = time.time()
+        retry = [] if dead else [(row[0],) for row in rows if row[3] + 1 < max_attempts]
+        dead = rows if dead else [row for row in rows if row[3] + 1 >= max_attempts]
+        with self._transaction() as connection:
+            connection.executemany(
+                "UPDATE spool SET attempts = attempts + 1, claimed_by = NULL, claimed_at = NULL WHERE id = ?",
+                retry,
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO dead_letter (id, sensor_id, payload, enqueued_at, attempts, error, failed_at)"
+                " SELECT id, sensor_id, payload, enqueued_at, attempts + 1, ?, ? FROM spool WHERE id = ?",
+                [(str(error), now, row[0]) for row in dead],
+            )
+            connection.executemany("DELETE FROM spool WHERE id = ?", [(row[0],) for row in dead])
+        self.stats["failed"] += len(retry)
+        self.stats["dead_lettered"] += len(dead)
+        if dead:
+            logger.error("Moved %s sensor reading(s) to the spool dead-letter table: %s", len(dead), error)
+
+    def _deliver(self, sensor, rows):
+        decoded = [_decode(payload) for _, _, payload, _ in rows]
+        store_readings(sensor, [(row[0], data, raw) for row, (data, raw) in zip(rows, decoded)])
+        self._delete([row[0] for row in rows])
+
+    def flush(self, limit=None):
+        """
+        Move one batch from the spool into SensorReport.
+
+        Returns:
+            int: Number of readings delivered
+        """
+        rows = self._claim(limit or SENSOR_INGEST.FLUSH_BATCH_SIZE)
+        if not rows:
+            return 0
+
+        by_sensor = {}
+        for row in rows:
+            by_sensor.setdefault(row[1], []).append(row)
+        sensors = Sensor.objects.in_bulk(list(by_sensor))
+
+        delivered = 0
+        remaining = list(by_sensor.items())
+        while remaining:
+            sensor_id, sensor_rows = remaining.pop(0)
+            sensor = sensors.get(sensor_id)
+            if sensor is None:
+                self._release(sensor_rows, f"sensor {sensor_id} no longer exists", dead=True)
+                continue
+            try:
+                self._deliver(sensor, sensor_rows)
+                delivered += len(sensor_rows)
+            except (OperationalError, InterfaceError) as exc:
+                # Database unreachable: keep everything for the next pass.
+                logger.warning("Sensor spool flush paused, database unavailable: %s", exc)
+                self._unclaim(sensor_rows + [row for _, rows_left in remaining for row in rows_left])
+                break
+            except Exception as exc:
+                logger.warning("Spool batch for sensor %s failed, retrying row by row: %s", sensor_id, exc)
+                for row in sensor_rows:
+                    try:
+                        self._deliver(sensor, [row])
+                        delivered += 1
+                    except Exception as row_exc:
+                        self._release([row], row_exc)
+
+        self.stats["flushed"] += delivered
+        self.last_flush_at = time.time()
+        return delivered
+
+    def discard(self, sensor_id):
+        """
+        Drop everything spooled or dead-lettered for one sensor.
+
+        Returns:
+            int: The number of rows removed
+        """
+        with self._transaction() as connection:
+            removed = connection.execute("DELETE FROM spool WHERE sensor_id = ?", (sensor_id,)).rowcount
+            removed += connection.execute("DELETE FROM dead_letter WHERE sensor_id = ?", (sensor_id,)).rowcount
+        return removed
+
+    def drain(self):
+        """Flush until the spool is empty or a pass delivers nothing."""
+        total = 0
+        while True:
+            delivered = self.flush()
+            total += delivered
+            if not delivered:
+                return total
+
+    def metrics(self):
+        with self._lock:
+            connection = self._connect()
+            pending = self._pending(connection)
+            oldest = connection.execute("SELECT MIN(enqueued_at) FROM spool").fetchone()[0]
+            dead = connection.execute("SELECT COUNT(*) FROM dead_letter").fetchone()[0]
+        return {
+            "pending": pending,
+            "max_pending": SENSOR_INGEST.MAX_PENDING,
+            "oldest_age_seconds": round(time.time() - oldest, 3) if oldest else 0.0,
+            "dead_letter": dead,
+            "last_flush_at": self.last_flush_at,
+            **self.stats,
+        }
+
+
+class SpoolFlusherThread(threading.Thread):
+    def __init__(self, spool, interval=None):
+        super().__init__(name="sensor-spool-flusher", daemon=True)
+        self.spool = spool
+        self.interval = interval or SENSOR_INGEST.FLUSH_INTERVAL
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                delivered = self.spool.flush()
+            except Exception:
+                logger.exception("Sensor spool flush failed")
+                delivered = 0
+            finally:
+                close_old_connections()
+            if not delivered:
+                self._stop_event.wait(self.interval)
+
+
+_spool = None
+_flusher = None
+_lock = threading.Lock()
+
+
+def get_spool():
+    global _spool
+    with _lock:
+        if _spool is None:
+            _spool = SensorSpool()
+        return _spool
+
+
+def start_spool_flusher():
+    """
+    Start this process's flusher when spool mode is on. Called at startup
+    so readings spooled before a restart are delivered even if no new ones
+    arrive. Safe to call more than once.
+    """
+    global _flusher
+    if not spool_enabled():
+        return None
+    spool = get_spool()
+    with _lock:
+        if _flusher is None or not _flusher.is_alive():
+            _flusher = SpoolFlusherThread(spool)
+            _flusher.start()
+    return _flusher
@@ -0,0 +1,237 @@
+"""
+Raw sensor telemetry.
+
+SensorReport only holds alert state. Every accepted reading, including the
+routine CLEARED ones, is appended to a Parquet store partitioned by day
+(SENSOR_TELEMETRY["TELEMETRY_DIR"]/date=YYYY-MM-DD/) instead.
+
+Readings are buffered in-process once the ingest transaction commits and a
+background thread writes one file per flush (BATCH_SIZE readings or
+FLUSH_INTERVAL seconds). compact_telemetry() later merges the small files of
+finished days into one. Telemetry is best-effort: readings still buffered
+when a process is killed are lost, alert state is not affected. With more
+than one host, point TELEMETRY_DIR at shared storage.
+"""
+import atexit
+import itertools
+import json
+import logging
+import os
+import socket
+import time
+from datetime import timezone as dt_timezone
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.db import transaction
+from django.utils import timezone
+
+from admin_hub import parquet
+from admin_hub.buffering import BufferedWriter
+
+from .conf import SENSOR_TELEMETRY
+from .models import SensorReport
+from .payloads import reconstruct_raw_payload
+
+logger = logging.getLogger(__name__)
+
+TELEMETRY_SCHEMA = pa.schema([
+    ("sensor_id", pa.int64()),
+    ("sensorId", pa.string()),
+    ("timestamp", pa.timestamp("us", tz="UTC")),
+    ("hazard", pa.string()),
+    ("department", pa.string()),
+    ("status", pa.string()),
+    ("lat", pa.float64()),
+    ("lng", pa.float64()),
+    ("sensor_values", pa.string()),
+    ("received_at", pa.timestamp("us", tz="UTC")),
+])
+
+COMPACTED_BASENAME = "compacted"
+
+
+def telemetry_dir():
+    return Path(SENSOR_TELEMETRY.TELEMETRY_DIR)
+
+
+def telemetry_row(sensor, data, received_at):
+    return {
+        "sensor_id": sensor.pk,
+        "sensorId": sensor.sensorId,
+        "timestamp": data["timestamp"].astimezone(dt_timezone.utc),
+        "hazard": data["hazard"],
+        "department": data["dept"],
+        "status": data["status"],
+        "lat": data["lat"],
+        "lng": data["lng"],
+        "sensor_values": json.dumps(data["sensor_values"]),
+        "received_at": received_at,
+    }
+
+
+class TelemetryWriter(BufferedWriter):
+    """
+    Buffers telemetry rows and appends them to the store in batches. Rows
+    that do not fit in the buffer are dropped.
+    """
+
+    thread_name = "sensor-telemetry-writer"
+
+    def __init__(self, root=None, batch_size=None, flush_interval=None, max_buffer=None, start_thread=True):
+        super().__init__(
+            batch_size or SENSOR_TELEMETRY.BATCH_SIZE,
+            flush_interval or SENSOR_TELEMETRY.FLUSH_INTERVAL,
+            max_buffer or SENSOR_TELEMETRY.MAX_BUFFER,
+            start_thread=start_thread,
+        )
+        self._root = root
+        self._sequence = itertools.count()
+        self.stats.update({"files": 0, "dropped": 0})
+
+    @property
+    def root(self):
+        return Path(self._root) if self._root else telemetry_dir()
+
+    def _basename(self):
+        return f"part-{socket.gethostname()}-{os.getpid()}-{int(time.time() * 1000)}-{next(self._sequence)}"
+
+    def overflow(self, rows):
+        self.count("dropped", len(rows))
+        logger.warning("Sensor telemetry buffer full, dropping %s reading(s)", len(rows))
+
+    def write(self, rows):
+        """Write one file per day; returns the number of readings written."""
+        by_day = {}
+        for row in rows:
+            by_day.setdefault(row["timestamp"].date(), []).append(row)
+        written = 0
+        for day, day_rows in by_day.items():
+            try:
+                parquet.write_partition(self.root, day, day_rows, TELEMETRY_SCHEMA, basename=self._basename())
+            except Exception:
+                logger.exception("Sensor telemetry write failed, %s reading(s) lost", len(day_rows))
+                continue
+            written += len(day_rows)
+            self.count("files")
+        return written
+
+
+telemetry_writer = TelemetryWriter()
+atexit.register(telemetry_writer.shutdown)
+
+
+def record_readings(sensor, valid):
+    """
+    Queue validated readings [(index, data, raw), ...] of one sensor for the
+    telemetry store once the current transaction commits, so a rolled-back
+    and retried batch is not recorded twice.
+    """
+    if not valid or not SENSOR_TELEMETRY.ENABLED:
+        return
+    received_at = timezone.now()
+    rows = [telemetry_row(sensor, data, received_at) for _, data, _ in valid]
+    transaction.on_commit(lambda: telemetry_writer.add(rows))
+
+
+def compact_telemetry(today=None):
+    """
+    Merge each finished day's files into one, sorted by timestamp. Files that
+    appear while a day is being merged are left for the next run.
+
+    Returns:
+        dict: Number of days merged and files removed
+    """
+    today = today or timezone.now().date()
+    root = telemetry_dir()
+    days = 0
+    removed = 0
+    for day, files in parquet.partition_files(root).items():
+        if day >= today or len(files) < 2:
+            continue
+        table = pa.concat_tables(pq.read_table(path, schema=TELEMETRY_SCHEMA) for path in files)
+        table = table.sort_by([("timestamp", "ascending"), ("sensor_id", "ascending")])
+        merged = parquet.write_table(root, day, table, basename=COMPACTED_BASENAME)
+        for path in files:
+            if path != merged:
+                path.unlink()
+                removed += 1
+        days += 1
+    if days:
+        logger.info("Compacted sensor telemetry for %s day(s), removed %s file(s)", days, removed)
+    return {"days": days, "files_removed": removed}
+
+
+def query_telemetry(sensor_id=None, hazard=None, department=None, status=None,
+                    since=None, until=None, limit=None, columns=None):
+    """
+    Search the telemetry store. ``sensor_id`` is the device's sensorId.
+    ``since``/``until`` (dates or aware datetimes) prune whole partitions;
+    the equality filters are pushed down to row-group statistics.
+
+    Returns:
+        list: Matching rows as dicts, newest first
+    """
+    return parquet.query(
+        telemetry_dir(),
+        TELEMETRY_SCHEMA,
+        since=since,
+        until=until,
+        equals={
+            "sensorId": sensor_id,
+            "hazard": hazard,
+            "department": department,
+            "status": status,
+        },
+        order_by=("timestamp", "sensor_id"),
+        limit=limit,
+        columns=columns,
+    )
+
+
+def move_legacy_readings(batch_size=1000):
+    """
+    Move SensorReport rows that were plain CLEARED readings (stored before
+    alerts were coalesced) into the telemetry store. Alert rows, including
+    ones closed by the sensor or resolved by an admin, stay.
+
+    Returns:
+        int: Number of rows moved
+    """
+    legacy = SensorReport.objects.filter(
+        status=SensorReport.STATUS_CLEARED, clearedAt__isnull=True, isResolved=False
+    )
+    root = telemetry_dir()
+    moved = 0
+    while True:
+        reports = list(legacy.select_related("sensor").order_by("alert_id")[:batch_size])
+        if not reports:
+            return moved
+
+        by_day = {}
+        for report in reports:
+            raw = reconstruct_raw_payload(report)
+            raw = raw if isinstance(raw, dict) else {}
+            timestamp = report.timestamp.astimezone(dt_timezone.utc)
+            by_day.setdefault(timestamp.date(), []).append({
+                "sensor_id": report.sensor_id,
+                "sensorId": report.sensor.sensorId,
+                "timestamp": timestamp,
+                "hazard": report.hazard,
+                "department": report.department,
+                "status": report.status,
+                "lat": raw.get("lat", report.sensor.lat),
+                "lng": raw.get("lng", report.sensor.lng),
+                "sensor_values": json.dumps(report.sensorValues),
+                "received_at": report.createdAt,
+            })
+        # Named after the id range, so a crash before the delete only leads
+        # to the same file being rewritten.
+        for day, rows in by_day.items():
+            parquet.write_partition(
+                root, day, rows, TELEMETRY_SCHEMA, basename=f"legacy-{reports[0].alert_id}-{reports[-1].alert_id}"
+            )
+        with transaction.atomic():
+            SensorReport.objects.filter(alert_id__in=[report.alert_id for report in reports]).delete()
+        moved += len(reports)
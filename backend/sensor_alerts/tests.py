@@ -1,16 +1,61 @@
+import asyncio
+import json
+import os
+import re
+import tempfile
+import unittest
+from datetime import date, timedelta
+from io import StringIO
+from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import patch
 
+from asgiref.sync import sync_to_async
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
 
 from accounts.models import User
-from sensor_alerts.models import Sensor, SensorReport
+from admin_hub import parquet
+from sensor_alerts.admin import SensorAdmin
+from sensor_alerts.authentication import invalidate_sensor_cache
+from sensor_alerts.events import AlertEventBroker, broker, redeem_ticket
+from sensor_alerts.models import AlertNotification, Sensor, SensorReport, StreamTicket
+from sensor_alerts.notifier import AlertNotifier, RateLimiter
+from sensor_alerts.payloads import reconstruct_raw_payload
+from sensor_alerts.serializers import SensorReportSerializer
+from sensor_alerts.services import merge_peak, store_readings
+from sensor_alerts.spool import SensorSpool
+from sensor_alerts.telemetry import TelemetryWriter, compact_telemetry, move_legacy_readings, query_telemetry
+from sensor_alerts.views import ActiveSensorAlertListView, SensorAlertListView
+
+
+def setUpModule():
+    # Any test that runs on_commit callbacks while ingesting records
+    # telemetry; keep it out of the real store.
+    telemetry_root = tempfile.TemporaryDirectory()
+    settings_override = override_settings(SENSOR_TELEMETRY={"TELEMETRY_DIR": telemetry_root.name})
+    writer_patch = patch(
+        "sensor_alerts.telemetry.telemetry_writer", TelemetryWriter(root=telemetry_root.name, start_thread=False)
+    )
+    settings_override.enable()
+    writer_patch.start()
+    unittest.addModuleCleanup(telemetry_root.cleanup)
+    unittest.addModuleCleanup(settings_override.disable)
+    unittest.addModuleCleanup(writer_patch.stop)
 
 
-class SensorReportIngestTests(APITestCase):
+class SensorIngestTestCase(APITestCase):
     def setUp(self):
+        invalidate_sensor_cache()
         self.client = APIClient()
         self.sensor = Sensor.objects.create(
             sensorId="ESP32_01",
@@ -32,12 +77,16 @@ class SensorReportIngestTests(APITestCase):
             "timestamp": "2026-02-14T11:23:04Z",
         }
 
+    def assertNotified(self, *alert_ids):
+        self.assertCountEqual(AlertNotification.objects.values_list("report_id", flat=True), alert_ids)
+
+
+class SensorReportIngestTests(SensorIngestTestCase):
     def test_missing_api_key_returns_401(self):
         response = self.client.post(self.url, self.payload, format="json")
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
-    @patch("sensor_alerts.views.trigger_alert_email")
-    def test_triggered_report_creates_row_and_triggers_email(self, mock_trigger):
+    def test_triggered_report_creates_row_and_triggers_email(self):
         response = self.client.post(
             self.url,
             self.payload,
@@ -46,11 +95,9 @@ class SensorReportIngestTests(APITestCase):
         )
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertEqual(SensorReport.objects.count(), 1)
-        mock_trigger.assert_called_once()
+        self.assertNotified(SensorReport.objects.get().alert_id)
 
-    @patch("sensor_alerts.views.trigger_alert_email")
-    def test_cleared_report_does_not_trigger_email(self, mock_trigger):
+    def test_cleared_report_does_not_trigger_email(self):
         payload = {**self.payload, "status": "CLEARED"}
         response = self.client.post(
             self.url,
@@ -60,7 +107,483 @@ class SensorReportIngestTests(APITestCase):
         )
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        mock_trigger.assert_not_called()
+        self.assertNotified()
+
+    def test_repeat_trigger_updates_the_open_alert(self):
+        auth = {"HTTP_AUTHORIZATION": "Sensor sensor-key-123"}
+        first = self.client.post(self.url, self.payload, format="json", **auth)
+        second = self.client.post(
+            self.url,
+            {**self.payload, "timestamp": "2026-02-14T11:24:04Z", "sensor_values": {"mq2_level": 0.2}},
+            format="json",
+            **auth,
+        )
+
+        self.assertEqual((first.data["status"], second.data["status"]), ("opened", "updated"))
+        alert = SensorReport.objects.get()
+        self.assertEqual(second.data["alert_id"], alert.alert_id)
+        self.assertEqual(alert.readingCount, 2)
+        self.assertEqual(alert.sensorValues, {"mq2_level": 0.2})
+        self.assertEqual(alert.peakValues, {"mq2_level": 0.35})
+        self.assertNotified(alert.alert_id)
+
+
+class SensorAlertStateTests(SensorIngestTestCase):
+    def _store(self, *readings):
+        valid = []
+        for index, overrides in enumerate(readings):
+            serializer = SensorReportSerializer(data={**self.payload, **overrides}, context={"sensor": self.sensor})
+            serializer.is_valid(raise_exception=True)
+            valid.append((index, serializer.validated_data, {}))
+        return [outcome for outcome, _ in store_readings(self.sensor, valid)]
+
+    def test_trigger_soon_after_clear_reopens_the_alert(self):
+        self._store({"timestamp": "2026-02-14T11:00:00Z"}, {"status": "CLEARED", "timestamp": "2026-02-14T11:00:10Z"})
+        self.assertEqual(self._store({"timestamp": "2026-02-14T11:00:40Z"}), ["reopened"])
+        self.assertEqual(SensorReport.objects.get().status, "TRIGGERED")
+
+        self._store({"status": "CLEARED", "timestamp": "2026-02-14T11:01:00Z"})
+        self.assertEqual(self._store({"timestamp": "2026-02-14T11:05:00Z"}), ["opened"])
+        self.assertEqual(SensorReport.objects.count(), 2)
+
+    def test_stale_clear_does_not_close_the_alert(self):
+        self._store({"timestamp": "2026-02-14T11:00:00Z"}, {"timestamp": "2026-02-14T11:00:30Z"})
+        self.assertEqual(self._store({"status": "CLEARED", "timestamp": "2026-02-14T11:00:20Z"}), ["ignored"])
+        self.assertEqual(SensorReport.objects.get().status, "TRIGGERED")
+
+    def test_hazards_are_tracked_separately_and_resolve_ends_the_incident(self):
+        self.assertEqual(self._store({}, {"hazard": "GAS"}), ["opened", "opened"])
+        SensorReport.objects.filter(hazard="FIRE").update(isResolved=True, status="CLEARED")
+
+        self.assertEqual(self._store({"timestamp": "2026-02-14T11:30:00Z"}, {"hazard": "GAS"}), ["opened", "updated"])
+        self.assertEqual(SensorReport.objects.filter(hazard="FIRE").count(), 2)
+
+    def test_merge_peak(self):
+        self.assertEqual(
+            merge_peak({"a": 1, "b": {"c": 5}, "d": "x"}, {"a": 3, "b": {"c": 2}, "d": "y", "e": True}),
+            {"a": 3, "b": {"c": 5}, "d": "y", "e": True},
+        )
+
+
+class RawPayloadCompactionTests(SensorIngestTestCase):
+    def _ingest(self, payload):
+        self.client.post(self.url, payload, format="json", HTTP_AUTHORIZATION="Sensor sensor-key-123")
+        return SensorReport.objects.select_related("sensor").get()
+
+    def test_columns_are_not_stored_twice(self):
+        report = self._ingest(self.payload)
+
+        self.assertEqual(
+            set(report.rawPayload["omit"]), {"sensorId", "hazard", "dept", "location", "timestamp"}
+        )
+        self.assertEqual(set(report.rawPayload["extra"]), {"lat", "lng", "status", "sensor_values"})
+        self.assertEqual(reconstruct_raw_payload(report), self.payload)
+
+    def test_values_the_columns_do_not_reproduce_are_kept(self):
+        payload = {**self.payload, "timestamp": "2026-02-14T16:53:04+05:30", "firmware": "1.4.2"}
+        report = self._ingest(payload)
+
+        self.assertEqual(report.rawPayload["extra"]["timestamp"], "2026-02-14T16:53:04+05:30")
+        self.assertEqual(reconstruct_raw_payload(report), payload)
+
+    def test_full_mode_and_backfill_command(self):
+        with self.settings(SENSOR_INGEST={"RAW_PAYLOAD": "full"}):
+            report = self._ingest(self.payload)
+        self.assertEqual(report.rawPayload, self.payload)
+
+        call_command("compact_sensor_payloads", stdout=StringIO())
+        call_command("compact_sensor_payloads", stdout=StringIO())
+
+        report.refresh_from_db()
+        self.assertEqual(report.rawPayload["_compact"], 1)
+        self.assertEqual(reconstruct_raw_payload(report), self.payload)
+
+
+class SensorTelemetryTests(SensorIngestTestCase):
+    def setUp(self):
+        super().setUp()
+        telemetry_root = tempfile.TemporaryDirectory()
+        self.addCleanup(telemetry_root.cleanup)
+        self.root = Path(telemetry_root.name)
+        settings_override = self.settings(SENSOR_TELEMETRY={"TELEMETRY_DIR": self.root})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.writer = TelemetryWriter(start_thread=False)
+        patcher = patch("sensor_alerts.telemetry.telemetry_writer", self.writer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.batch_url = reverse("sensor-report-batch")
+        self.auth = {"HTTP_AUTHORIZATION": "Sensor sensor-key-123"}
+
+    def _post(self, readings):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.batch_url, readings, format="json", **self.auth)
+        self.writer.flush()
+
+    def test_every_reading_goes_to_telemetry_and_only_alerts_to_sensor_report(self):
+        self._post([
+            {**self.payload, "status": "CLEARED", "timestamp": "2026-02-13T23:59:00Z"},
+            {**self.payload, "timestamp": "2026-02-14T11:23:04Z"},
+            {**self.payload, "timestamp": "2026-02-14T11:23:05Z", "sensor_values": {"mq2_level": 0.5}},
+        ])
+
+        self.assertEqual(SensorReport.objects.count(), 1)
+        self.assertEqual(sorted(parquet.partition_files(self.root)), [date(2026, 2, 13), date(2026, 2, 14)])
+
+        rows = query_telemetry(sensor_id="ESP32_01", since=date(2026, 2, 14))
+        self.assertEqual([json.loads(row["sensor_values"]) for row in rows], [{"mq2_level": 0.5}, {"mq2_level": 0.35}])
+        self.assertEqual(len(query_telemetry(status="CLEARED")), 1)
+
+    def test_compaction_merges_finished_days_only(self):
+        for second in range(3):
+            self._post([{**self.payload, "timestamp": f"2026-02-14T11:23:0{second}Z"}])
+        self._post([{**self.payload, "timestamp": "2026-02-15T00:00:00Z"}])
+
+        result = compact_telemetry(today=date(2026, 2, 15))
+
+        self.assertEqual(result, {"days": 1, "files_removed": 3})
+        files = parquet.partition_files(self.root)
+        self.assertEqual([path.name for path in files[date(2026, 2, 14)]], ["compacted.parquet"])
+        self.assertEqual(len(files[date(2026, 2, 15)]), 1)
+        self.assertEqual(len(query_telemetry()), 4)
+
+    def test_legacy_cleared_readings_are_moved_out_of_sensor_report(self):
+        common = {"sensor": self.sensor, "hazard": "FIRE", "department": "Fire Department", "timestamp": timezone.now()}
+        SensorReport.objects.create(status="CLEARED", sensorValues={"mq2_level": 0.1}, **common)
+        closed = SensorReport.objects.create(status="CLEARED", clearedAt=timezone.now(), **common)
+        resolved = SensorReport.objects.create(status="CLEARED", isResolved=True, **common)
+
+        self.assertEqual(move_legacy_readings(), 1)
+
+        self.assertCountEqual(SensorReport.objects.values_list("alert_id", flat=True), [closed.alert_id, resolved.alert_id])
+        [row] = query_telemetry()
+        self.assertEqual((row["status"], row["lat"]), ("CLEARED", self.sensor.lat))
+
+
+class SensorReportBatchIngestTests(SensorIngestTestCase):
+    def setUp(self):
+        super().setUp()
+        self.batch_url = reverse("sensor-report-batch")
+        self.auth = {"HTTP_AUTHORIZATION": "Sensor sensor-key-123"}
+
+    def _reading(self, second, **overrides):
+        return {**self.payload, "status": "CLEARED", "timestamp": f"2026-02-14T11:23:{second:02d}Z", **overrides}
+
+    def test_repeat_readings_are_coalesced_into_one_alert(self):
+        readings = [
+            self._reading(second, status="TRIGGERED", sensor_values={"mq2_level": round(0.3 + (0.2 if second == 7 else 0) + second / 100, 2)})
+            for second in range(15)
+        ] + [self._reading(second) for second in range(15, 20)]
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.batch_url, readings, format="json", **self.auth)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["accepted"], 20)
+        self.assertEqual(
+            [item["status"] for item in response.data["results"]],
+            ["opened"] + ["updated"] * 14 + ["closed"] + ["ignored"] * 4,
+        )
+        inserts = [q for q in ctx.captured_queries if q["sql"].startswith('INSERT INTO "sensor_alerts_sensorreport"')]
+        self.assertEqual(len(inserts), 1)
+
+        alert = SensorReport.objects.get()
+        self.assertEqual(response.data["results"][0]["alert_id"], alert.alert_id)
+        self.assertEqual(alert.status, "CLEARED")
+        self.assertEqual(alert.readingCount, 15)
+        self.assertEqual(alert.lastSeenAt.second, 14)
+        self.assertEqual(alert.clearedAt.second, 15)
+        self.assertEqual(alert.sensorValues, {"mq2_level": 0.44})
+        self.assertEqual(alert.peakValues, {"mq2_level": 0.57})
+        self.assertNotified(alert.alert_id)
+
+    def test_invalid_items_are_reported_per_item(self):
+        readings = [
+            self._reading(1, status="TRIGGERED"),
+            self._reading(2, sensorId="ESP32_99"),
+            self._reading(3, status="UNKNOWN"),
+            "not-an-object",
+        ]
+
+        response = self.client.post(self.batch_url, readings, format="json", **self.auth)
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([item["status"] for item in response.data["results"]], ["opened", "invalid", "invalid", "invalid"])
+        self.assertIn("sensorId", response.data["results"][1]["errors"])
+        self.assertEqual(SensorReport.objects.count(), 1)
+
+    def test_ndjson_body_and_newest_reading_sets_location(self):
+        readings = [self._reading(9, lat=13.0), self._reading(1, lat=11.0)]
+        body = "\n".join(json.dumps(reading) for reading in readings) + "\n"
+
+        response = self.client.generic("POST", self.batch_url, body, content_type="application/x-ndjson", **self.auth)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.sensor.refresh_from_db()
+        self.assertEqual(self.sensor.lat, 13.0)
+
+    def test_batch_size_limit(self):
+        with self.settings(SENSOR_INGEST={"MAX_BATCH_SIZE": 2}):
+            response = self.client.post(self.batch_url, [self._reading(second) for second in range(3)], format="json", **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SensorAuthenticationCacheTests(SensorIngestTestCase):
+    def _post(self, key="sensor-key-123", **overrides):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(
+                self.url,
+                {**self.payload, "status": "CLEARED", **overrides},
+                format="json",
+                HTTP_AUTHORIZATION=f"Sensor {key}",
+            )
+        sensor_queries = [q for q in ctx.captured_queries if '"sensor_alerts_sensor"."apiKey" =' in q["sql"]]
+        return response, len(sensor_queries)
+
+    def test_known_key_is_served_from_cache(self):
+        self.assertEqual(self._post()[1], 1)
+        response, queries = self._post()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(queries, 0)
+
+    def test_unknown_key_is_negatively_cached(self):
+        self.assertEqual(self._post(key="wrong")[0].status_code, status.HTTP_401_UNAUTHORIZED)
+        response, queries = self._post(key="wrong")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(queries, 0)
+
+    def test_deactivated_sensor_is_rejected_after_commit(self):
+        self._post()
+        self.sensor.isActive = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sensor.save()
+
+        self.assertEqual(self._post()[0].status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_admin_deactivate_action_invalidates(self):
+        self._post()
+        with self.captureOnCommitCallbacks(execute=True), patch.object(SensorAdmin, "message_user"):
+            SensorAdmin(Sensor, None).deactivate_sensors(None, Sensor.objects.filter(pk=self.sensor.pk))
+
+        self.assertEqual(self._post()[0].status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_location_update_keeps_cache_warm(self):
+        self._post()
+        self._post(lat=13.5)
+        response, queries = self._post(lat=13.5)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(queries, 0)
+        self.sensor.refresh_from_db()
+        self.assertEqual(self.sensor.lat, 13.5)
+
+
+class SensorSpoolTests(SensorIngestTestCase):
+    def setUp(self):
+        super().setUp()
+        spool_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(spool_dir.cleanup)
+        self.spool_path = Path(spool_dir.name) / "spool.sqlite3"
+        self.ingest_settings = {"MODE": "spool", "SPOOL_PATH": self.spool_path, "MAX_PENDING": 100, "CLAIM_SECONDS": 120}
+        settings_override = self.settings(SENSOR_INGEST=self.ingest_settings)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.spool = SensorSpool()
+        self.addCleanup(self.spool.close)
+        for target, value in (
+            ("sensor_alerts.views.get_spool", self.spool),
+            ("sensor_alerts.views.start_spool_flusher", None),
+        ):
+            patcher = patch(target, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.auth = {"HTTP_AUTHORIZATION": "Sensor sensor-key-123"}
+
+    def test_reading_is_acknowledged_before_it_reaches_the_database(self):
+        response = self.client.post(self.url, self.payload, format="json", **self.auth)
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(SensorReport.objects.count(), 0)
+        self.assertEqual(self.spool.metrics()["pending"], 1)
+
+        self.assertEqual(self.spool.flush(), 1)
+        report = SensorReport.objects.get()
+        self.assertEqual(report.sensorValues, {"mq2_level": 0.35})
+        self.assertEqual(reconstruct_raw_payload(report)["sensorId"], "ESP32_01")
+        self.assertNotified(report.alert_id)
+        self.assertEqual(self.spool.metrics()["pending"], 0)
+
+    def test_spooled_readings_survive_a_restart(self):
+        self.client.post(self.batch_url(), [self.payload] * 3, format="json", **self.auth)
+        self.spool.close()
+
+        restarted = SensorSpool(self.spool_path)
+        self.addCleanup(restarted.close)
+        self.assertEqual(restarted.drain(), 3)
+        report = SensorReport.objects.get()
+        self.assertEqual(report.readingCount, 3)
+        self.assertNotified(report.alert_id)
+
+    def test_claims_of_a_crashed_flusher_are_redelivered(self):
+        self.client.post(self.url, self.payload, format="json", **self.auth)
+        self.assertEqual(len(self.spool._claim(10)), 1)  # flusher dies before delivering
+
+        self.assertEqual(self.spool.flush(), 0)
+        with self.settings(SENSOR_INGEST={**self.ingest_settings, "CLAIM_SECONDS": 0}):
+            self.assertEqual(self.spool.flush(), 1)
+        self.assertEqual(SensorReport.objects.count(), 1)
+
+    def test_full_spool_applies_backpressure(self):
+        with self.settings(SENSOR_INGEST={**self.ingest_settings, "MAX_PENDING": 1}):
+            first = self.client.post(self.url, {**self.payload, "status": "CLEARED"}, format="json", **self.auth)
+            second = self.client.post(self.url, {**self.payload, "status": "CLEARED"}, format="json", **self.auth)
+
+        self.assertEqual(first.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(second.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(self.spool.metrics()["rejected_full"], 1)
+
+    def test_batch_reports_queued_and_invalid_items(self):
+        readings = [{**self.payload, "status": "CLEARED"}, {**self.payload, "sensorId": "OTHER"}]
+        response = self.client.post(self.batch_url(), readings, format="json", **self.auth)
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([item["status"] for item in response.data["results"]], ["queued", "invalid"])
+        self.assertEqual(self.spool.metrics()["pending"], 1)
+
+    def batch_url(self):
+        return reverse("sensor-report-batch")
+
+
+class AlertNotifierTests(SensorIngestTestCase):
+    def setUp(self):
+        super().setUp()
+        self.notifier = AlertNotifier(workers=1)
+        self.auth = {"HTTP_AUTHORIZATION": "Sensor sensor-key-123"}
+
+    def _open(self, hazard, dept="Fire Department"):
+        self.client.post(self.url, {**self.payload, "hazard": hazard, "dept": dept}, format="json", **self.auth)
+
+    def test_one_digest_per_department_after_the_window(self):
+        self._open("FIRE")
+        self._open("SMOKE")
+        self._open("GAS", dept="Gas Department")
+        self.assertEqual(self.notifier.send_due(), 0)
+
+        later = timezone.now() + timedelta(seconds=11)
+        with self.settings(SENSOR_ALERT_NOTIFIER={"RECIPIENTS": {"Gas Department": ["gas@example.com"]}}):
+            self.assertEqual(self.notifier.send_due(now=later), 2)
+
+        messages = {message.subject: message for message in mail.outbox}
+        self.assertEqual(sorted(messages), ["[ALERT] 2 sensor alerts - Fire Department", "[ALERT] GAS detected - ESP32_01"])
+        self.assertEqual(messages["[ALERT] GAS detected - ESP32_01"].to, ["gas@example.com"])
+        self.assertFalse(AlertNotification.objects.exclude(status=AlertNotification.STATUS_SENT).exists())
+
+    def test_failed_digest_backs_off_then_gives_up(self):
+        self._open("FIRE")
+        with self.settings(SENSOR_ALERT_NOTIFIER={"MAX_ATTEMPTS": 2}), patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages", side_effect=OSError("smtp down")
+        ):
+            self.assertEqual(self.notifier.send_due(ignore_window=True), 0)
+            notification = AlertNotification.objects.get()
+            self.assertEqual((notification.status, notification.attempts), ("PENDING", 1))
+            self.assertIsNotNone(notification.nextAttemptAt)
+
+            self.assertEqual(self.notifier.claim_due(ignore_window=True), [])
+            self.notifier.send_due(now=timezone.now() + timedelta(minutes=2), ignore_window=True)
+
+        notification.refresh_from_db()
+        self.assertEqual((notification.status, notification.attempts), ("FAILED", 2))
+        self.assertEqual(notification.lastError, "smtp down")
+
+    def test_claims_of_a_dead_process_are_sent_again(self):
+        self._open("FIRE")
+        self.assertEqual(len(self.notifier.claim_due(ignore_window=True)), 1)
+
+        self.assertEqual(self.notifier.send_due(ignore_window=True), 0)
+        self.assertEqual(self.notifier.send_due(now=timezone.now() + timedelta(seconds=301), ignore_window=True), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_rate_limiter(self):
+        clock = [0.0]
+        limiter = RateLimiter(2, clock=lambda: clock[0])
+        self.assertEqual([limiter.try_acquire(), limiter.try_acquire()], [0, 0])
+        self.assertAlmostEqual(limiter.try_acquire(), 30)
+        clock[0] = 30
+        self.assertEqual(limiter.try_acquire(), 0)
+
+
+def _plan_sorts(plan):
+    """Whether an EXPLAIN plan from QuerySet.explain() sorts instead of reading an index in order."""
+    if connection.vendor == "mysql":
+        return "filesort" in plan
+    if connection.vendor == "postgresql":
+        return re.search(r"^\s*(->\s*)?(Incremental )?Sort\b", plan, re.MULTILINE) is not None
+    return "TEMP B-TREE FOR ORDER BY" in plan
+
+
+class SensorAlertQueryPlanTests(TransactionTestCase):
+    """
+    The list views must read SensorReport in index order. Seeds
+    SENSOR_EXPLAIN_ROWS rows (default 20000; set 1000000 for the full-size
+    check) and refreshes planner statistics before asking for the plans.
+    """
+
+    departments = ["Fire Department", "Gas Department", "Police", "Health", "Municipal"]
+
+    @classmethod
+    def _seed(cls, rows):
+        sensors = Sensor.objects.bulk_create(
+            Sensor(sensorId=f"EXPLAIN_{index}", lat=12.9, lng=77.5, apiKey=f"explain-{index}") for index in range(50)
+        )
+        start = timezone.now() - timedelta(days=365)
+        batch = []
+        for index in range(rows):
+            # Roughly 1 in 50 alerts is still open.
+            open_alert = index % 50 == 0
+            batch.append(
+                SensorReport(
+                    sensor=sensors[index % len(sensors)],
+                    hazard=("FIRE", "GAS", "FLOOD")[index % 3],
+                    department=cls.departments[index % len(cls.departments)],
+                    status=SensorReport.STATUS_TRIGGERED if open_alert else SensorReport.STATUS_CLEARED,
+                    isResolved=not open_alert and index % 3 == 0,
+                    timestamp=start + timedelta(seconds=index * 30),
+                )
+            )
+            if len(batch) == 5000:
+                SensorReport.objects.bulk_create(batch)
+                batch = []
+        SensorReport.objects.bulk_create(batch)
+
+        with connection.cursor() as cursor:
+            if connection.vendor == "mysql":
+                cursor.execute("ANALYZE TABLE sensor_alerts_sensorreport")
+            elif connection.vendor == "postgresql":
+                cursor.execute("ANALYZE sensor_alerts_sensorreport")
+            else:
+                cursor.execute("ANALYZE")
+
+    def setUp(self):
+        self._seed(int(os.environ.get("SENSOR_EXPLAIN_ROWS", 20000)))
+        self.admin = SimpleNamespace(is_root=False, department="Gas Department")
+        self.root = SimpleNamespace(is_root=True, department="")
+
+    def assertReadsInIndexOrder(self, queryset):
+        plan = queryset.explain()
+        self.assertFalse(_plan_sorts(plan), f"{queryset.query}\n{plan}")
+
+    def test_active_alerts_query(self):
+        for user in (self.admin, self.root):
+            self.assertReadsInIndexOrder(ActiveSensorAlertListView().get_queryset(SimpleNamespace(user=user)))
+
+    def test_history_query(self):
+        view = SensorAlertListView()
+        for user in (self.admin, self.root):
+            for params in ({}, {"status": "CLEARED"}, {"sensorId": "EXPLAIN_7"}):
+                request = SimpleNamespace(user=user, query_params=params)
+                self.assertReadsInIndexOrder(view.filter_queryset(request, view.get_queryset(request)))
 
 
 class SensorAlertAdminTests(APITestCase):
@@ -114,3 +637,170 @@ class SensorAlertAdminTests(APITestCase):
         self.assertTrue(self.report.isAcknowledged)
         self.assertTrue(self.report.isResolved)
         self.assertEqual(self.report.status, "CLEARED")
+
+
+class SensorAlertListTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(userid="A12345", password="testpass123", department="Fire Department")
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("sensor-alerts")
+        sensors = [
+            Sensor.objects.create(sensorId=f"ESP32_{index}", lat=12.9, lng=77.5, apiKey=f"key-{index}")
+            for index in range(2)
+        ]
+        start = timezone.now() - timedelta(days=10)
+        for index in range(7):
+            SensorReport.objects.create(
+                sensor=sensors[index % 2],
+                hazard="GAS" if index == 3 else "FIRE",
+                department="Fire Department",
+                status="CLEARED",
+                sensorValues={"mq2_level": index},
+                timestamp=start + timedelta(days=index),
+            )
+        SensorReport.objects.create(
+            sensor=sensors[0], hazard="FIRE", department="Police", status="TRIGGERED", timestamp=start
+        )
+
+    def test_pages_follow_the_cursor_newest_first(self):
+        first = self.client.get(self.url, {"limit": 4})
+        self.assertEqual(len(first.data["results"]), 4)
+        self.assertEqual(first.data["results"][0]["sensorValues"], {"mq2_level": 6})
+
+        second = self.client.get(first.data["next"])
+        self.assertIsNone(second.data["next"])
+        values = [row["sensorValues"]["mq2_level"] for row in first.data["results"] + second.data["results"]]
+        self.assertEqual(values, [6, 5, 4, 3, 2, 1, 0])
+
+    def test_filters(self):
+        since = (timezone.now() - timedelta(days=6)).date().isoformat()
+        cases = [
+            ({"hazard": "GAS"}, [3]),
+            ({"sensorId": "ESP32_1"}, [5, 3, 1]),
+            ({"sensorId": "UNKNOWN"}, []),
+            ({"since": since}, [6, 5, 4]),
+        ]
+        for params, expected in cases:
+            response = self.client.get(self.url, params)
+            self.assertEqual([row["sensorValues"]["mq2_level"] for row in response.data["results"]], expected, params)
+
+        self.assertEqual(self.client.get(self.url, {"status": "BOGUS"}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_values_can_be_left_out(self):
+        response = self.client.get(self.url, {"include_values": "false"})
+
+        self.assertEqual(len(response.data["results"]), 7)
+        self.assertNotIn("sensorValues", response.data["results"][0])
+        self.assertNotIn("peakValues", response.data["results"][0])
+
+
+class SensorAlertStreamTests(SensorIngestTestCase):
+    def setUp(self):
+        super().setUp()
+        settings_override = self.settings(SENSOR_ALERT_STREAM={"POLL_INTERVAL": 0})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user(userid="A12345", password="testpass123", department="Fire Department")
+        self.stream_url = reverse("sensor-alerts-stream")
+        self.alert = SensorReport.objects.create(
+            sensor=self.sensor, hazard="FIRE", department="Fire Department", status="TRIGGERED", timestamp=timezone.now()
+        )
+
+    def _event(self, department, alert_id=99):
+        return {"type": "opened", "alert": {"alert_id": alert_id, "department": department, "updatedAt": "t"}}
+
+    def _ticket(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(reverse("sensor-alerts-stream-ticket"))
+        self.client.force_authenticate(user=None)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data["ticket"]
+
+    async def test_stream_requires_a_valid_ticket(self):
+        self.assertEqual((await self.async_client.get(self.stream_url)).status_code, status.HTTP_401_UNAUTHORIZED)
+        response = await self.async_client.get(self.stream_url, {"ticket": "bogus"})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        # The access token itself is no longer accepted in the URL.
+        token = str(RefreshToken.for_user(self.user).access_token)
+        response = await self.async_client.get(self.stream_url, {"token": token})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_tickets_are_single_use_and_expire(self):
+        self.assertEqual(
+            self.client.post(reverse("sensor-alerts-stream-ticket")).status_code, status.HTTP_401_UNAUTHORIZED
+        )
+
+        ticket = self._ticket()
+        self.assertEqual(redeem_ticket(ticket), self.user)
+        self.assertIsNone(redeem_ticket(ticket))
+
+        ticket = self._ticket()
+        StreamTicket.objects.update(expiresAt=timezone.now())
+        self.assertIsNone(redeem_ticket(ticket))
+        # Issuing a ticket clears out the expired ones.
+        self._ticket()
+        self.assertEqual(StreamTicket.objects.count(), 1)
+
+    def test_stream_is_refused_under_wsgi(self):
+        self.assertEqual(self.client.get(self.stream_url, {"ticket": self._ticket()}).status_code, 503)
+
+    async def test_stream_sends_snapshot_then_department_events(self):
+        ticket = await sync_to_async(self._ticket)()
+        response = await self.async_client.get(self.stream_url, {"ticket": ticket})
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = response.streaming_content
+        self.assertEqual(await anext(stream), b"retry: 3000\n\n")
+        snapshot = (await anext(stream)).decode()
+        self.assertTrue(snapshot.startswith("event: snapshot\n"))
+        self.assertEqual([row["alert_id"] for row in json.loads(snapshot.split("data: ")[1])], [self.alert.alert_id])
+
+        broker.publish(self._event("Police", alert_id=98))
+        broker.publish(self._event("Fire Department"))
+        broker.publish(self._event("Fire Department"))
+        broker.publish(self._event("Fire Department", alert_id=100))
+
+        message = (await anext(stream)).decode()
+        self.assertTrue(message.startswith("event: opened\n"))
+        self.assertEqual(json.loads(message.split("data: ")[1])["alert_id"], 99)
+        # The repeated version of 99 was dropped.
+        message = (await anext(stream)).decode()
+        self.assertEqual(json.loads(message.split("data: ")[1])["alert_id"], 100)
+
+        # A client disconnecting cancels the pending read.
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        pending.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await pending
+        self.assertFalse(broker.has_subscribers)
+
+    def test_changes_are_published_on_commit(self):
+        self.client.force_authenticate(user=self.user)
+        with patch("sensor_alerts.events.broker") as mock_broker:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.patch(reverse("sensor-alert-ack", kwargs={"alert_id": self.alert.alert_id}))
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.patch(reverse("sensor-alert-resolve", kwargs={"alert_id": self.alert.alert_id}))
+            self.client.force_authenticate(user=None)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(self.url, self.payload, format="json", HTTP_AUTHORIZATION="Sensor sensor-key-123")
+
+        events = [call.args[0] for call in mock_broker.publish.call_args_list]
+        self.assertEqual([event["type"] for event in events], ["acknowledged", "resolved", "opened"])
+        self.assertTrue(events[0]["alert"]["isAcknowledged"])
+        self.assertTrue(events[1]["alert"]["isResolved"])
+        self.assertEqual(events[2]["alert"]["sensorId"], "ESP32_01")
+
+    def test_poll_publishes_each_change_once(self):
+        events_broker = AlertEventBroker()
+        since = timezone.now() - timedelta(minutes=1)
+
+        since = events_broker.poll(since)
+        self.assertEqual(events_broker.stats["polled"], 1)
+        since = events_broker.poll(since)
+        self.assertEqual(events_broker.stats["polled"], 1)
+
+        SensorReport.objects.filter(pk=self.alert.pk).update(isAcknowledged=True, updatedAt=timezone.now())
+        events_broker.poll(since)
+        self.assertEqual(events_broker.stats["polled"], 2)
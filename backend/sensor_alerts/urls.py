@@ -5,12 +5,18 @@ from .views import (
     SensorAlertAcknowledgeView,
     SensorAlertListView,
     SensorAlertResolveView,
+    SensorAlertStreamTicketView,
+    SensorReportBatchView,
     SensorReportView,
+    alert_stream,
 )
 
 urlpatterns = [
     path("sensors/report/", SensorReportView.as_view(), name="sensor-report"),
+    path("sensors/report/batch/", SensorReportBatchView.as_view(), name="sensor-report-batch"),
     path("sensor-alerts/", SensorAlertListView.as_view(), name="sensor-alerts"),
+    path("sensor-alerts/stream/", alert_stream, name="sensor-alerts-stream"),
+    path("sensor-alerts/stream/ticket/", SensorAlertStreamTicketView.as_view(), name="sensor-alerts-stream-ticket"),
     path("sensor-alerts/active/", ActiveSensorAlertListView.as_view(), name="sensor-alerts-active"),
     path("sensor-alerts/<int:alert_id>/ack/", SensorAlertAcknowledgeView.as_view(), name="sensor-alert-ack"),
     path("sensor-alerts/<int:alert_id>/resolve/", SensorAlertResolveView.as_view(), name="sensor-alert-resolve"),
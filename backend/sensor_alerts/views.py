@@ -1,20 +1,59 @@
 import logging
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_GET
 from django.utils import timezone
 from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
+from rest_framework.parsers import JSONParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from accounts.user_cache import CachedJWTAuthentication
+from admin_hub.pagination import KeysetPagination, parse_time_bound
+
 from .authentication import SensorAuthentication
-from .models import SensorReport
-from .serializers import SensorAlertSerializer, SensorReportSerializer
-from .tasks import trigger_alert_email
+from .events import broker, issue_ticket, publish_on_commit, redeem_ticket, stream_events
+from .models import Sensor, SensorReport
+from .parsers import NDJSONParser
+from .serializers import SensorAlertSerializer, SensorAlertSummarySerializer, SensorReportSerializer
+from .services import ingest_batch, max_batch_size, store_readings, validate_readings
+from .spool import SpoolFull, get_spool, spool_enabled, start_spool_flusher
 
 logger = logging.getLogger(__name__)
 
 
+def _spool_readings(sensor, items):
+    """
+    Durably enqueue [(validated_data, raw), ...]. Returns None on success or
+    the 503 response to send when the spool is full.
+    """
+    start_spool_flusher()
+    try:
+        get_spool().enqueue(sensor.pk, items)
+    except SpoolFull:
+        logger.warning("Sensor spool full, rejecting %s reading(s) from sensorId=%s", len(items), sensor.sensorId)
+        return Response(
+            {"detail": "Ingest backlog is full. Retry later."},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": "5"},
+        )
+    return None
+
+
+def _batch_status(accepted, total, accepted_status):
+    if accepted == total:
+        return accepted_status
+    if accepted:
+        return status.HTTP_207_MULTI_STATUS
+    return status.HTTP_400_BAD_REQUEST
+
+
 class SensorReportView(APIView):
     authentication_classes = [SensorAuthentication]
     permission_classes = [IsAuthenticated]
@@ -26,68 +65,144 @@ class SensorReportView(APIView):
 
         sensor = request.user
 
-        if sensor.lat != data["lat"] or sensor.lng != data["lng"]:
-            sensor.lat = data["lat"]
-            sensor.lng = data["lng"]
-            sensor.save(update_fields=["lat", "lng"])
-
-        report = SensorReport.objects.create(
-            sensor=sensor,
-            hazard=data["hazard"],
-            department=data["dept"],
-            location=data.get("location") or f'{data["lat"]}, {data["lng"]}',
-            status=data["status"],
-            sensorValues=data["sensor_values"],
-            rawPayload=request.data,
-            timestamp=data["timestamp"],
-        )
+        if spool_enabled():
+            rejected = _spool_readings(sensor, [(data, request.data)])
+            if rejected is not None:
+                return rejected
+            return Response({"message": "Sensor report queued"}, status=status.HTTP_202_ACCEPTED)
+
+        [(outcome, report)] = store_readings(sensor, [(0, data, request.data)])
+        alert_id = report.alert_id if report else None
 
         logger.info(
-            "ALERT LOG sensorId=%s hazard=%s timestamp=%s dept=%s report_id=%s",
+            "ALERT LOG sensorId=%s hazard=%s timestamp=%s dept=%s outcome=%s report_id=%s",
             sensor.sensorId,
-            report.hazard,
-            report.timestamp.isoformat(),
-            report.department,
-            report.alert_id,
+            data["hazard"],
+            data["timestamp"].isoformat(),
+            data["dept"],
+            outcome,
+            alert_id,
         )
-        logger.info("Sensor report request payload report_id=%s payload=%s", report.alert_id, request.data)
+        logger.info("Sensor report request payload report_id=%s payload=%s", alert_id, request.data)
 
-        if report.status == SensorReport.STATUS_TRIGGERED:
-            trigger_alert_email(report.alert_id)
+        logger.info("Sensor report response status=201 report_id=%s", alert_id)
+        return Response(
+            {"message": "Sensor report received", "status": outcome, "alert_id": alert_id},
+            status=status.HTTP_201_CREATED,
+        )
 
-        logger.info("Sensor report response status=201 report_id=%s", report.alert_id)
-        return Response({"message": "Sensor report received"}, status=status.HTTP_201_CREATED)
+
+class SensorReportBatchView(APIView):
+    """
+    Many readings from one sensor per request, as a JSON array or NDJSON.
+    Responds 201 (202 in spool mode) when every reading was accepted, 207 when
+    some were rejected, and 400 when none were.
+    """
+
+    authentication_classes = [SensorAuthentication]
+    permission_classes = [IsAuthenticated]
+    parser_classes = [JSONParser, NDJSONParser]
+
+    def post(self, request):
+        readings = request.data
+        if not isinstance(readings, list):
+            raise ValidationError({"detail": "Expected a JSON array or NDJSON body of readings"})
+        if not readings:
+            raise ValidationError({"detail": "No readings in request"})
+        if len(readings) > max_batch_size():
+            raise ValidationError({"detail": f"At most {max_batch_size()} readings per request"})
+
+        if spool_enabled():
+            results, valid = validate_readings(request.user, readings)
+            if valid:
+                rejected = _spool_readings(request.user, [(data, raw) for _, data, raw in valid])
+                if rejected is not None:
+                    return rejected
+            for index, _, _ in valid:
+                results[index] = {"index": index, "status": "queued"}
+            return Response(
+                {"queued": len(valid), "rejected": len(results) - len(valid), "results": results},
+                status=_batch_status(len(valid), len(results), status.HTTP_202_ACCEPTED),
+            )
+
+        results, _ = ingest_batch(request.user, readings)
+
+        accepted = sum(1 for result in results if result["status"] != "invalid")
+        return Response(
+            {"accepted": accepted, "rejected": len(results) - accepted, "results": results},
+            status=_batch_status(accepted, len(results), status.HTTP_201_CREATED),
+        )
 
 
 class SensorAlertListView(APIView):
+    """
+    Alert history, newest first, one keyset page at a time. Filters:
+    ``status``, ``hazard``, ``sensorId``, ``since``/``until`` (ISO date or
+    datetime). ``include_values=false`` leaves sensorValues and peakValues
+    out of the rows.
+    """
+
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self, request):
-        queryset = SensorReport.objects.select_related("sensor").all()
+        # rawPayload is never serialized.
+        queryset = SensorReport.objects.select_related("sensor").defer("rawPayload")
         if not request.user.is_root:
             queryset = queryset.filter(department=request.user.department)
         return queryset
 
-    def get(self, request):
-        status_filter = request.GET.get("status")
-        reports = self.get_queryset(request)
+    def filter_queryset(self, request, queryset):
+        params = request.query_params
 
+        status_filter = params.get("status")
         if status_filter:
-            reports = reports.filter(status=status_filter)
+            if status_filter not in dict(SensorReport.STATUS_CHOICES):
+                raise ValidationError({"status": f"Unknown status '{status_filter}'."})
+            queryset = queryset.filter(status=status_filter)
+
+        hazard = params.get("hazard")
+        if hazard:
+            queryset = queryset.filter(hazard=hazard)
+
+        sensor_id = params.get("sensorId")
+        if sensor_id:
+            # Filter on the foreign key so the (sensor, timestamp) index is
+            # used instead of a join on sensorId.
+            sensor_pk = Sensor.objects.filter(sensorId=sensor_id).values_list("pk", flat=True).first()
+            queryset = queryset.filter(sensor_id=sensor_pk) if sensor_pk else queryset.none()
+
+        since = parse_time_bound(request, "since")
+        if since:
+            queryset = queryset.filter(timestamp__gte=since)
+        until = parse_time_bound(request, "until")
+        if until:
+            queryset = queryset.filter(timestamp__lt=until)
+        return queryset
 
-        serializer = SensorAlertSerializer(reports, many=True)
-        return Response(serializer.data)
+    def get(self, request):
+        reports = self.filter_queryset(request, self.get_queryset(request))
+
+        serializer_class = SensorAlertSerializer
+        if request.query_params.get("include_values", "true").lower() in ("0", "false", "no"):
+            reports = reports.defer("sensorValues", "peakValues")
+            serializer_class = SensorAlertSummarySerializer
+
+        paginator = KeysetPagination(id_field="alert_id")
+        page = paginator.paginate_queryset(reports, request, view=self)
+        return paginator.get_paginated_response(serializer_class(page, many=True).data)
 
 
 class ActiveSensorAlertListView(SensorAlertListView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, request):
-        reports = self.get_queryset(request).filter(
+    def get_queryset(self, request):
+        return super().get_queryset(request).filter(
             status=SensorReport.STATUS_TRIGGERED,
             isResolved=False,
         )
-        serializer = SensorAlertSerializer(reports, many=True)
+
+    def get(self, request):
+        serializer = SensorAlertSerializer(self.get_queryset(request), many=True)
         return Response(serializer.data)
 
 
@@ -103,7 +218,8 @@ class SensorAlertAcknowledgeView(APIView):
         if not report.isAcknowledged:
             report.isAcknowledged = True
             report.acknowledgedAt = timezone.now()
-            report.save(update_fields=["isAcknowledged", "acknowledgedAt"])
+            report.save(update_fields=["isAcknowledged", "acknowledgedAt", "updatedAt"])
+            publish_on_commit([("acknowledged", report)])
 
         return Response({"message": "Alert acknowledged", "alert_id": report.alert_id})
 
@@ -121,6 +237,78 @@ class SensorAlertResolveView(APIView):
             report.isResolved = True
             report.resolvedAt = timezone.now()
             report.status = SensorReport.STATUS_CLEARED
-            report.save(update_fields=["isResolved", "resolvedAt", "status"])
+            report.save(update_fields=["isResolved", "resolvedAt", "status", "updatedAt"])
+            publish_on_commit([("resolved", report)])
 
         return Response({"message": "Alert resolved", "alert_id": report.alert_id})
+
+
+class SensorAlertStreamTicketView(APIView):
+    """
+    Issues the single-use ticket a browser opens the alert stream with, as
+    ``?ticket=`` (EventSource cannot send an Authorization header).
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        return Response({"ticket": issue_ticket(request.user)}, status=status.HTTP_201_CREATED)
+
+
+def _stream_user(request):
+    """
+    The admin behind ``?ticket=`` or the Authorization header, or None.
+    """
+    ticket = request.GET.get("ticket")
+    if ticket:
+        return redeem_ticket(ticket)
+    try:
+        user_auth = CachedJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    return user_auth[0] if user_auth else None
+
+
+def _active_snapshot(request):
+    queryset = ActiveSensorAlertListView().get_queryset(request)
+    return SensorAlertSerializer(queryset, many=True).data
+
+
+@require_GET
+async def alert_stream(request):
+    """
+    Server-Sent Events stream of the user's department's alerts (every
+    department for root). Starts with a ``snapshot`` event holding the
+    active alerts, then sends one event per alert change named after it:
+    opened, reopened, updated, closed, acknowledged, resolved, or changed
+    for changes picked up from other processes. Clients drop an alert once
+    it is no longer TRIGGERED and unresolved.
+
+    Under WSGI every open stream would hold a worker for its lifetime, so the
+    stream is refused there (503) outside DEBUG, where runserver is WSGI.
+    """
+    if not isinstance(request, ASGIRequest):
+        if not settings.DEBUG:
+            return JsonResponse({"detail": "The alert stream is only served under ASGI."}, status=503)
+        logger.warning("Serving the sensor alert stream under WSGI; each stream holds a worker")
+
+    user = await sync_to_async(_stream_user)(request)
+    if user is None:
+        return JsonResponse({"detail": "Authentication credentials were not provided or are invalid."}, status=401)
+    request.user = user
+
+    # Subscribe before reading the snapshot so no change falls in between.
+    subscription = broker.subscribe(None if user.is_root else user.department)
+    try:
+        snapshot = await sync_to_async(_active_snapshot)(request)
+    except Exception:
+        broker.unsubscribe(subscription)
+        raise
+    response = StreamingHttpResponse(
+        stream_events(subscription, snapshot, sync_to_async(lambda: _active_snapshot(request))),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    # Keep nginx from buffering the stream.
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -89,6 +89,9 @@ export async function getIssues(status = null, filters = {}) {
   if (filters.deactivated && filters.deactivated !== "all") {
     params.set("deactivated", filters.deactivated);
   }
+  if (filters.ordering) {
+    params.set("ordering", filters.ordering);
+  }
   const qs = params.toString() ? `?${params.toString()}` : "";
 
   const res = await fetchWithAuth(
@@ -256,8 +259,19 @@ export async function toggleUserStatus(userid) {
   return res.json();
 }
 
-export async function getActivityLogs() {
-  const res = await fetchWithAuth(`${API_V1}/activity-logs/`, {
+export async function getActivityLogs(filters = {}, cursor = null) {
+  const params = new URLSearchParams();
+  for (const key of ["action", "target_user", "since", "until", "limit"]) {
+    if (filters[key] && filters[key] !== "all") {
+      params.set(key, filters[key]);
+    }
+  }
+  if (cursor) {
+    params.set("cursor", cursor);
+  }
+  const query = params.toString();
+
+  const res = await fetchWithAuth(`${API_V1}/activity-logs/${query ? `?${query}` : ""}`, {
     method: "GET",
   });
 
@@ -266,11 +280,26 @@ export async function getActivityLogs() {
     throw new Error(`getActivityLogs failed: ${res.status} ${text}`);
   }
 
-  return res.json();
+  // { results: [...], next: <url or null> }
+  const data = await res.json();
+  return {
+    results: data.results,
+    nextCursor: data.next ? new URL(data.next).searchParams.get("cursor") : null,
+  };
 }
 
-export async function getSensorAlerts() {
-  const res = await fetchWithAuth(`${API_BASE}/api/sensor-alerts/`, {
+export async function getSensorAlerts(filters = {}, cursor = null) {
+  const params = new URLSearchParams({ include_values: "false" });
+  for (const key of ["status", "hazard", "sensorId", "since", "until", "limit"]) {
+    if (filters[key] && filters[key] !== "all") {
+      params.set(key, filters[key]);
+    }
+  }
+  if (cursor) {
+    params.set("cursor", cursor);
+  }
+
+  const res = await fetchWithAuth(`${API_BASE}/api/sensor-alerts/?${params.toString()}`, {
     method: "GET",
   });
 
@@ -279,7 +308,12 @@ export async function getSensorAlerts() {
     throw new Error(`getSensorAlerts failed: ${res.status} ${text}`);
   }
 
-  return res.json();
+  // { results: [...], next: <url or null> }
+  const data = await res.json();
+  return {
+    results: data.results,
+    nextCursor: data.next ? new URL(data.next).searchParams.get("cursor") : null,
+  };
 }
 
 export async function getActiveSensorAlerts() {
@@ -295,6 +329,74 @@ export async function getActiveSensorAlerts() {
   return res.json();
 }
 
+const SENSOR_ALERT_EVENTS = ["opened", "reopened", "updated", "closed", "acknowledged", "resolved", "changed"];
+
+// Matches the retry the server sends (SENSOR_ALERT_STREAM["RETRY_MS"]).
+const SENSOR_ALERT_RETRY_MS = 3000;
+
+async function getSensorAlertStreamTicket() {
+  const res = await fetchWithAuth(`${API_BASE}/api/sensor-alerts/stream/ticket/`, {
+    method: "POST",
+  });
+
+  if (!res.ok) {
+    const text = await res.text().catch(() => "");
+    throw new Error(`getSensorAlertStreamTicket failed: ${res.status} ${text}`);
+  }
+
+  const data = await res.json();
+  return data.ticket;
+}
+
+// Live alert events over Server-Sent Events. onSnapshot receives the active
+// alerts (on connect and whenever the server resyncs), onEvent(type, alert)
+// each change after that. Returns a function that closes the stream.
+export function subscribeSensorAlerts({ onSnapshot, onEvent, onError }) {
+  let source = null;
+  let retry = null;
+  let closed = false;
+
+  const reconnectLater = () => {
+    // Stop once fetchWithAuth has given up on the session.
+    if (!closed && getAccess()) retry = setTimeout(connect, SENSOR_ALERT_RETRY_MS);
+  };
+
+  const connect = async () => {
+    // EventSource cannot send an Authorization header, so the stream is
+    // opened with a short-lived single-use ticket, not the access token.
+    let ticket;
+    try {
+      ticket = await getSensorAlertStreamTicket();
+    } catch (err) {
+      if (onError) onError(err);
+      reconnectLater();
+      return;
+    }
+    if (closed) return;
+
+    source = new EventSource(
+      `${API_BASE}/api/sensor-alerts/stream/?ticket=${encodeURIComponent(ticket)}`
+    );
+    source.addEventListener("snapshot", (e) => onSnapshot(JSON.parse(e.data)));
+    for (const type of SENSOR_ALERT_EVENTS) {
+      source.addEventListener(type, (e) => onEvent(type, JSON.parse(e.data)));
+    }
+    source.onerror = () => {
+      // The ticket is spent, so the browser's own reconnect would be
+      // rejected; come back with a new one instead.
+      source.close();
+      reconnectLater();
+    };
+  };
+
+  connect();
+  return () => {
+    closed = true;
+    clearTimeout(retry);
+    if (source) source.close();
+  };
+}
+
 export async function acknowledgeSensorAlert(reportId) {
   const res = await fetchWithAuth(`${API_BASE}/api/sensor-alerts/${reportId}/ack/`, {
     method: "PATCH",
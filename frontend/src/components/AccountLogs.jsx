@@ -18,13 +18,16 @@ const AccountLogs = () => {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
   const [filter, setFilter] = useState("all");
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   const loadLogs = async () => {
     setLoading(true);
     setError("");
     try {
-      const data = await getActivityLogs();
-      setLogs(data);
+      const data = await getActivityLogs({ action: filter });
+      setLogs(data.results);
+      setNextCursor(data.nextCursor);
     } catch (err) {
       setError("Failed to load activity logs: " + err.message);
     } finally {
@@ -32,9 +35,24 @@ const AccountLogs = () => {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    setError("");
+    try {
+      const data = await getActivityLogs({ action: filter }, nextCursor);
+      setLogs((prev) => [...prev, ...data.results]);
+      setNextCursor(data.nextCursor);
+    } catch (err) {
+      setError("Failed to load activity logs: " + err.message);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     loadLogs();
-  }, []);
+  }, [filter]);
 
   const getActionIcon = (action) => {
     switch (action) {
@@ -86,15 +104,13 @@ const AccountLogs = () => {
     });
   };
 
-  const filteredLogs =
-    filter === "all" ? logs : logs.filter((log) => log.action === filter);
-
   const actionTypes = [
     { value: "all", label: "All Actions", icon: Filter },
     { value: "create", label: "Created", icon: UserPlus },
     { value: "delete", label: "Deleted", icon: Trash2 },
     { value: "activate", label: "Activated", icon: Power },
     { value: "deactivate", label: "Deactivated", icon: PowerOff },
+    { value: "login", label: "Logins", icon: LogIn },
   ];
 
   return (
@@ -156,7 +172,7 @@ const AccountLogs = () => {
         <div className="bg-white rounded-2xl shadow-sm border-2 border-gray-200 overflow-hidden flex flex-col">
           <div className="bg-gray-50 border-b-2 border-gray-200 px-6 py-4">
             <p className="text-sm font-bold text-gray-700">
-              Showing {filteredLogs.length} of {logs.length} logs
+              Showing {logs.length} logs{nextCursor ? " (more available)" : ""}
             </p>
           </div>
 
@@ -166,7 +182,7 @@ const AccountLogs = () => {
                 <div className="h-10 w-10 border-4 border-gray-300 border-t-black rounded-full animate-spin mb-3" />
                 <p className="text-gray-500 font-medium">Loading logs...</p>
               </div>
-            ) : filteredLogs.length === 0 ? (
+            ) : logs.length === 0 ? (
               <div className="text-center py-16">
                 <div className="w-16 h-16 bg-gray-100 rounded-full flex items-center justify-center mx-auto mb-4">
                   <ScrollText className="w-8 h-8 text-gray-400" />
@@ -178,7 +194,7 @@ const AccountLogs = () => {
               </div>
             ) : (
               <div className="divide-y-2 divide-gray-100">
-                {filteredLogs.map((log) => (
+                {logs.map((log) => (
                   <div
                     key={log.id}
                     className="px-6 py-5 hover:bg-gray-50 transition"
@@ -244,6 +260,18 @@ const AccountLogs = () => {
                     </div>
                   </div>
                 ))}
+                {nextCursor && (
+                  <div className="px-6 py-4 text-center">
+                    <button
+                      onClick={loadMore}
+                      disabled={loadingMore}
+                      className="px-5 py-2.5 bg-white hover:bg-gray-50 border-2 border-gray-200 rounded-xl
+                               font-semibold transition disabled:opacity-50"
+                    >
+                      {loadingMore ? "Loading..." : "Load older logs"}
+                    </button>
+                  </div>
+                )}
               </div>
             )}
           </div>
@@ -1,5 +1,5 @@
 import { useEffect, useState } from "react";
-import { getActiveSensorAlerts, resolveSensorAlert } from "../api";
+import { resolveSensorAlert, subscribeSensorAlerts } from "../api";
 import { Siren, CheckCircle2, Clipboard, Check } from "lucide-react";
 
 const ActiveSensorAlerts = () => {
@@ -23,26 +23,29 @@ const ActiveSensorAlerts = () => {
   };
 
   useEffect(() => {
-    let mounted = true;
+    const isActive = (alert) => alert.status === "TRIGGERED" && !alert.isResolved;
 
-    const loadAlerts = async () => {
-      setLoading(true);
-      setError("");
-      try {
-        const data = await getActiveSensorAlerts();
-        if (mounted) setAlerts(data);
-      } catch (err) {
-        if (mounted) setError("Failed to load active alerts");
-      } finally {
-        if (mounted) setLoading(false);
-      }
-    };
-
-    loadAlerts();
-
-    return () => {
-      mounted = false;
-    };
+    return subscribeSensorAlerts({
+      onSnapshot: (snapshot) => {
+        setAlerts(snapshot);
+        setError("");
+        setLoading(false);
+      },
+      onEvent: (type, alert) => {
+        setAlerts((prev) => {
+          const rest = prev.filter((item) => item.alert_id !== alert.alert_id);
+          if (!isActive(alert)) return rest;
+          const current = prev.find((item) => item.alert_id === alert.alert_id);
+          // Events can arrive twice or out of order; keep the newest version.
+          if (current && new Date(current.updatedAt) > new Date(alert.updatedAt)) return prev;
+          return [alert, ...rest].sort((a, b) => new Date(b.timestamp) - new Date(a.timestamp));
+        });
+      },
+      onError: () => {
+        setError("Failed to load active alerts");
+        setLoading(false);
+      },
+    });
   }, []);
 
   const resolveNow = async (id) => {
@@ -129,7 +132,14 @@ const ActiveSensorAlerts = () => {
                     )}
                   </button>
                 </div>
-                <div className="text-xs text-gray-600">{new Date(item.timestamp).toLocaleString()}</div>
+                <div className="text-xs text-gray-600">
+                  <div>{new Date(item.timestamp).toLocaleString()}</div>
+                  {item.readingCount > 1 && (
+                    <div className="text-gray-500">
+                      {item.readingCount} readings, last {new Date(item.lastSeenAt).toLocaleTimeString()}
+                    </div>
+                  )}
+                </div>
                 <div>
                   <button
                     onClick={() => resolveNow(item.alert_id)}
@@ -14,6 +14,7 @@ const IssueList = () => {
   const [statusFilter, setStatusFilter] = useState("all");
   const [appealFilter, setAppealFilter] = useState("all");
   const [deactivatedFilter, setDeactivatedFilter] = useState("all");
+  const [ordering, setOrdering] = useState("");
   const [searchQuery, setSearchQuery] = useState("");
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
@@ -27,6 +28,7 @@ const IssueList = () => {
     getIssues(statusFilter, {
       appeal_status: appealFilter,
       deactivated: deactivatedFilter,
+      ordering,
     })
       .then((data) => {
         if (!mounted) return;
@@ -44,7 +46,7 @@ const IssueList = () => {
     return () => {
       mounted = false;
     };
-  }, [statusFilter, appealFilter, deactivatedFilter]);
+  }, [statusFilter, appealFilter, deactivatedFilter, ordering]);
 
   useEffect(() => {
     let mounted = true;
@@ -182,6 +184,15 @@ const IssueList = () => {
               <option value="true">Deactivated Reporters</option>
               <option value="false">Active Reporters</option>
             </select>
+
+            <select
+              value={ordering}
+              onChange={(e) => setOrdering(e.target.value)}
+              className="px-3 py-2 border-2 border-gray-200 rounded-xl text-sm font-medium bg-white"
+            >
+              <option value="">Newest First</option>
+              <option value="priority">Highest Priority</option>
+            </select>
           </div>
         </div>
       </div>
@@ -13,6 +13,9 @@ const SensorAlerts = () => {
   const [error, setError] = useState("");
   const [actioningId, setActioningId] = useState(null);
   const [copiedAlertId, setCopiedAlertId] = useState(null);
+  const [statusFilter, setStatusFilter] = useState("all");
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   const truncateLocation = (location, maxLength = 42) => {
     if (!location) return "N/A";
@@ -34,8 +37,11 @@ const SensorAlerts = () => {
       setLoading(true);
       setError("");
       try {
-        const data = await getSensorAlerts();
-        if (mounted) setAlerts(data);
+        const data = await getSensorAlerts({ status: statusFilter });
+        if (mounted) {
+          setAlerts(data.results);
+          setNextCursor(data.nextCursor);
+        }
       } catch (err) {
         if (mounted) setError("Failed to load sensor alerts");
       } finally {
@@ -48,7 +54,22 @@ const SensorAlerts = () => {
     return () => {
       mounted = false;
     };
-  }, []);
+  }, [statusFilter]);
+
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    setError("");
+    try {
+      const data = await getSensorAlerts({ status: statusFilter }, nextCursor);
+      setAlerts((prev) => [...prev, ...data.results]);
+      setNextCursor(data.nextCursor);
+    } catch (err) {
+      setError("Failed to load sensor alerts");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
   const filtered = useMemo(() => {
     const query = searchQuery.trim().toLowerCase();
@@ -112,15 +133,26 @@ const SensorAlerts = () => {
           </div>
         </div>
 
-        <div className="relative">
-          <Search className="absolute left-3 top-1/2 -translate-y-1/2 w-5 h-5 text-gray-400" />
-          <input
-            type="text"
-            placeholder="Search by sensor, hazard, or department..."
-            value={searchQuery}
-            onChange={(e) => setSearchQuery(e.target.value)}
-            className="w-full pl-10 pr-4 py-3 border-2 border-gray-200 rounded-xl focus:ring-2 focus:ring-amber-500 focus:border-amber-500 transition text-sm"
-          />
+        <div className="flex gap-3">
+          <div className="relative flex-1">
+            <Search className="absolute left-3 top-1/2 -translate-y-1/2 w-5 h-5 text-gray-400" />
+            <input
+              type="text"
+              placeholder="Search loaded alerts by sensor, hazard, or department..."
+              value={searchQuery}
+              onChange={(e) => setSearchQuery(e.target.value)}
+              className="w-full pl-10 pr-4 py-3 border-2 border-gray-200 rounded-xl focus:ring-2 focus:ring-amber-500 focus:border-amber-500 transition text-sm"
+            />
+          </div>
+          <select
+            value={statusFilter}
+            onChange={(e) => setStatusFilter(e.target.value)}
+            className="px-4 py-3 border-2 border-gray-200 rounded-xl focus:ring-2 focus:ring-amber-500 focus:border-amber-500 transition text-sm font-medium"
+          >
+            <option value="all">All statuses</option>
+            <option value="TRIGGERED">Triggered</option>
+            <option value="CLEARED">Cleared</option>
+          </select>
         </div>
       </div>
 
@@ -212,6 +244,18 @@ const SensorAlerts = () => {
                 </div>
               </div>
             ))}
+
+          {!loading && !error && nextCursor && (
+            <div className="px-6 py-4 text-center">
+              <button
+                onClick={loadMore}
+                disabled={loadingMore}
+                className="px-5 py-2.5 bg-white hover:bg-gray-50 border-2 border-gray-200 rounded-xl font-semibold transition disabled:opacity-50"
+              >
+                {loadingMore ? "Loading..." : "Load older alerts"}
+              </button>
+            </div>
+          )}
         </div>
       </div>
     </div>